@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+This module contains the benchmark of the serialization of the /categories
+listing
+
+Categories with a product each are stored in a temporary sqlite database and
+loaded as one page with the statement of the endpoint, then the page is
+serialized the way FastAPI does for a response_model (validation, conversion
+to JSON compatible data and json.dumps), with the pydantic model_dump_json of
+the validated page, and with orjson straight from the loaded columns as the
+endpoint does. The mean duration of a serialization and the size of the body
+are reported
+
+usage:
+    python -m benchmarks.category_listing
+    python -m benchmarks.category_listing --rows 50000 --iterations 10
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from main.database.base import Base
+from main.database.models.category import Category
+from main.database.models.product import Product
+from main.database.queries.category import category_page_stmt
+from main.database.queries.category import serialize_category_page
+from main.validators.category import CategoryPageResponseValidator
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from typing import Callable
+from typing import Sequence
+
+
+def response_model_body(categories: Sequence[Category]) -> bytes:
+    """serialize the page as FastAPI does with a response_model"""
+    page = CategoryPageResponseValidator.model_validate(
+        {"items": categories, "next_cursor": None}
+    )
+    return json.dumps(
+        page.model_dump(mode="json", by_alias=True),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def model_dump_json_body(categories: Sequence[Category]) -> bytes:
+    """serialize the validated page with pydantic"""
+    page = CategoryPageResponseValidator.model_validate(
+        {"items": categories, "next_cursor": None}
+    )
+    return page.model_dump_json(by_alias=True).encode("utf-8")
+
+
+def orjson_body(categories: Sequence[Category]) -> bytes:
+    """serialize the page with orjson without validation"""
+    return serialize_category_page(categories, None)
+
+
+# serializations compared by the benchmark
+SERIALIZERS: dict[str, Callable[[Sequence[Category]], bytes]] = {
+    "response_model": response_model_body,
+    "model_dump_json": model_dump_json_body,
+    "orjson": orjson_body,
+}
+
+
+def seed(session: Session, rows: int) -> None:
+    """
+    store rows categories with one product each
+
+    parameters
+    ----------
+    session: Session
+        session of the benchmark database
+    rows: int
+        number of categories
+    """
+    for index in range(rows):
+        cat_obj = Category(
+            name=f"category-{index}",
+            code=f"{index:05}",
+            description=f"description of category {index}",
+        )
+        cat_obj.products.append(
+            Product(name=f"product-{index}", sku=f"{index:08}", price=1.0)
+        )
+        session.add(cat_obj)
+    session.commit()
+
+
+def run(session: Session, rows: int, iterations: int) -> dict:
+    """
+    load a page of rows categories and serialize it with every serializer
+
+    parameters
+    ----------
+    session: Session
+        session of the seeded benchmark database
+    rows: int
+        number of categories of the page
+    iterations: int
+        number of serializations measured per serializer
+
+    return: dict
+        mean milliseconds and body bytes of every serializer
+    """
+    categories = session.scalars(category_page_stmt(rows)).all()
+    results = {}
+    for name, serialize in SERIALIZERS.items():
+        body = serialize(categories)
+        began = time.perf_counter()
+        for _ in range(iterations):
+            serialize(categories)
+        results[name] = {
+            "milliseconds": (time.perf_counter() - began) / iterations * 1000,
+            "bytes": len(body),
+        }
+    return results
+
+
+def main() -> None:
+    """command line entry point of the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'categories.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            seed(session, args.rows)
+            results = run(session, args.rows, args.iterations)
+        engine.dispose()
+    for name, result in results.items():
+        print(
+            f"{name:>15}: {result['milliseconds']:,.1f} ms per page of "
+            f"{args.rows:,} categories, {result['bytes'] / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
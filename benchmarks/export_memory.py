@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""
+This module contains the benchmark of the memory used by the streaming export
+of the inventory transaction ledger
+
+Transaction rows are inserted into a temporary sqlite database, then exported
+as NDJSON through export_chunks, the chunks being discarded as a client would
+consume them. The resident set size of the process is sampled while the rows
+are streamed, it stays flat whatever the number of rows. With --materialize
+the same rows are also read into a list and encoded as one JSON array, as a
+list endpoint would, for comparison
+
+usage:
+    python -m benchmarks.export_memory
+    python -m benchmarks.export_memory --rows 5000000 --materialize
+"""
+import argparse
+import asyncio
+import orjson
+import os
+import resource
+import tempfile
+import time
+from main.database.export import export_chunks
+from main.database.export import export_columns
+from main.database.export import export_stmt
+from main.database.models import category  # noqa: F401
+from main.database.models.basemodel import utc_now
+from main.database.models.inven_transaction import InventoryTransaction
+from main.utils.uuid7 import uuid7
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from uuid import uuid4
+
+
+def rss_bytes() -> int:
+    """return the resident set size of the process"""
+    try:
+        with open("/proc/self/statm") as file_obj:
+            return int(file_obj.read().split()[1]) * os.sysconf("SC_PAGESIZE")
+    except OSError:
+        # peak resident set size, in kilobytes on linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def seed(url: str, rows: int, batch: int = 50_000) -> None:
+    """
+    insert rows inventory transactions
+
+    parameters
+    ----------
+    url: str
+        url of the benchmark database
+    rows: int
+        number of transactions
+    batch: int
+        transactions inserted per statement
+    """
+    engine = create_engine(url)
+    table = InventoryTransaction.metadata.tables[
+        InventoryTransaction.__tablename__
+    ]
+    table.create(engine)
+    inventory_ids = [uuid4() for _ in range(100)]
+    now = utc_now()
+    for start in range(0, rows, batch):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(table),
+                [
+                    {
+                        "id": uuid7(),
+                        "created": now,
+                        "updated": now,
+                        "quantity": row % 10 - 5,
+                        "inventory_id": inventory_ids[row % 100],
+                    }
+                    for row in range(start, min(start + batch, rows))
+                ],
+            )
+    engine.dispose()
+
+
+async def stream(url: str, rows: int, samples: int = 10) -> dict:
+    """
+    export the transactions as NDJSON and sample the resident set size
+
+    parameters
+    ----------
+    url: str
+        url of the benchmark database
+    rows: int
+        number of transactions in the database
+    samples: int
+        number of resident set size samples taken during the export
+
+    return: dict
+        exported bytes, seconds and resident set size samples
+    """
+    engine = create_async_engine(url)
+
+    async def open_session() -> AsyncSession:
+        return AsyncSession(engine)
+
+    stmt = export_stmt(
+        InventoryTransaction, export_columns(InventoryTransaction, None)
+    )
+    exported, lines, rss = 0, 0, [rss_bytes()]
+    began = time.perf_counter()
+    async for chunk in export_chunks(open_session, stmt, "ndjson"):
+        exported += len(chunk)
+        lines += chunk.count(b"\n")
+        if lines >= len(rss) * rows / samples:
+            rss.append(rss_bytes())
+    seconds = time.perf_counter() - began
+    await engine.dispose()
+    return {"bytes": exported, "seconds": seconds, "rss": rss}
+
+
+async def materialize(url: str) -> dict:
+    """
+    read every transaction into a list and encode it as one JSON array
+
+    parameters
+    ----------
+    url: str
+        url of the benchmark database
+
+    return: dict
+        encoded bytes, seconds and resident set size after the encoding
+    """
+    engine = create_async_engine(url)
+    stmt = export_stmt(
+        InventoryTransaction, export_columns(InventoryTransaction, None)
+    )
+    began = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        rows = (await session.execute(stmt)).mappings().all()
+        body = orjson.dumps([dict(row) for row in rows])
+        result = {
+            "bytes": len(body),
+            "seconds": time.perf_counter() - began,
+            "rss": [rss_bytes()],
+        }
+    await engine.dispose()
+    return result
+
+
+def main() -> None:
+    """command line entry point of the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--materialize", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ledger.db")
+        seed(f"sqlite:///{path}", args.rows)
+        results = {
+            "streamed": asyncio.run(
+                stream(f"sqlite+aiosqlite:///{path}", args.rows)
+            )
+        }
+        if args.materialize:
+            results["materialized"] = asyncio.run(
+                materialize(f"sqlite+aiosqlite:///{path}")
+            )
+    for name, result in results.items():
+        samples = ", ".join(f"{rss / 2**20:.0f}" for rss in result["rss"])
+        print(
+            f"{name:>12}: {args.rows:,} rows, "
+            f"{result['bytes'] / 2**20:,.0f} MiB in "
+            f"{result['seconds']:,.1f} s, RSS MiB {samples}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""
+This module contains the benchmark of the signature algorithms of the
+authentication tokens
+
+A token shaped like the access tokens is signed and verified with a new key
+of every algorithm, passing PyJWT either the PEM text of the key, parsed again
+on every call, or the key object parsed once as the keyring does. The mean
+cost of a call is reported in microseconds
+
+usage:
+    python -m benchmarks.jwt_algorithms
+    python -m benchmarks.jwt_algorithms --iterations 5000
+"""
+import argparse
+import jwt
+import time
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.hazmat.primitives.serialization import NoEncryption
+from cryptography.hazmat.primitives.serialization import PrivateFormat
+from cryptography.hazmat.primitives.serialization import PublicFormat
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Callable
+from uuid import uuid4
+
+# private keys of the benchmarked algorithms
+SigningKey = (
+    rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+)
+
+# private key generators of the benchmarked algorithms
+KEY_GENERATORS: dict[str, Callable[[], SigningKey]] = {
+    "RS256": lambda: rsa.generate_private_key(65537, 2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def mean_microseconds(call: Callable[[], object], iterations: int) -> float:
+    """
+    return the mean duration of the call in microseconds
+
+    parameters
+    ----------
+    call: Callable
+        benchmarked function
+    iterations: int
+        number of calls measured
+    """
+    began = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - began) / iterations * 1_000_000
+
+
+def run(iterations: int) -> dict:
+    """
+    sign and verify a token with every algorithm and key form
+
+    parameters
+    ----------
+    iterations: int
+        number of signatures and verifications measured per case
+
+    return: dict
+        mean microseconds of sign and verify by algorithm and key form
+    """
+    payload = {
+        "sub": "admin@admin.com",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+        "jti": uuid4().hex,
+    }
+    results = {}
+    for algorithm, generate in KEY_GENERATORS.items():
+        private_key = generate()
+        public_key = private_key.public_key()
+        keys = {
+            "pem": (
+                private_key.private_bytes(
+                    Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+                ).decode(),
+                public_key.public_bytes(
+                    Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+                ).decode(),
+            ),
+            "object": (private_key, public_key),
+        }
+        for form, (signing_key, verifying_key) in keys.items():
+            token = jwt.encode(payload, signing_key, algorithm=algorithm)
+            results[algorithm, form] = {
+                "sign": mean_microseconds(
+                    lambda: jwt.encode(
+                        payload, signing_key, algorithm=algorithm
+                    ),
+                    iterations,
+                ),
+                "verify": mean_microseconds(
+                    lambda: jwt.decode(token, verifying_key, [algorithm]),
+                    iterations,
+                ),
+            }
+    return results
+
+
+def main() -> None:
+    """command line entry point of the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=1_000)
+    args = parser.parse_args()
+
+    for (algorithm, form), result in run(args.iterations).items():
+        print(
+            f"{algorithm} {form:>6} key: sign {result['sign']:,.1f} us, "
+            f"verify {result['verify']:,.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""
+This module contains the benchmark of the dictionary representation of the
+model objects
+
+Product objects with every column set are converted with the previous
+to_dict, which inspected the mapper and read each attribute up to three times
+per call, with the current to_dict using the column metadata cached per class,
+and with to_dicts. The time to convert every object is reported
+
+usage:
+    python -m benchmarks.model_to_dict
+    python -m benchmarks.model_to_dict --rows 500000
+"""
+import argparse
+import time
+from datetime import datetime
+from main.database.models import category  # noqa: F401
+from main.database.models.basemodel import to_dicts
+from main.database.models.basemodel import utc_now
+from main.database.models.product import Product
+from main.utils.uuid7 import uuid7
+from sqlalchemy import inspect
+from typing import Callable
+
+
+def inspect_to_dicts(objs: list[Product]) -> list[dict]:
+    """convert the objects with the previous to_dict implementation"""
+    return [
+        {
+            c.key: (
+                getattr(obj, c.key).strftime("%Y-%m-%dT%H:%M:%S")
+                if isinstance(getattr(obj, c.key), datetime)
+                else getattr(obj, c.key)
+            )
+            for c in inspect(obj).mapper.column_attrs
+        }
+        for obj in objs
+    ]
+
+
+# conversions compared by the benchmark
+CONVERTERS: dict[str, Callable[[list[Product]], list[dict]]] = {
+    "inspect to_dict": inspect_to_dicts,
+    "cached to_dict": lambda objs: [obj.to_dict() for obj in objs],
+    "to_dicts": to_dicts,
+}
+
+
+def products(rows: int) -> list[Product]:
+    """
+    return rows transient products with every column set
+
+    parameters
+    ----------
+    rows: int
+        number of products
+    """
+    category_id, now = uuid7(), utc_now()
+    objs = []
+    for index in range(rows):
+        prod_obj = Product(
+            name=f"product-{index}",
+            sku=f"{index:08}",
+            description=f"description of product {index}",
+            price=1.0,
+            category_id=category_id,
+            is_active=True,
+        )
+        prod_obj.id, prod_obj.created, prod_obj.updated = uuid7(), now, now
+        objs.append(prod_obj)
+    return objs
+
+
+def run(rows: int) -> dict:
+    """
+    convert rows products with every converter
+
+    parameters
+    ----------
+    rows: int
+        number of products converted
+
+    return: dict
+        seconds taken by every converter
+    """
+    objs = products(rows)
+    results = {}
+    for name, convert in CONVERTERS.items():
+        began = time.perf_counter()
+        convert(objs)
+        results[name] = time.perf_counter() - began
+    return results
+
+
+def main() -> None:
+    """command line entry point of the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    baseline = results["inspect to_dict"]
+    for name, seconds in results.items():
+        print(
+            f"{name:>15}: {seconds * 1000:,.0f} ms for {args.rows:,} rows, "
+            f"{baseline / seconds:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
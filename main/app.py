@@ -2,12 +2,46 @@
 """
 This module contains the main fastapi applications
 """
+import asyncio
+from contextlib import asynccontextmanager
+from contextlib import suppress
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from main.database.engine import dispose_engine
+from main.database.notify import listen
+from main.database.queries.api_key import api_key_registry
+from main.database.queries.api_key import load_api_keys
+from main.database.routing import dispose_replica_engines
 from main.sub_apps.admin import admin
+from main.utils.passwords import password_hasher
+from main.validators.config import get_api_key_env_vars
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """manage process wide resources for the lifetime of the application"""
+    # evict the cache entries of the rows changed by the other workers
+    listener = asyncio.create_task(listen())
+    # keep the in-memory table of the service API keys up to date
+    api_keys = asyncio.create_task(
+        api_key_registry.run(
+            load_api_keys, get_api_key_env_vars().API_KEY_REFRESH_INTERVAL
+        )
+    )
+    yield
+    for task in (listener, api_keys):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # release the pooled database connections of this worker process
+    await dispose_engine()
+    await dispose_replica_engines()
+    # stop the password hashing workers
+    password_hasher.shutdown()
 
 
 # assign an instance of a FastAPI class to main variable
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 # mount the admin application of the main application
@@ -2,10 +2,22 @@
 """
 This module contains the declarative base utility class
 """
+from sqlalchemy import MetaData
 from sqlalchemy.orm import DeclarativeBase
 
 
+# constraint naming convention matching the postgresql default names, so that
+# migrations can address constraints by a predictable name
+naming_convention = {
+    "ix": "ix_%(column_0_label)s",
+    "uq": "%(table_name)s_%(column_0_N_name)s_key",
+    "ck": "%(table_name)s_%(constraint_name)s_check",
+    "fk": "%(table_name)s_%(column_0_N_name)s_fkey",
+    "pk": "%(table_name)s_pkey",
+}
+
+
 class Base(DeclarativeBase):
     """Declarative base class for all database tables"""
 
-    pass
+    metadata = MetaData(naming_convention=naming_convention)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+This module contains the bulk import of a supplier catalog
+
+A catalog is a CSV file with one row per product and country, the columns
+category_code, sku, name, price and optionally description, is_active,
+country and quantity. The rows are read in chunks, each chunk is validated in
+one pass by a precompiled TypeAdapter, its category codes are resolved by a
+single query, and its products and inventories are upserted by multi row
+statements committed with the chunk. Invalid rows are reported with their
+errors and left out, the rest of the catalog is imported
+
+usage: python -m main.database.catalog_import CATALOG.csv [--chunk-size N]
+"""
+import argparse
+import asyncio
+import csv
+import json
+from itertools import islice
+from main.database.models.category import Category
+from main.database.models.product import Product
+from main.database.notify import publish_change
+from main.database.queries.inventory import bulk_upsert_inventories
+from main.database.queries.product import bulk_upsert_products
+from main.validators.catalog_import import CatalogImportRowValidator
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+from sqlalchemy import exc
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
+from typing import NamedTuple
+from uuid import UUID
+
+# columns every catalog has
+REQUIRED_COLUMNS = ("category_code", "sku", "name", "price")
+
+# rows validated and upserted per statement and transaction
+IMPORT_CHUNK_SIZE = 1000
+
+catalog_rows_adapter = TypeAdapter(list[CatalogImportRowValidator])
+
+
+class CatalogImportReport(NamedTuple):
+    """outcome of a catalog import"""
+
+    rows: int
+    products: int
+    inventories: int
+    errors: list[dict]
+
+
+def check_header(fieldnames: Iterable[str] | None) -> None:
+    """
+    check that the header of a catalog has the required columns
+
+    parameters
+    ----------
+    fieldnames: Iterable[str] | None
+        columns of the header, None for an empty file
+    """
+    missing = [
+        column
+        for column in REQUIRED_COLUMNS
+        if column not in (fieldnames or ())
+    ]
+    if missing:
+        raise ValueError(
+            f"Catalog is missing the columns {', '.join(missing)}"
+        )
+
+
+def row_error(row: int, loc: list, msg: str, type_: str) -> dict:
+    """return the report entry of a row left out of the import"""
+    return {"row": row, "errors": [{"loc": loc, "msg": msg, "type": type_}]}
+
+
+def validate_chunk(
+    start: int, rows: list[dict]
+) -> tuple[list[tuple[int, CatalogImportRowValidator]], list[dict]]:
+    """
+    validate a chunk of rows, the valid rows are validated again in one pass
+    when the chunk holds invalid ones
+
+    parameters
+    ----------
+    start: int
+        zero based index of the first row of the chunk in the catalog
+    rows: list[dict]
+        rows read from the catalog
+
+    return: tuple[list, list[dict]]
+        the valid rows with their indexes and the errors of the others
+    """
+    # empty fields take the default of their column, fields beyond the
+    # header are ignored
+    rows = [
+        {key: value for key, value in row.items() if key and value != ""}
+        for row in rows
+    ]
+    try:
+        valid = catalog_rows_adapter.validate_python(rows)
+        return list(enumerate(valid, start)), []
+    except ValidationError as err_obj:
+        # group the errors by the index of the row that raised them
+        errors: dict[int, list] = {}
+        for error in err_obj.errors(include_url=False, include_input=False):
+            index, *loc = error["loc"]
+            errors.setdefault(int(index), []).append(
+                {"loc": loc, "msg": error["msg"], "type": error["type"]}
+            )
+    indexes = [index for index in range(len(rows)) if index not in errors]
+    valid = catalog_rows_adapter.validate_python([rows[i] for i in indexes])
+    return (
+        [(start + index, row) for index, row in zip(indexes, valid)],
+        [
+            {"row": start + index, "errors": errs}
+            for index, errs in sorted(errors.items())
+        ],
+    )
+
+
+async def import_chunk(
+    session: AsyncSession,
+    start: int,
+    rows: list[dict],
+    category_ids: dict[str, UUID],
+) -> tuple[int, int, list[dict]]:
+    """
+    validate, resolve and upsert a chunk of rows and commit it
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the import
+    start: int
+        zero based index of the first row of the chunk in the catalog
+    rows: list[dict]
+        rows read from the catalog
+    category_ids: dict[str, UUID]
+        ids of the category codes resolved by the previous chunks, updated
+        with the codes of the chunk
+
+    return: tuple[int, int, list[dict]]
+        the numbers of upserted products and inventories and the errors of
+        the rows left out
+    """
+    valid, errors = validate_chunk(start, rows)
+    codes = {row.category_code for _, row in valid} - category_ids.keys()
+    if codes:
+        stmt = select(Category.code, Category.id).where(
+            Category.code.in_(codes)
+        )
+        category_ids.update((await session.execute(stmt)).tuples().all())
+
+    # products holding the skus or the names of the chunk
+    skus = {row.sku for _, row in valid}
+    names = {row.name for _, row in valid}
+    stmt = select(Product.sku, Product.name, Product.category_id).where(
+        or_(Product.sku.in_(skus), Product.name.in_(names))
+    )
+    existing = (await session.execute(stmt)).all() if valid else []
+    name_skus = {name: sku for sku, name, _ in existing}
+    changed_categories = {cat_id for sku, _, cat_id in existing if sku in skus}
+
+    # a sku or an inventory listed more than once takes its last row
+    products: dict[str, dict] = {}
+    inventories: dict[tuple[str, str], int] = {}
+    for index, row in valid:
+        if row.category_code not in category_ids:
+            errors.append(
+                row_error(
+                    index,
+                    ["category_code"],
+                    f"Category with code {row.category_code} not found",
+                    "category_not_found",
+                )
+            )
+            continue
+        if name_skus.setdefault(row.name, row.sku) != row.sku:
+            errors.append(
+                row_error(
+                    index,
+                    ["name"],
+                    f"Product with name {row.name} already exists",
+                    "name_conflict",
+                )
+            )
+            continue
+        products[row.sku] = {
+            "name": row.name,
+            "sku": row.sku,
+            "description": row.description,
+            "price": row.price,
+            "category_id": category_ids[row.category_code],
+            "is_active": row.is_active,
+        }
+        changed_categories.add(category_ids[row.category_code])
+        if row.country is not None and row.quantity is not None:
+            inventories[row.sku, row.country] = row.quantity
+    errors.sort(key=lambda error: error["row"])
+    if not products:
+        return 0, 0, errors
+
+    try:
+        product_ids = await bulk_upsert_products(
+            session, list(products.values())
+        )
+        inventory_count = 0
+        if inventories:
+            inventory_count = await bulk_upsert_inventories(
+                session,
+                [
+                    {
+                        "product_id": product_ids[sku],
+                        "country": country,
+                        "quantity": quantity,
+                    }
+                    for (sku, country), quantity in inventories.items()
+                ],
+            )
+        await publish_change(session, "product", product_ids.values())
+        # the cached categories list their products
+        await publish_change(session, "category", changed_categories)
+        await session.commit()
+    except exc.IntegrityError as err_obj:
+        # a concurrent write took a name or removed a category after the
+        # checks, the chunk is left out as a whole
+        await session.rollback()
+        category_ids.clear()
+        return (
+            0,
+            0,
+            sorted(
+                errors
+                + [
+                    row_error(index, [], str(err_obj.orig), "conflict")
+                    for index, row in valid
+                    if row.sku in products
+                ],
+                key=lambda error: error["row"],
+            ),
+        )
+    return len(product_ids), inventory_count, errors
+
+
+async def import_catalog(
+    session: AsyncSession,
+    rows: Iterable[dict],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> CatalogImportReport:
+    """
+    import the rows of a catalog chunk by chunk, each chunk is committed
+    before the next one is read
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the import
+    rows: Iterable[dict]
+        rows of the catalog, e.g. a csv.DictReader
+    chunk_size: int
+        rows validated and upserted per transaction
+
+    return: CatalogImportReport
+    """
+    rows = iter(rows)
+    category_ids: dict[str, UUID] = {}
+    count = products = inventories = 0
+    errors: list[dict] = []
+    # reading and parsing a chunk blocks, it runs in a worker thread so that
+    # the event loop keeps serving the other requests
+    while chunk := await asyncio.to_thread(list, islice(rows, chunk_size)):
+        chunk_products, chunk_inventories, chunk_errors = await import_chunk(
+            session, count, chunk, category_ids
+        )
+        count += len(chunk)
+        products += chunk_products
+        inventories += chunk_inventories
+        errors += chunk_errors
+    return CatalogImportReport(count, products, inventories, errors)
+
+
+async def import_file(path: str, chunk_size: int) -> CatalogImportReport:
+    """
+    import a catalog file into the configured database
+
+    parameters
+    ----------
+    path: str
+        path of the CSV file
+    chunk_size: int
+        rows validated and upserted per transaction
+
+    return: CatalogImportReport
+    """
+    from main.database.engine import async_session_factory
+    from main.database.engine import dispose_engine
+
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as file_obj:
+            reader = csv.DictReader(file_obj)
+            check_header(reader.fieldnames)
+            async with async_session_factory()() as session:
+                return await import_catalog(session, reader, chunk_size)
+    finally:
+        await dispose_engine()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """import a catalog file and print the report as JSON"""
+    parser = argparse.ArgumentParser(
+        description="import a supplier catalog CSV file"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(import_file(args.path, args.chunk_size))
+    except ValueError as err_obj:
+        parser.error(str(err_obj))
+    print(json.dumps(report._asdict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,45 +4,148 @@
 This module contains function definitions to allow transactions on postgresql
 database tables
 """
-from main.database.base import Base
+from functools import lru_cache
+from main.validators.config import DBEnvironmentVariableValidator
 from main.validators.config import get_db_env_vars
 from sqlalchemy import create_engine
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
 
 
-# obtain validated database environment variables
-db_vars = get_db_env_vars()
+def db_url(
+    db_vars: DBEnvironmentVariableValidator, driver: str = "postgresql"
+) -> str:
+    """
+    build the postgresql connection url from the database environment variables
 
+    parameters
+    ----------
+    db_vars: DBEnvironmentVariableValidator
+        validated database environment variables
+    driver: str
+        sqlalchemy dialect and driver name of the url
 
-def db_engine():
-    """
-    Database engine to be used to establish connection with postgresql
-    database
+    return: str
     """
-
-    db_url = (
-        "postgresql://"
+    return (
+        f"{driver}://"
         + f"{db_vars.DB_USER}:{db_vars.DB_PASSWORD}"
         + f"@{db_vars.DB_HOST}:{db_vars.DB_PORT}/"
         + f"{db_vars.DB_NAME}"
     )
-    # create database engine
-    _engine = create_engine(db_url, echo=False)
 
-    # invoke sqlalchemy metadata object
-    Base.metadata.create_all(bind=_engine)
 
-    return _engine
+def create_db_engine(db_vars: DBEnvironmentVariableValidator) -> Engine:
+    """
+    create a database engine backed by a QueuePool configured from the
+    database environment variables
+
+    parameters
+    ----------
+    db_vars: DBEnvironmentVariableValidator
+        validated database environment variables
+
+    return: Engine
+    """
+    return create_engine(
+        db_url(db_vars),
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=db_vars.DB_POOL_SIZE,
+        max_overflow=db_vars.DB_MAX_OVERFLOW,
+        pool_pre_ping=db_vars.DB_POOL_PRE_PING,
+        pool_recycle=db_vars.DB_POOL_RECYCLE,
+        pool_timeout=db_vars.DB_POOL_TIMEOUT,
+    )
+
+
+@lru_cache
+def db_engine() -> Engine:
+    """
+    Database engine to be used to establish connection with postgresql
+    database. The engine and its connection pool are built once per worker
+    process on first use, the schema itself is managed by the alembic
+    migrations and is not created here
+    """
+    return create_db_engine(get_db_env_vars())
+
+
+def create_async_db_engine(
+    db_vars: DBEnvironmentVariableValidator,
+) -> AsyncEngine:
+    """
+    create an asyncpg backed database engine with the same pool configuration
+    as the synchronous engine
+
+    parameters
+    ----------
+    db_vars: DBEnvironmentVariableValidator
+        validated database environment variables
+
+    return: AsyncEngine
+    """
+    return create_async_engine(
+        db_url(db_vars, "postgresql+asyncpg"),
+        echo=False,
+        pool_size=db_vars.DB_POOL_SIZE,
+        max_overflow=db_vars.DB_MAX_OVERFLOW,
+        pool_pre_ping=db_vars.DB_POOL_PRE_PING,
+        pool_recycle=db_vars.DB_POOL_RECYCLE,
+        pool_timeout=db_vars.DB_POOL_TIMEOUT,
+    )
+
+
+@lru_cache
+def async_db_engine() -> AsyncEngine:
+    """
+    Asynchronous database engine used by the async path operations, built
+    once per worker process on first use
+    """
+    return create_async_db_engine(get_db_env_vars())
+
+
+@lru_cache
+def async_session_factory() -> async_sessionmaker:
+    """
+    return the AsyncSession factory bound to the process async engine.
+    Objects are not expired on commit so that they can be serialized into the
+    response without another round trip to the database
+    """
+    return async_sessionmaker(async_db_engine(), expire_on_commit=False)
+
+
+async def dispose_engine() -> None:
+    """
+    Close every pooled connection of the process engines, if they were built
+    """
+    if db_engine.cache_info().currsize:
+        db_engine().dispose()
+        db_engine.cache_clear()
+    if async_db_engine.cache_info().currsize:
+        await async_db_engine().dispose()
+        async_session_factory.cache_clear()
+        async_db_engine.cache_clear()
 
 
 def db_session():
     """
-    Create database session to allow transaction with the database tables
+    Create database session to allow transaction with the database tables.
+    The session checks a connection out of the process pool and returns it to
+    the pool when closed
     """
-    _engine = db_engine()
-    _session = Session(bind=_engine)
+    with Session(bind=db_engine()) as _session:
+        yield _session
 
-    yield _session
 
-    _session.close()  # close the session connection
-    _engine.dispose()  # dispose the created engine and close sessin connection
+async def async_db_session():
+    """
+    Create an asynchronous database session for the async path operations.
+    Waiting on the database suspends the request instead of blocking the event
+    loop of the worker
+    """
+    async with async_session_factory()() as _session:
+        yield _session
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+This module contains the streaming export of the catalog and of the
+inventory transaction ledger
+
+The selected columns of a table are read through a server side cursor,
+yield_per rows at a time, and every partition of rows is encoded into a chunk
+of NDJSON or CSV as soon as it is fetched, so a worker exports a table of any
+size holding a single partition in memory. Rows are exported in the order the
+database returns them, no sort is needed to stream a whole table
+
+usage:
+    stmt = export_stmt(Product, ["id", "name", "price"], since)
+    async for chunk in export_chunks(open_session, stmt, "ndjson"):
+        ...
+"""
+import csv
+import io
+import orjson
+from datetime import datetime
+from main.database.models.basemodel import as_utc
+from main.database.models.basemodel import column_metadata
+from main.database.models.basemodel import BaseModel
+from main.database.models.category import Category
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.models.inventory import Inventory
+from main.database.models.product import Product
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Literal
+from typing import Sequence
+
+# path names of the exported tables
+ExportTable = Literal[
+    "categories", "products", "inventories", "inventory-transactions"
+]
+# formats of the exports
+ExportFormat = Literal["ndjson", "csv"]
+
+# models of the exported tables by path name
+EXPORT_MODELS: dict[ExportTable, type[BaseModel]] = {
+    "categories": Category,
+    "products": Product,
+    "inventories": Inventory,
+    "inventory-transactions": InventoryTransaction,
+}
+
+# media types of the export formats
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# rows fetched from the cursor and encoded per chunk
+EXPORT_PARTITION_SIZE = 5000
+
+
+def export_columns(model: type[BaseModel], columns: str | None) -> list[str]:
+    """
+    return the exported columns of a table
+
+    parameters
+    ----------
+    model: type[BaseModel]
+        model of the table
+    columns: str | None
+        comma separated column names, every column of the table when None
+
+    return: list[str]
+    """
+    keys = column_metadata(model).keys
+    if not columns:
+        return list(keys)
+    selected = list(dict.fromkeys(name.strip() for name in columns.split(",")))
+    unknown = [name for name in selected if name not in keys]
+    if unknown:
+        raise ValueError(
+            f"Unknown {model.__tablename__} columns {', '.join(unknown)}"
+        )
+    return selected
+
+
+def export_stmt(
+    model: type[BaseModel], columns: list[str], since: datetime | None = None
+) -> Select:
+    """
+    select the exported columns of the rows of a table
+
+    parameters
+    ----------
+    model: type[BaseModel]
+        model of the table
+    columns: list[str]
+        names of the exported columns
+    since: datetime | None
+        only rows updated at or after since are exported when given
+
+    return: Select
+    """
+    stmt = select(*(getattr(model, name) for name in columns))
+    if since is not None:
+        stmt = stmt.where(model.updated >= as_utc(since))
+    return stmt
+
+
+def ndjson_chunk(columns: list[str], rows: Iterable[Row]) -> bytes:
+    """
+    encode rows as NDJSON, one object per line
+
+    parameters
+    ----------
+    columns: list[str]
+        names of the columns of the rows
+    rows: Iterable[Row]
+        exported rows
+
+    return: bytes
+    """
+    return b"".join(
+        orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_UTC_Z) + b"\n"
+        for row in rows
+    )
+
+
+def csv_chunk(rows: Iterable[Sequence]) -> bytes:
+    """
+    encode rows as CSV lines, datetimes in ISO 8601 and None as empty fields
+
+    parameters
+    ----------
+    rows: Iterable[Sequence]
+        exported rows, or the header
+
+    return: bytes
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_chunks(
+    open_session: Callable[[], Awaitable[AsyncSession]],
+    stmt: Select,
+    export_format: ExportFormat,
+    partition_size: int = EXPORT_PARTITION_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    stream the rows selected by the statement as chunks of the export format.
+    The session is opened when the first chunk is requested and closed after
+    the last one, or when the client goes away
+
+    parameters
+    ----------
+    open_session: Callable
+        coroutine function opening the session the rows are read with
+    stmt: Select
+        statement selecting the exported columns
+    export_format: ExportFormat
+        "ndjson" or "csv"
+    partition_size: int
+        rows fetched from the cursor per chunk
+
+    return: AsyncIterator[bytes]
+    """
+    columns = stmt.selected_columns.keys()
+    if export_format == "csv":
+        yield csv_chunk([columns])
+    session = await open_session()
+    try:
+        result = await session.stream(
+            stmt.execution_options(yield_per=partition_size)
+        )
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield csv_chunk(rows)
+            else:
+                yield ndjson_chunk(columns, rows)
+    finally:
+        await session.close()
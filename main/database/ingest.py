@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+This module contains the bulk ingestion of inventory transactions
+
+A batch of stock movements, sent as NDJSON or CSV, is validated in a single
+pass, loaded with COPY into a temporary staging table and merged from there by
+one set based statement that records every transaction in
+inventory_transaction and applies the net delta of each inventory to
+inventory.quantity. Dialects without COPY load the same rows with executemany
+
+usage:
+    with Session(bind=db_engine()) as session:
+        movements = validate_batch(parse_batch(data, "application/x-ndjson"))
+        result = ingest_transactions(session, movements)
+        session.commit()
+"""
+import csv
+import io
+import json
+from collections import Counter
+from main.database.models.basemodel import utc_timestamp
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.models.inventory import Inventory
+from main.utils.uuid7 import uuid7_sql
+from main.validators.inventory_transaction import (
+    InventoryTransactionRequestValidator,
+)
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+from sqlalchemy import bindparam
+from sqlalchemy import Column
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy import Table
+from sqlalchemy import update
+from sqlalchemy import UUID
+from sqlalchemy.orm import Session
+from typing import Any
+from typing import cast
+from typing import NamedTuple
+
+# media types of the supported batch formats
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+CSV_MEDIA_TYPES = ("text/csv",)
+
+# columns of a movement, in the order they are copied into the staging table
+STAGING_COLUMNS = ("quantity", "inventory_id")
+
+# temporary table the batch is copied into, it lives in its own metadata so
+# that neither create_all nor the migrations ever see it
+staging_table = Table(
+    "inventory_transaction_staging",
+    MetaData(),
+    Column("quantity", Integer, nullable=False),
+    Column("inventory_id", UUID, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+movements_adapter = TypeAdapter(list[InventoryTransactionRequestValidator])
+
+
+class BatchValidationError(ValueError):
+    """
+    raised when rows of a batch are malformed, errors holds one entry per
+    invalid row with its zero based index in the batch
+    """
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(f"{len(errors)} invalid rows in batch")
+        self.errors = errors
+
+
+class UnknownInventoryError(LookupError):
+    """
+    raised when movements of a batch reference inventories that do not exist
+    """
+
+    def __init__(self, inventory_ids: list):
+        super().__init__(
+            "Inventory with identifiers "
+            + ", ".join(str(inv_id) for inv_id in inventory_ids)
+            + " not found"
+        )
+        self.inventory_ids = inventory_ids
+
+
+class IngestResult(NamedTuple):
+    """outcome of an ingested batch"""
+
+    transactions: int
+    inventories: int
+
+
+def parse_batch(data: bytes | str, content_type: str) -> list[dict]:
+    """
+    parse a batch of stock movements into a list of rows
+
+    parameters
+    ----------
+    data: bytes | str
+        body of the batch, NDJSON with one movement object per line or CSV
+        with an inventory_id,quantity header
+    content_type: str
+        media type of the batch
+
+    return: list[dict]
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8")
+        except UnicodeDecodeError as err_obj:
+            raise BatchValidationError(
+                [{"row": None, "errors": [{"msg": str(err_obj)}]}]
+            )
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        try:
+            return [json.loads(line) for line in data.splitlines() if line]
+        except json.JSONDecodeError as err_obj:
+            raise BatchValidationError(
+                [{"row": None, "errors": [{"msg": str(err_obj)}]}]
+            )
+    if media_type in CSV_MEDIA_TYPES:
+        return list(csv.DictReader(io.StringIO(data)))
+    raise ValueError(f"Unsupported batch media type {content_type}")
+
+
+def validate_batch(rows: list) -> list[InventoryTransactionRequestValidator]:
+    """
+    validate every row of a batch in one pass
+
+    parameters
+    ----------
+    rows: list
+        parsed rows of the batch
+
+    return: list[InventoryTransactionRequestValidator]
+    """
+    try:
+        return movements_adapter.validate_python(rows)
+    except ValidationError as err_obj:
+        # group the errors by the index of the row that raised them
+        errors: dict[int | str, list] = {}
+        for error in err_obj.errors(include_url=False, include_input=False):
+            row, *loc = error["loc"]
+            errors.setdefault(row, []).append(
+                {"loc": loc, "msg": error["msg"], "type": error["type"]}
+            )
+        raise BatchValidationError(
+            [{"row": row, "errors": errs} for row, errs in errors.items()]
+        )
+
+
+def lock_inventories(session: Session, inventory_ids) -> set:
+    """
+    lock the inventory rows moved by a batch, in id order so that concurrent
+    batches moving the same inventories queue instead of deadlocking
+
+    parameters
+    ----------
+    session: Session
+        session of the ingestion
+    inventory_ids:
+        selectable or collection of the moved inventory ids
+
+    return: set
+        ids of the inventories found
+    """
+    stmt = (
+        select(Inventory.id)
+        .where(Inventory.id.in_(inventory_ids))
+        .order_by(Inventory.id)
+        .with_for_update()
+    )
+    return set(session.scalars(stmt).all())
+
+
+def copy_to_staging(session: Session, rows: list[tuple]) -> None:
+    """
+    create the staging table and COPY the batch rows into it
+
+    parameters
+    ----------
+    session: Session
+        session of the ingestion, bound to a psycopg2 connection
+    rows: list[tuple]
+        rows ordered as STAGING_COLUMNS
+    """
+    connection = session.connection()
+    staging_table.create(connection)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    # the psycopg2 connection checked out by the session
+    driver_connection = cast(Any, connection.connection.driver_connection)
+    cursor = driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging_table.name} ({', '.join(STAGING_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def merge_staging_stmt() -> Select:
+    """
+    INSERT the staged movements into inventory_transaction and UPDATE the
+    stock of every moved inventory by its net delta, both as data modifying
+    CTEs of a single statement. Transaction ids are time ordered UUIDv7 and
+    timestamps the current UTC time, both generated by the database
+
+    return: Select
+        selects the number of moved inventories
+    """
+    recorded_cte = (
+        insert(InventoryTransaction)
+        .from_select(
+            ["id", "quantity", "inventory_id"],
+            select(
+                uuid7_sql(),
+                staging_table.c.quantity,
+                staging_table.c.inventory_id,
+            ),
+        )
+        .returning(
+            InventoryTransaction.inventory_id, InventoryTransaction.quantity
+        )
+        .cte("recorded_transactions")
+    )
+    deltas = (
+        select(
+            recorded_cte.c.inventory_id,
+            func.sum(recorded_cte.c.quantity).label("delta"),
+        )
+        .group_by(recorded_cte.c.inventory_id)
+        .subquery("deltas")
+    )
+    moved_cte = (
+        update(Inventory)
+        .where(Inventory.id == deltas.c.inventory_id)
+        .values(
+            quantity=Inventory.quantity + deltas.c.delta,
+            updated=utc_timestamp(),
+        )
+        .returning(Inventory.id)
+        .cte("moved_inventories")
+    )
+    return select(func.count()).select_from(moved_cte)
+
+
+def ingest_transactions(
+    session: Session, movements: list[InventoryTransactionRequestValidator]
+) -> IngestResult:
+    """
+    record a batch of stock movements and apply their net quantities to the
+    inventory stock. The whole batch is rejected if it moves an inventory that
+    does not exist, stock is not guarded against going below zero since the
+    movements already happened in the warehouse. The caller commits the
+    session
+
+    parameters
+    ----------
+    session: Session
+        session of the ingestion
+    movements: list[InventoryTransactionRequestValidator]
+        validated movements of the batch
+
+    return: IngestResult
+    """
+    if not movements:
+        return IngestResult(0, 0)
+    rows = [
+        (movement.quantity, movement.inventory_id) for movement in movements
+    ]
+    inventory_ids = {row[1] for row in rows}
+
+    if session.get_bind().dialect.name != "postgresql":
+        # load the rows with executemany and apply the deltas grouped by
+        # inventory when COPY is not available
+        found = lock_inventories(session, inventory_ids)
+        if len(found) != len(inventory_ids):
+            raise UnknownInventoryError(sorted(inventory_ids - found))
+        session.execute(
+            insert(InventoryTransaction),
+            [
+                {
+                    "id": InventoryTransaction.id_factory(),
+                    "quantity": quantity,
+                    "inventory_id": inventory_id,
+                }
+                for quantity, inventory_id in rows
+            ],
+        )
+        deltas: Counter = Counter()
+        for quantity, inventory_id in rows:
+            deltas[inventory_id] += quantity
+        session.connection().execute(
+            update(Inventory)
+            .where(Inventory.id == bindparam("inventory_id"))
+            .values(quantity=Inventory.quantity + bindparam("delta")),
+            [
+                {"inventory_id": inventory_id, "delta": delta}
+                for inventory_id, delta in deltas.items()
+            ],
+        )
+        return IngestResult(len(rows), len(deltas))
+
+    copy_to_staging(session, rows)
+    found = lock_inventories(
+        session, select(staging_table.c.inventory_id).distinct()
+    )
+    if len(found) != len(inventory_ids):
+        raise UnknownInventoryError(sorted(inventory_ids - found))
+    moved = session.scalar(merge_staging_stmt())
+    staging_table.drop(session.connection())
+    return IngestResult(len(rows), moved)
@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+"""
+This package contains the alembic environment and versioned schema migrations
+of the inventory-db database
+"""
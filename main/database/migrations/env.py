@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Alembic migration environment of the inventory-db database
+"""
+from alembic import context
+from main.database.base import Base
+from main.database.engine import db_url
+from main.database.models import admin  # noqa: F401
+from main.database.models import api_key  # noqa: F401
+from main.database.models import category  # noqa: F401
+from main.database.models import refresh_token  # noqa: F401
+from main.database.models import revoked_token  # noqa: F401
+from main.validators.config import get_db_env_vars
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+
+# metadata of every orm model, used for autogenerate support
+target_metadata = Base.metadata
+
+
+def migration_url() -> str:
+    """
+    return the database url to migrate, a sqlalchemy.url set in the alembic
+    config takes precedence over the .env database variables
+    """
+    return context.config.get_main_option("sqlalchemy.url") or db_url(
+        get_db_env_vars()
+    )
+
+
+def run_migrations_offline() -> None:
+    """emit the migration sql script without connecting to the database"""
+    context.configure(
+        url=migration_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """run the migrations against a live database connection"""
+    _engine = create_engine(migration_url(), poolclass=NullPool)
+    with _engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    _engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+This module contains helper operations shared between migration scripts
+"""
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy import TextClause
+
+
+def utc_timestamp_default() -> TextClause:
+    """
+    return the current UTC time server default of the created and updated
+    columns in the dialect of the migrated database
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        return text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+    return text("(STRFTIME('%Y-%m-%d %H:%M:%f000', 'NOW'))")
+
+
+def create_index_concurrently(
+    index_name: str, table_name: str, columns: list, **kwargs
+) -> None:
+    """
+    create an index with CREATE INDEX CONCURRENTLY so that writes to the table
+    are not blocked while the index is built
+
+    CONCURRENTLY cannot run inside a transaction block, so the index is
+    created in an autocommit block outside of the migration transaction. A
+    failed concurrent build leaves an INVALID index behind which is dropped
+    before the index is built again, an existing valid index fails the build
+
+    parameters
+    ----------
+    index_name: str
+        name of the index
+    table_name: str
+        name of the indexed table
+    columns: list
+        indexed columns or expressions
+    """
+    with op.get_context().autocommit_block():
+        if invalid_index(index_name):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            index_name,
+            table_name,
+            columns,
+            postgresql_concurrently=True,
+            **kwargs,
+        )
+
+
+def invalid_index(index_name: str) -> bool:
+    """
+    return True when a postgresql index of the name was left INVALID by a
+    failed CREATE INDEX CONCURRENTLY
+
+    parameters
+    ----------
+    index_name: str
+        name of the index
+
+    return: bool
+    """
+    context = op.get_context()
+    if context.as_sql or context.dialect.name != "postgresql":
+        return False
+    return bool(
+        op.get_bind()
+        .execute(
+            text(
+                "SELECT NOT pg_index.indisvalid FROM pg_index "
+                "JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+                "WHERE pg_class.relname = :index_name "
+                "AND pg_class.relnamespace = current_schema()::regnamespace"
+            ),
+            {"index_name": index_name},
+        )
+        .scalar()
+    )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """
+    drop an index with DROP INDEX CONCURRENTLY outside of the migration
+    transaction
+
+    parameters
+    ----------
+    index_name: str
+        name of the index
+    table_name: str
+        name of the indexed table
+    """
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table_name,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
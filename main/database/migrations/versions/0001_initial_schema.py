@@ -0,0 +1,102 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def base_columns() -> list:
+    """return the id, created and updated columns shared by every table"""
+    return [
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "admin",
+        sa.Column("email", sqlalchemy_utils.EmailType(), nullable=False),
+        sa.Column(
+            "password",
+            sqlalchemy_utils.PasswordType(schemes=["pbkdf2_sha512"]),
+            nullable=False,
+        ),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        *base_columns(),
+        sa.PrimaryKeyConstraint("id", name="admin_pkey"),
+        sa.UniqueConstraint("email", name="admin_email_key"),
+    )
+    op.create_table(
+        "category",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("code", sa.String(length=5), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        *base_columns(),
+        sa.PrimaryKeyConstraint("id", name="category_pkey"),
+        sa.UniqueConstraint("code", name="category_code_key"),
+        sa.UniqueConstraint("name", name="category_name_key"),
+    )
+    op.create_table(
+        "product",
+        sa.Column("name", sa.String(length=30), nullable=False),
+        sa.Column("sku", sa.String(length=8), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("category_id", sa.UUID(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        *base_columns(),
+        sa.ForeignKeyConstraint(
+            ["category_id"], ["category.id"], name="product_category_id_fkey"
+        ),
+        sa.PrimaryKeyConstraint("id", name="product_pkey"),
+        sa.UniqueConstraint("name", name="product_name_key"),
+        sa.UniqueConstraint("sku", name="product_sku_key"),
+    )
+    op.create_table(
+        "inventory",
+        sa.Column("country", sa.String(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.UUID(), nullable=False),
+        *base_columns(),
+        sa.ForeignKeyConstraint(
+            ["product_id"], ["product.id"], name="inventory_product_id_fkey"
+        ),
+        sa.PrimaryKeyConstraint("id", name="inventory_pkey"),
+    )
+    op.create_table(
+        "inventory_transaction",
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("inventory_id", sa.UUID(), nullable=False),
+        *base_columns(),
+        sa.ForeignKeyConstraint(
+            ["inventory_id"],
+            ["inventory.id"],
+            name="inventory_transaction_inventory_id_fkey",
+        ),
+        sa.PrimaryKeyConstraint("id", name="inventory_transaction_pkey"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_transaction")
+    op.drop_table("inventory")
+    op.drop_table("product")
+    op.drop_table("category")
+    op.drop_table("admin")
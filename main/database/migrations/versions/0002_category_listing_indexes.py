@@ -0,0 +1,42 @@
+"""category listing indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from main.database.migrations.helpers import create_index_concurrently
+from main.database.migrations.helpers import drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(
+        "ix_category_created_id", "category", ["created", "id"]
+    )
+    create_index_concurrently(
+        "ix_category_name_pattern",
+        "category",
+        ["name"],
+        postgresql_ops={"name": "varchar_pattern_ops"},
+    )
+    create_index_concurrently(
+        "ix_category_code_pattern",
+        "category",
+        ["code"],
+        postgresql_ops={"code": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_category_code_pattern", "category")
+    drop_index_concurrently("ix_category_name_pattern", "category")
+    drop_index_concurrently("ix_category_created_id", "category")
@@ -0,0 +1,53 @@
+"""foreign key and lookup indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from main.database.migrations.helpers import create_index_concurrently
+from main.database.migrations.helpers import drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(
+        "ix_product_category_id", "product", ["category_id"]
+    )
+    create_index_concurrently(
+        "ix_inventory_product_id_country",
+        "inventory",
+        ["product_id", "country"],
+        unique=True,
+    )
+    create_index_concurrently(
+        "ix_inventory_transaction_inventory_id_created",
+        "inventory_transaction",
+        ["inventory_id", "created"],
+    )
+    create_index_concurrently(
+        "ix_inventory_transaction_created_brin",
+        "inventory_transaction",
+        ["created"],
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently(
+        "ix_inventory_transaction_created_brin", "inventory_transaction"
+    )
+    drop_index_concurrently(
+        "ix_inventory_transaction_inventory_id_created",
+        "inventory_transaction",
+    )
+    drop_index_concurrently("ix_inventory_product_id_country", "inventory")
+    drop_index_concurrently("ix_product_category_id", "product")
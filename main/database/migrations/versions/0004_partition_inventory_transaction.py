@@ -0,0 +1,152 @@
+"""partition inventory_transaction by month on created
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+The existing table is renamed, replaced by a table range partitioned on
+created with a default partition and monthly partitions from the oldest row up
+to three months ahead, and its rows are moved over. Indexes on a partitioned
+table cannot be built CONCURRENTLY, they are created on the new table before
+it receives traffic. Partitioning is a postgresql feature, other dialects keep
+the plain table
+
+Lock window: the rename and the creation of the new table and its partitions
+hold an ACCESS EXCLUSIVE lock on the table in the migration transaction, which
+only runs DDL and commits within milliseconds. The rows are then moved in
+autocommit batches of MOVE_BATCH_SIZE rows, each deleted from the renamed
+table and inserted into the new one in a single statement, so writes go on
+against the new table during the move and reads only miss the history that
+has not been moved yet. The partition DDL is kept in this revision so that it
+does not change with the partition maintenance of the application
+
+"""
+from datetime import date
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "inventory_transaction"
+OLD_TABLE = f"{TABLE}_old"
+INDEXES: dict[str, tuple[list[str], dict[str, Any]]] = {
+    "ix_inventory_transaction_inventory_id_created": (
+        ["inventory_id", "created"],
+        {},
+    ),
+    "ix_inventory_transaction_created_brin": (
+        ["created"],
+        {"postgresql_using": "brin"},
+    ),
+}
+COLUMNS = "id, created, updated, quantity, inventory_id"
+# rows moved per transaction from the renamed table
+MOVE_BATCH_SIZE = 10_000
+# future months partitions are created for
+MONTHS_AHEAD = 3
+
+
+def set_table_aside() -> None:
+    """
+    rename the current table together with its primary key and indexes, whose
+    names are unique per schema
+    """
+    op.rename_table(TABLE, OLD_TABLE)
+    op.execute(
+        f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT "
+        f"{TABLE}_pkey TO {OLD_TABLE}_pkey"
+    )
+    for index_name in INDEXES:
+        op.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_old")
+
+
+def create_table(primary_key: list, **kwargs) -> None:
+    """create the inventory_transaction table and its indexes"""
+    op.create_table(
+        TABLE,
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("inventory_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["inventory_id"],
+            ["inventory.id"],
+            name="inventory_transaction_inventory_id_fkey",
+        ),
+        sa.PrimaryKeyConstraint(*primary_key, name=f"{TABLE}_pkey"),
+        **kwargs,
+    )
+    for index_name, (columns, index_kwargs) in INDEXES.items():
+        op.create_index(index_name, TABLE, columns, **index_kwargs)
+
+
+def add_months(month: date, months: int) -> date:
+    """return the first day of the month months after month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_partitions(first_month: date | None) -> None:
+    """
+    create the default partition and the monthly partitions from first_month,
+    the current month by default, up to MONTHS_AHEAD months ahead
+    """
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    current = date.today().replace(day=1)
+    month = (first_month or current).replace(day=1)
+    while month <= add_months(current, MONTHS_AHEAD):
+        upper = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month.year:04}{month.month:02} "
+            f"PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+
+def move_rows() -> None:
+    """
+    move the rows of the renamed table into the new one in autocommit
+    batches, committing the DDL of the migration transaction first, and drop
+    the renamed table once empty
+    """
+    bind = op.get_bind()
+    move = sa.text(
+        f"WITH moved AS (DELETE FROM {OLD_TABLE} WHERE id IN "
+        f"(SELECT id FROM {OLD_TABLE} LIMIT :batch_size) "
+        f"RETURNING {COLUMNS}) "
+        f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM moved"
+    )
+    with op.get_context().autocommit_block():
+        while bind.execute(move, {"batch_size": MOVE_BATCH_SIZE}).rowcount:
+            pass
+        op.drop_table(OLD_TABLE)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    set_table_aside()
+    create_table(["id", "created"], postgresql_partition_by="RANGE (created)")
+    oldest = bind.scalar(sa.text(f"SELECT min(created) FROM {OLD_TABLE}"))
+    create_partitions(oldest.date() if oldest else None)
+    move_rows()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    set_table_aside()
+    create_table(["id"])
+    move_rows()
@@ -0,0 +1,43 @@
+"""server side created and updated timestamps
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from main.database.migrations.helpers import utc_timestamp_default
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tables holding the created and updated columns of the BaseModel
+TABLES = ("admin", "category", "product", "inventory", "inventory_transaction")
+
+
+def set_timestamp_defaults(default) -> None:
+    """set, or drop with None, the defaults of the timestamp columns"""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in ("created", "updated"):
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=False,
+                    server_default=default,
+                )
+
+
+def upgrade() -> None:
+    set_timestamp_defaults(utc_timestamp_default())
+
+
+def downgrade() -> None:
+    set_timestamp_defaults(None)
@@ -0,0 +1,55 @@
+"""revoked access tokens
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from main.database.migrations.helpers import utc_timestamp_default
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_token",
+        sa.Column("jti", sa.String(), nullable=False),
+        sa.Column("expires", sa.DateTime(), nullable=False),
+        sa.Column("admin_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["admin_id"],
+            ["admin.id"],
+            name="revoked_token_admin_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name="revoked_token_pkey"),
+        sa.UniqueConstraint("jti", name="revoked_token_jti_key"),
+    )
+    op.create_index("ix_revoked_token_expires", "revoked_token", ["expires"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revoked_token_expires", table_name="revoked_token")
+    op.drop_table("revoked_token")
@@ -0,0 +1,59 @@
+"""refresh tokens
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from main.database.migrations.helpers import utc_timestamp_default
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "refresh_token",
+        sa.Column("token_hash", sa.String(), nullable=False),
+        sa.Column("family_id", sa.UUID(), nullable=False),
+        sa.Column("expires", sa.DateTime(), nullable=False),
+        sa.Column("revoked", sa.Boolean(), nullable=False),
+        sa.Column("admin_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["admin_id"],
+            ["admin.id"],
+            name="refresh_token_admin_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name="refresh_token_pkey"),
+        sa.UniqueConstraint("token_hash", name="refresh_token_token_hash_key"),
+    )
+    op.create_index("ix_refresh_token_admin_id", "refresh_token", ["admin_id"])
+    op.create_index("ix_refresh_token_expires", "refresh_token", ["expires"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_token_expires", table_name="refresh_token")
+    op.drop_index("ix_refresh_token_admin_id", table_name="refresh_token")
+    op.drop_table("refresh_token")
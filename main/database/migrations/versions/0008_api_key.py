@@ -0,0 +1,49 @@
+"""service api keys
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from main.database.migrations.helpers import utc_timestamp_default
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "api_key",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("key_id", sa.String(), nullable=False),
+        sa.Column("secret_hash", sa.String(), nullable=False),
+        sa.Column("scopes", sa.String(), nullable=False),
+        sa.Column("revoked", sa.Boolean(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated",
+            sa.DateTime(),
+            server_default=utc_timestamp_default(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", name="api_key_pkey"),
+        sa.UniqueConstraint("key_id", name="api_key_key_id_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("api_key")
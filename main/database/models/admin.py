@@ -7,10 +7,9 @@ from main.database.models.basemodel import BaseModel
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy_utils import EmailType
+from sqlalchemy_utils import Password
 from sqlalchemy_utils import PasswordType
 
-# from sqlalchemy_utils import Password
-
 
 class Admin(BaseModel):
     """inventory database administrator model"""
@@ -18,7 +17,7 @@ class Admin(BaseModel):
     __tablename__ = "admin"
 
     email: Mapped[str] = mapped_column(EmailType, nullable=False, unique=True)
-    password: Mapped[str] = mapped_column(
+    password: Mapped[Password] = mapped_column(
         PasswordType(schemes=["pbkdf2_sha512"]), nullable=False
     )
     first_name: Mapped[str] = mapped_column(nullable=False)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+This module contains the sqlalchemy model of the API keys of the service
+clients
+"""
+from main.database.models.basemodel import BaseModel
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class ApiKey(BaseModel):
+    """
+    API key of a service client, sent as "<key_id>.<secret>". Only the
+    HMAC-SHA256 of the secret is stored
+    """
+
+    __tablename__ = "api_key"
+
+    name: Mapped[str] = mapped_column(nullable=False)
+    key_id: Mapped[str] = mapped_column(nullable=False, unique=True)
+    secret_hash: Mapped[str] = mapped_column(nullable=False)
+    # space separated scopes granted to the key
+    scopes: Mapped[str] = mapped_column(nullable=False)
+    revoked: Mapped[bool] = mapped_column(nullable=False, default=False)
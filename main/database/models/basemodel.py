@@ -5,39 +5,198 @@ and methods between all database models
 """
 from datetime import datetime
 from datetime import timezone
+from functools import lru_cache
+from itertools import groupby
 from sqlalchemy import DateTime
 from sqlalchemy import inspect
 from sqlalchemy import UUID
-from uuid import uuid4
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+import uuid
+from main.utils.uuid7 import uuid7
+from sqlalchemy.orm import declared_attr
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy_utils import force_auto_coercion
+from typing import Iterable
+from typing import NamedTuple
 
 from ..base import Base
 
 
+class utc_timestamp(FunctionElement):
+    """
+    SQL expression of the current UTC time of the database, generating the
+    created and updated values in the database makes the values returned by
+    INSERT/UPDATE ... RETURNING the authoritative ones
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_timestamp)
+def compile_utc_timestamp(element, compiler, **kwargs) -> str:
+    """current UTC time of the database"""
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_timestamp, "sqlite")
+def compile_sqlite_utc_timestamp(element, compiler, **kwargs) -> str:
+    """
+    current UTC time to the millisecond, CURRENT_TIMESTAMP has seconds. The
+    text is padded to the microsecond format the DateTime type stores so that
+    generated and bound values compare equal
+    """
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'NOW')"
+
+
+@compiles(utc_timestamp, "postgresql")
+def compile_pg_utc_timestamp(element, compiler, **kwargs) -> str:
+    """current UTC time of the transaction, as timestamp without time zone"""
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+def utc_now() -> datetime:
+    """
+    return the current UTC time without tzinfo, as stored in the timestamp
+    without time zone columns
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def as_utc(value: datetime) -> datetime:
+    """convert an aware datetime to the naive UTC time stored in the columns"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def format_datetime(value: datetime) -> str:
+    """return the text of a datetime in the dictionaries of the models"""
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return value.isoformat(timespec="seconds")
+
+
+class ColumnMetadata(NamedTuple):
+    """column attributes of a model, read once per class"""
+
+    keys: tuple[str, ...]
+    # positions of the DateTime columns in keys
+    datetime_indexes: tuple[int, ...]
+
+
+@lru_cache
+def column_metadata(model: type["BaseModel"]) -> ColumnMetadata:
+    """
+    return the column attributes of a model class
+
+    parameters
+    ----------
+    model: type[BaseModel]
+        mapped class
+
+    return: ColumnMetadata
+    """
+    column_attrs = inspect(model).column_attrs
+    return ColumnMetadata(
+        tuple(attr.key for attr in column_attrs),
+        tuple(
+            index
+            for index, attr in enumerate(column_attrs)
+            if isinstance(attr.columns[0].type, DateTime)
+        ),
+    )
+
+
+def column_values(metadata: ColumnMetadata, obj: "BaseModel") -> list:
+    """
+    return the column values of an object in the order of metadata.keys,
+    datetimes formatted as text
+
+    parameters
+    ----------
+    metadata: ColumnMetadata
+        column attributes of the class of the object
+    obj: BaseModel
+        model object
+    """
+    # loaded values are read from the instance dictionary, skipping the
+    # attribute instrumentation, the others are loaded by getattr
+    loaded = obj.__dict__
+    values = [
+        loaded[key] if key in loaded else getattr(obj, key)
+        for key in metadata.keys
+    ]
+    for index in metadata.datetime_indexes:
+        if values[index] is not None:
+            values[index] = format_datetime(values[index])
+    return values
+
+
+def to_dicts(objs: Iterable["BaseModel"]) -> list[dict]:
+    """
+    get the dictionary representations of model objects, the same as their
+    to_dict, with the column metadata looked up once per class
+
+    parameters
+    ----------
+    objs: Iterable[BaseModel]
+        model objects
+
+    return: list[dict]
+    """
+    dicts: list[dict] = []
+    # consecutive objects of a class share its metadata
+    for model, group in groupby(objs, type):
+        metadata = column_metadata(model)
+        dicts.extend(
+            dict(zip(metadata.keys, column_values(metadata, obj)))
+            for obj in group
+        )
+    return dicts
+
+
 class BaseModel(Base):
     """BaseModel class for all tables"""
 
     force_auto_coercion()
     __abstract__ = True
 
-    id: Mapped[UUID] = mapped_column(
-        UUID,
-        primary_key=True,
-        nullable=False,
-        default=uuid4,
-    )
-    created: Mapped[DateTime] = mapped_column(
+    @staticmethod
+    def id_factory() -> uuid.UUID:
+        """
+        generate the id of a new row, time ordered so inserts append to the
+        primary key index. A model may set its own, e.g.
+        id_factory = staticmethod(uuid4)
+        """
+        return uuid7()
+
+    @declared_attr
+    def id(cls) -> Mapped[uuid.UUID]:
+        """primary key column defaulting to an id from the model id_factory"""
+        return mapped_column(
+            UUID,
+            primary_key=True,
+            nullable=False,
+            default=cls.id_factory,
+        )
+
+    # timestamps are generated by the database and fetched back with
+    # RETURNING by the flush that writes the row
+    __mapper_args__ = {"eager_defaults": True}
+
+    created: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
-        default=datetime.now(timezone.utc),
+        server_default=utc_timestamp(),
     )
-    updated: Mapped[DateTime] = mapped_column(
+    updated: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        server_default=utc_timestamp(),
+        onupdate=utc_timestamp(),
     )
 
     def __init__(self, *args, **kwargs) -> None:
@@ -54,21 +213,19 @@ class BaseModel(Base):
         """
         get dictionary representation of an initialized model
         """
-        return {
-            c.key: (
-                getattr(self, c.key).strftime("%Y-%m-%dT%H:%M:%S")
-                if isinstance(getattr(self, c.key), datetime)
-                else getattr(self, c.key)
-            )
-            for c in inspect(self).mapper.column_attrs
-        }
+        metadata = column_metadata(type(self))
+        return dict(zip(metadata.keys, column_values(metadata, self)))
 
     def __repr__(self) -> str:
         """
         return a string representation of the class that can be reinstantiated
         """
-        # convert dictionary to a string of format (k=v)
-        args_tup = ", ".join([f"{k}={v}" for k, v in self.to_dict().items()])
+        metadata = column_metadata(type(self))
+        values = column_values(metadata, self)
+        # convert the column values to a string of format (k=v)
+        args_tup = ", ".join(
+            [f"{k}={v}" for k, v in zip(metadata.keys, values)]
+        )
         return f"{type(self).__name__}({args_tup})"
 
     def __str__(self) -> str:
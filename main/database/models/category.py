@@ -5,6 +5,7 @@ databse
 """
 from main.database.models.basemodel import BaseModel
 from main.database.models.product import Product
+from sqlalchemy import Index
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -15,6 +16,22 @@ class Category(BaseModel):
     """product category inventory model"""
 
     __tablename__ = "category"
+    __table_args__ = (
+        # keyset pagination order of the category listing
+        Index("ix_category_created_id", "created", "id"),
+        # prefix filters, pattern ops let LIKE 'prefix%' use the index in
+        # any collation
+        Index(
+            "ix_category_name_pattern",
+            "name",
+            postgresql_ops={"name": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_category_code_pattern",
+            "code",
+            postgresql_ops={"code": "varchar_pattern_ops"},
+        ),
+    )
 
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
     code: Mapped[str] = mapped_column(String(5), nullable=False, unique=True)
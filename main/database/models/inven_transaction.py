@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 """
 This module contains the class definition of inventory transaction orm model
+
+On postgresql the inventory_transaction table is range partitioned on created,
+one partition per month by default, see main.database.partitions. Postgresql
+requires the partition key in the primary key of the table, so the table key
+is (id, created) while the orm keeps identifying a transaction by its id
 """
+from datetime import datetime
+from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import PrimaryKeyConstraint
 from sqlalchemy import UUID
 from main.database.models.basemodel import BaseModel
+from main.database.models.basemodel import utc_timestamp
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
@@ -14,7 +24,35 @@ class InventoryTransaction(BaseModel):
     """Model to hold record of each inventory transaction"""
 
     __tablename__ = "inventory_transaction"
+    __table_args__ = (
+        # lookups by id lead the primary key index
+        PrimaryKeyConstraint("id", "created"),
+        # transaction history of an inventory, the index also serves the
+        # inventory_id foreign key
+        Index(
+            "ix_inventory_transaction_inventory_id_created",
+            "inventory_id",
+            "created",
+        ),
+        # the table is append only so created follows the physical row order
+        Index(
+            "ix_inventory_transaction_created_brin",
+            "created",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (created)"},
+    )
 
+    # identify transactions by id alone within the orm
+    __mapper_args__ = {"primary_key": ["id"], "eager_defaults": True}
+
+    # partition key, part of the table primary key
+    created: Mapped[datetime] = mapped_column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        server_default=utc_timestamp(),
+    )
     quantity: Mapped[int] = mapped_column(nullable=False)
     inventory_id: Mapped[UUID] = mapped_column(ForeignKey("inventory.id"))
     inventory: Mapped["Inventory"] = relationship(  # type: ignore
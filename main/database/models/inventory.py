@@ -6,6 +6,7 @@ from main.database.models.basemodel import BaseModel
 from main.database.models.inven_transaction import InventoryTransaction
 from sqlalchemy import UUID
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
@@ -15,6 +16,16 @@ class Inventory(BaseModel):
     """Model to hold record of all product inventories"""
 
     __tablename__ = "inventory"
+    __table_args__ = (
+        # one inventory per product and country, the index also serves the
+        # product_id foreign key
+        Index(
+            "ix_inventory_product_id_country",
+            "product_id",
+            "country",
+            unique=True,
+        ),
+    )
 
     country: Mapped[str] = mapped_column(nullable=False)
     quantity: Mapped[int] = mapped_column(nullable=False)
@@ -21,7 +21,9 @@ class Product(BaseModel):
     sku: Mapped[str] = mapped_column(String(8), nullable=False, unique=True)
     description: Mapped[str] = mapped_column(nullable=True)
     price: Mapped[float] = mapped_column(nullable=False)
-    category_id: Mapped[UUID] = mapped_column(ForeignKey("category.id"))
+    category_id: Mapped[UUID] = mapped_column(
+        ForeignKey("category.id"), index=True
+    )
     is_active: Mapped[bool] = mapped_column(default=True)
     category: Mapped["Category"] = relationship(back_populates="products")  # type: ignore
     inventories: Mapped[list["Inventory"]] = relationship(
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+This module contains the sqlalchemy model of the refresh tokens exchanged for
+new access tokens
+"""
+from datetime import datetime
+from main.database.models.basemodel import BaseModel
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import UUID
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class RefreshToken(BaseModel):
+    """
+    refresh token of an admin, only the sha256 hash of the token is stored.
+    Every refresh replaces the token by a new one of the same family, a
+    replaced token presented again revokes its whole family
+    """
+
+    __tablename__ = "refresh_token"
+    __table_args__ = (
+        # revocation of the tokens of an admin
+        Index("ix_refresh_token_admin_id", "admin_id"),
+        # serves the purge of the expired tokens
+        Index("ix_refresh_token_expires", "expires"),
+    )
+
+    # the unique constraint is the lookup index of a presented token
+    token_hash: Mapped[str] = mapped_column(nullable=False, unique=True)
+    family_id: Mapped[UUID] = mapped_column(UUID, nullable=False)
+    expires: Mapped[datetime] = mapped_column(nullable=False)
+    revoked: Mapped[bool] = mapped_column(nullable=False, default=False)
+    admin_id: Mapped[UUID] = mapped_column(
+        ForeignKey("admin.id", ondelete="CASCADE")
+    )
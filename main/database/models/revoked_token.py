@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+This module contains the sqlalchemy model of the access tokens revoked before
+their expiration
+"""
+from datetime import datetime
+from main.database.models.basemodel import BaseModel
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import UUID
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+
+class RevokedToken(BaseModel):
+    """access token rejected until it expires, identified by its jti claim"""
+
+    __tablename__ = "revoked_token"
+    __table_args__ = (
+        # serves the purge of the tokens that expired anyway
+        Index("ix_revoked_token_expires", "expires"),
+    )
+
+    jti: Mapped[str] = mapped_column(nullable=False, unique=True)
+    expires: Mapped[datetime] = mapped_column(nullable=False)
+    admin_id: Mapped[UUID] = mapped_column(
+        ForeignKey("admin.id", ondelete="CASCADE")
+    )
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+This module contains the change notifications that keep the in-process caches
+of every worker in sync
+
+A write path publishes the table and ids of the rows it changed within its
+transaction. On postgresql they are sent with pg_notify, which postgres only
+delivers once the transaction commits, and every worker runs a background task
+LISTENing on the channel that hands the changes to the subscribers of the
+table, the caches evicting the matching entries. The changes are also handed
+to the subscribers of the writing process right after its commit, so the
+writer never reads its own stale entries. A notification is delivered as soon
+as the primary commits, possibly before the replicas replay the write, so the
+caches refill evicted entries from the primary, never from a replica
+
+usage:
+    @subscribe("category")
+    def evict_categories(ids: list[str] | None):
+        ...
+
+    await publish_change(session, "category", [cat_obj.id])
+    await session.commit()
+"""
+import asyncio
+import asyncpg
+import json
+import logging
+from collections import defaultdict
+from main.database.engine import db_url
+from main.validators.config import get_db_env_vars
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# channel the changes are published on
+CHANNEL = "inventory_changes"
+# postgres rejects notification payloads of 8000 bytes or more
+MAX_PAYLOAD_SIZE = 7900
+# key of the changes published by a session in Session.info
+PENDING_CHANGES = "pending_changes"
+
+# callbacks of every table, called with the changed ids, or with None when
+# any row of the table may have changed
+_subscribers: dict[str, list[Callable]] = defaultdict(list)
+
+
+def subscribe(table: str):
+    """
+    register the decorated function to be called with the ids of the rows of
+    the table changed by any worker, or with None when notifications may
+    have been missed
+
+    parameters
+    ----------
+    table: str
+        name of the table
+    """
+
+    def register(callback: Callable[[list[str] | None], None]):
+        _subscribers[table].append(callback)
+        return callback
+
+    return register
+
+
+def dispatch(table: str, ids: list[str] | None) -> None:
+    """
+    hand a change to the subscribers of the table, a failing subscriber does
+    not prevent the others from running
+
+    parameters
+    ----------
+    table: str
+        name of the changed table
+    ids: list[str] | None
+        ids of the changed rows, None for the whole table
+    """
+    for callback in _subscribers.get(table, ()):
+        try:
+            callback(ids)
+        except Exception:
+            logger.exception("change subscriber of %s failed", table)
+
+
+def dispatch_all() -> None:
+    """
+    tell every subscriber that any row may have changed, used when
+    notifications may have been missed
+    """
+    for table in list(_subscribers):
+        dispatch(table, None)
+
+
+def change_payloads(table: str, ids: Iterable) -> list[str]:
+    """
+    encode a change into notification payloads, split so that each one fits
+    the payload limit of postgres
+
+    parameters
+    ----------
+    table: str
+        name of the changed table
+    ids: Iterable
+        ids of the changed rows
+
+    return: list[str]
+    """
+    payloads: list[str] = []
+    chunk: list[str] = []
+    # size of {"table": "...", "ids": []} and of one quoted id with its comma
+    size = len(json.dumps({"table": table, "ids": []}))
+    for id_ in map(str, ids):
+        if chunk and size + len(id_) + 4 > MAX_PAYLOAD_SIZE:
+            payloads.append(json.dumps({"table": table, "ids": chunk}))
+            chunk = []
+            size = len(json.dumps({"table": table, "ids": []}))
+        chunk.append(id_)
+        size += len(id_) + 4
+    if chunk:
+        payloads.append(json.dumps({"table": table, "ids": chunk}))
+    return payloads
+
+
+async def publish_change(
+    session: AsyncSession, table: str, ids: Iterable
+) -> None:
+    """
+    publish the rows of the table changed in the transaction of the session,
+    they are delivered to the other workers and to the subscribers of this
+    process once the transaction commits, and dropped if it rolls back
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    table: str
+        name of the changed table
+    ids: Iterable
+        ids of the changed rows
+    """
+    ids = [str(id_) for id_ in ids]
+    if not ids:
+        return
+    # begin the transaction of the session if needed, its commit or rollback
+    # is what delivers or drops the change
+    await session.connection()
+    session.info.setdefault(PENDING_CHANGES, []).append((table, ids))
+    if session.bind.dialect.name != "postgresql":
+        return
+    for payload in change_payloads(table, ids):
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": payload},
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def dispatch_committed_changes(session: Session) -> None:
+    """hand the changes committed by a session to the local subscribers"""
+    for table, ids in session.info.pop(PENDING_CHANGES, ()):
+        dispatch(table, ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_rolled_back_changes(session: Session) -> None:
+    """forget the changes of a transaction that was rolled back"""
+    session.info.pop(PENDING_CHANGES, None)
+
+
+def handle_notification(connection, pid, channel, payload: str) -> None:
+    """asyncpg listener callback dispatching a received change"""
+    try:
+        change = json.loads(payload)
+        dispatch(change["table"], change["ids"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("ignored malformed change notification %r", payload)
+
+
+async def connect_listener() -> asyncpg.Connection:
+    """
+    open the connection LISTENing for changes, notifications are not
+    replicated so it always connects to the primary database
+    """
+    return await asyncpg.connect(db_url(get_db_env_vars()))
+
+
+async def listen(
+    connect: Callable[[], Awaitable] = connect_listener,
+    retry_interval: float = 1.0,
+    max_retry_interval: float = 30.0,
+    health_check_interval: float = 30.0,
+) -> None:
+    """
+    receive the changes published by every worker until cancelled. The
+    connection is checked periodically and reopened with a growing delay when
+    it is lost, and since changes may have been missed in the meantime every
+    subscriber is then told that its whole table may have changed
+
+    parameters
+    ----------
+    connect: Callable
+        coroutine function opening an asyncpg connection
+    retry_interval: float
+        seconds waited before the first reconnection attempt
+    max_retry_interval: float
+        upper bound of the delay between reconnection attempts
+    health_check_interval: float
+        seconds between two checks of an idle connection
+    """
+    delay = retry_interval
+    connected_before = False
+    while True:
+        connection = None
+        try:
+            connection = await connect()
+            await connection.add_listener(CHANNEL, handle_notification)
+        except Exception as err_obj:
+            # asyncpg raises its own errors besides OSError, e.g. when the
+            # authentication is refused
+            logger.warning("change listener cannot connect: %s", err_obj)
+            if connection is not None:
+                connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_interval)
+            continue
+
+        if connected_before:
+            dispatch_all()
+        connected_before = True
+        delay = retry_interval
+        try:
+            while True:
+                await asyncio.sleep(health_check_interval)
+                # a connection dropped without a FIN is only noticed on use
+                await asyncio.wait_for(
+                    connection.execute("SELECT 1"), health_check_interval
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as err_obj:
+            logger.warning("change listener connection lost: %s", err_obj)
+        finally:
+            if not connection.is_closed():
+                connection.terminate()
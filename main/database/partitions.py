@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+This module contains the maintenance of the monthly range partitions of the
+postgresql inventory_transaction table
+
+Partitions are named inventory_transaction_pYYYYMM after the first month they
+hold. Future partitions are created ahead of time so that inserts never land
+in the default partition, rows that did land there are moved into the
+partition of their month when it is created, and partitions older than the
+retention period are detached and either moved to an archive schema or
+dropped
+
+usage: python -m main.database.partitions [--months-ahead N]
+       [--retain-months N] [--archive-schema SCHEMA | --drop]
+"""
+import argparse
+import re
+from datetime import date
+from sqlalchemy import Connection
+from sqlalchemy import text
+
+
+# name of the partitioned table
+PARENT_TABLE = "inventory_transaction"
+# partition holding rows outside of every monthly range
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_PATTERN = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+IDENTIFIER_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def month_start(day: date) -> date:
+    """return the first day of the month of day"""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """return the first day of the month months after month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """return the name of the partition holding the rows of month"""
+    return f"{PARENT_TABLE}_p{month.year:04}{month.month:02}"
+
+
+def partition_month(name: str) -> date | None:
+    """return the month held by a partition name, None for other tables"""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(month: date) -> str:
+    """
+    return the statement creating the partition of month, covering
+    [month, next month) on created
+    """
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def create_detached_partition_sql(month: date) -> str:
+    """
+    return the statement creating the partition of month as a standalone
+    table, to be filled before it is attached
+    """
+    return (
+        f"CREATE TABLE {partition_name(month)} "
+        f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+
+
+def move_default_rows_sql(month: date) -> str:
+    """
+    return the statement moving the rows of month out of the default
+    partition into the partition of month
+    """
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    return (
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE created >= '{lower}' AND created < '{upper}' RETURNING *) "
+        f"INSERT INTO {partition_name(month)} SELECT * FROM moved"
+    )
+
+
+def attach_partition_sql(month: date) -> str:
+    """return the statement attaching the partition of month"""
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    return (
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition_name(month)} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def create_partition(connection: Connection, month: date) -> None:
+    """
+    create the partition of month unless it exists. Attaching a range to the
+    parent table fails while the default partition holds rows of the range,
+    so those rows are first moved into the new partition, which is attached
+    once filled
+
+    parameters
+    ----------
+    connection: Connection
+        connection to the postgresql database
+    month: date
+        first day of the month held by the partition
+    """
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    exists, default_rows = connection.execute(
+        text(
+            "SELECT to_regclass(:name) IS NOT NULL, EXISTS (SELECT 1 "
+            f"FROM {DEFAULT_PARTITION} "
+            "WHERE created >= :lower AND created < :upper)"
+        ),
+        {"name": partition_name(month), "lower": lower, "upper": upper},
+    ).one()
+    if exists:
+        return
+    if not default_rows:
+        connection.execute(text(create_partition_sql(month)))
+        return
+    connection.execute(text(create_detached_partition_sql(month)))
+    connection.execute(text(move_default_rows_sql(month)))
+    connection.execute(text(attach_partition_sql(month)))
+
+
+def create_default_partition_sql() -> str:
+    """return the statement creating the default partition"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+        f"PARTITION OF {PARENT_TABLE} DEFAULT"
+    )
+
+
+def attached_partitions(connection: Connection) -> list[str]:
+    """return the names of the partitions attached to the parent table"""
+    return list(
+        connection.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :parent"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+    )
+
+
+def ensure_partitions(
+    connection: Connection,
+    months_ahead: int = 3,
+    first_month: date | None = None,
+    today: date | None = None,
+) -> list[str]:
+    """
+    create the default partition and the monthly partitions from first_month,
+    the current month by default, up to months_ahead months in the future.
+    Rows of those months held by the default partition are moved into their
+    monthly partition
+
+    parameters
+    ----------
+    connection: Connection
+        connection to the postgresql database
+    months_ahead: int
+        number of future months to create partitions for
+    first_month: date | None
+        first month to create a partition for
+    today: date | None
+        current date, used by tests
+
+    return: list
+        names of the monthly partitions that now exist in the range
+    """
+    current = month_start(today or date.today())
+    month = month_start(first_month or current)
+    connection.execute(text(create_default_partition_sql()))
+    names = []
+    while month <= add_months(current, months_ahead):
+        create_partition(connection, month)
+        names.append(partition_name(month))
+        month = add_months(month, 1)
+    return names
+
+
+def expired_partitions(
+    names: list[str], retain_months: int, today: date | None = None
+) -> list[str]:
+    """
+    return the monthly partitions among names that only hold rows older than
+    the retention period
+
+    parameters
+    ----------
+    names: list
+        partition names
+    retain_months: int
+        number of past months, besides the current one, to keep attached
+    today: date | None
+        current date, used by tests
+    """
+    cutoff = add_months(month_start(today or date.today()), -retain_months)
+    return sorted(
+        name
+        for name in names
+        if (month := partition_month(name)) and month < cutoff
+    )
+
+
+def detach_partitions(
+    connection: Connection,
+    retain_months: int = 24,
+    archive_schema: str | None = None,
+    drop: bool = False,
+    today: date | None = None,
+) -> list[str]:
+    """
+    detach the partitions older than the retention period, then move them to
+    the archive schema or drop them. Detached partitions are no longer
+    scanned, vacuumed or indexed as part of the parent table
+
+    parameters
+    ----------
+    connection: Connection
+        connection to the postgresql database
+    retain_months: int
+        number of past months, besides the current one, to keep attached
+    archive_schema: str | None
+        schema the detached partitions are moved to
+    drop: bool
+        drop the detached partitions instead of keeping them
+    today: date | None
+        current date, used by tests
+
+    return: list
+        names of the detached partitions
+    """
+    expired = expired_partitions(
+        attached_partitions(connection), retain_months, today
+    )
+    if archive_schema:
+        if not IDENTIFIER_PATTERN.match(archive_schema):
+            raise ValueError(f"invalid archive schema {archive_schema}")
+        connection.execute(
+            text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+        )
+    for name in expired:
+        connection.execute(
+            text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+        )
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+        elif archive_schema:
+            connection.execute(
+                text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+            )
+    return expired
+
+
+def main(argv: list[str] | None = None) -> None:
+    """run the partition maintenance against the configured database"""
+    from main.database.engine import db_engine
+
+    parser = argparse.ArgumentParser(
+        description="maintain the inventory_transaction partitions"
+    )
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--retain-months", type=int, default=24)
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument("--archive-schema", default=None)
+    archive.add_argument("--drop", action="store_true")
+    args = parser.parse_args(argv)
+
+    with db_engine().begin() as connection:
+        created = ensure_partitions(connection, args.months_ahead)
+        detached = detach_partitions(
+            connection, args.retain_months, args.archive_schema, args.drop
+        )
+    print(f"partitions up to {created[-1]} exist")
+    print(f"detached partitions: {', '.join(detached) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+This module contains the statements of the API key path operations and of the
+in-memory key table
+"""
+import secrets
+from main.database.engine import async_session_factory
+from main.database.models.api_key import ApiKey
+from main.database.notify import subscribe
+from main.utils.api_keys import ApiKeyEntry
+from main.utils.api_keys import ApiKeyRegistry
+from main.validators.config import get_api_key_env_vars
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# active keys of the worker, verified without database round trips
+api_key_registry = ApiKeyRegistry(
+    get_api_key_env_vars().API_KEY_PEPPER.get_secret_value().encode("utf-8")
+)
+
+
+def new_api_key() -> tuple[str, str]:
+    """
+    generate the key_id and the secret of a new API key
+
+    return: tuple[str, str]
+    """
+    return secrets.token_hex(8), secrets.token_urlsafe(32)
+
+
+def api_key_entry(api_key: ApiKey) -> ApiKeyEntry:
+    """
+    return the in-memory entry of an API key
+
+    parameters
+    ----------
+    api_key: ApiKey
+        stored API key
+
+    return: ApiKeyEntry
+    """
+    return ApiKeyEntry(
+        api_key.key_id, api_key.secret_hash, frozenset(api_key.scopes.split())
+    )
+
+
+async def active_api_keys(session: AsyncSession) -> list[ApiKeyEntry]:
+    """
+    read the entries of the keys that are not revoked
+
+    parameters
+    ----------
+    session: AsyncSession
+        session the keys are read with
+
+    return: list[ApiKeyEntry]
+    """
+    api_keys = await session.scalars(
+        select(ApiKey).where(ApiKey.revoked.is_(False))
+    )
+    return [api_key_entry(api_key) for api_key in api_keys]
+
+
+async def load_api_keys() -> list[ApiKeyEntry]:
+    """read the active keys with a session of its own, for the reloads"""
+    async with async_session_factory()() as session:
+        return await active_api_keys(session)
+
+
+@subscribe("api_key")
+def reload_api_keys(key_ids: list[str] | None) -> None:
+    """
+    evict the changed keys, revoked ones stop working immediately, and
+    reload the table to pick the new ones up
+
+    parameters
+    ----------
+    key_ids: list[str] | None
+        key_id of the changed keys, None when any key may have changed
+    """
+    if key_ids:
+        api_key_registry.evict(*key_ids)
+    api_key_registry.request_refresh()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+This module contains the statements of the category path operations
+
+Every statement states how the products of the categories are loaded, so that
+serializing the categories never lazy loads their products one category at a
+time. Lookups of a single category are served from in-process caches of the
+serialized category, evicted on the change notifications of the category
+table. Cache misses are read from the primary, a replica lagging behind the
+write that triggered the eviction would otherwise refill the cache with the
+old row for the whole TTL. Categories are serialized with orjson straight from the loaded columns,
+the response model is not validated again for data read from the database
+"""
+import orjson
+from datetime import datetime
+from main.database.models.category import Category
+from main.database.models.product import Product
+from main.database.notify import subscribe
+from main.database.queries.upsert import dialect_insert
+from main.utils.cache import TTLCache
+from main.validators.category import CategoryRequestValidator
+from sqlalchemy import ColumnElement
+from sqlalchemy import literal
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Sequence
+from uuid import UUID
+
+# columns of the category table that must be unique
+UNIQUE_FIELDS = ("name", "code")
+
+# bounds of the category lookup caches, categories change a few times a day
+CATEGORY_CACHE_SIZE = 10_000
+CATEGORY_CACHE_TTL = 300.0
+
+# serialized CategoryResponseValidator payloads by category id, and category
+# ids by category name
+category_payload_cache = TTLCache(CATEGORY_CACHE_SIZE, CATEGORY_CACHE_TTL)
+category_id_cache = TTLCache(CATEGORY_CACHE_SIZE, CATEGORY_CACHE_TTL)
+
+
+def product_summaries():
+    """
+    loader option of the products of a category, the products of every
+    category in the result are fetched in one extra SELECT ... WHERE
+    category_id IN (...) that only reads the columns of the response
+    """
+    return selectinload(Category.products).load_only(
+        Product.id, Product.created, Product.updated
+    )
+
+
+def category_page_stmt(
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+    name_prefix: str | None = None,
+    code_prefix: str | None = None,
+) -> Select:
+    """
+    select one keyset page of categories ordered by (created, id)
+
+    parameters
+    ----------
+    limit: int
+        number of categories to select
+    after: tuple | None
+        (created, id) position of the last category of the previous page
+    name_prefix: str | None
+        prefix the category names must start with
+    code_prefix: str | None
+        prefix the category codes must start with
+
+    return: Select
+    """
+    stmt = (
+        select(Category)
+        .options(product_summaries())
+        .order_by(Category.created, Category.id)
+        .limit(limit)
+    )
+    if after:
+        created, cat_id = after
+        stmt = stmt.where(
+            tuple_(Category.created, Category.id)
+            > tuple_(
+                literal(created, Category.created.type),
+                literal(cat_id, Category.id.type),
+            )
+        )
+    if name_prefix:
+        stmt = stmt.where(
+            Category.name.startswith(name_prefix, autoescape=True)
+        )
+    if code_prefix:
+        stmt = stmt.where(
+            Category.code.startswith(code_prefix, autoescape=True)
+        )
+    return stmt
+
+
+def category_lookup_stmt(whereclause: ColumnElement[bool]) -> Select:
+    """
+    select a single category matching the whereclause with its products
+
+    parameters
+    ----------
+    whereclause: ColumnElement
+        filter identifying the category
+
+    return: Select
+    """
+    return select(Category).where(whereclause).options(product_summaries())
+
+
+# utc datetimes end with Z as they do in the pydantic serialization
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def category_document(cat_obj: Category) -> dict:
+    """
+    return the CategoryResponseValidator document of a category, built from
+    its loaded columns whose types the orm already enforces
+
+    parameters
+    ----------
+    cat_obj: Category
+        category loaded with its product summaries
+
+    return: dict
+    """
+    return {
+        "name": cat_obj.name,
+        "code": cat_obj.code,
+        "description": cat_obj.description,
+        "id": cat_obj.id,
+        "created": cat_obj.created,
+        "updated": cat_obj.updated,
+        "products": [
+            {
+                "id": prod_obj.id,
+                "created": prod_obj.created,
+                "updated": prod_obj.updated,
+            }
+            for prod_obj in cat_obj.products
+        ],
+    }
+
+
+def serialize_category(cat_obj: Category) -> bytes:
+    """return the JSON response payload of a category"""
+    return orjson.dumps(category_document(cat_obj), option=JSON_OPTIONS)
+
+
+def serialize_category_page(
+    categories: Sequence[Category], next_cursor: str | None
+) -> bytes:
+    """
+    return the JSON response payload of a page of categories
+
+    parameters
+    ----------
+    categories: Sequence[Category]
+        categories of the page loaded with their product summaries
+    next_cursor: str | None
+        cursor of the next page
+
+    return: bytes
+    """
+    return orjson.dumps(
+        {
+            "items": [category_document(cat_obj) for cat_obj in categories],
+            "next_cursor": next_cursor,
+        },
+        option=JSON_OPTIONS,
+    )
+
+
+async def category_payload(
+    session: AsyncSession, category_id: UUID, cached: bool = True
+):
+    """
+    return the serialized payload of a category from the cache, reading it
+    from the database on a miss
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the primary, or of any database when cached is False
+    category_id: UUID
+        id of the category
+    cached: bool
+        False to read the category from the session without the cache
+
+    return: bytes | None
+        None when the category does not exist
+    """
+
+    async def load():
+        stmt = category_lookup_stmt(Category.id == category_id)
+        cat_obj = (await session.scalars(stmt)).first()
+        return serialize_category(cat_obj) if cat_obj else None
+
+    if not cached:
+        return await load()
+    return await category_payload_cache.get_or_load(category_id, load)
+
+
+async def category_payload_by_name(
+    session: AsyncSession, name: str, cached: bool = True
+):
+    """
+    return the serialized payload of a category from the cache, the id of a
+    name seen for the first time is read with an index lookup and cached
+    apart from the payload
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the primary, or of any database when cached is False
+    name: str
+        name of the category
+    cached: bool
+        False to read the category from the session without the caches
+
+    return: bytes | None
+        None when the category does not exist
+    """
+
+    async def load():
+        return await session.scalar(
+            select(Category.id).where(Category.name == name)
+        )
+
+    if cached:
+        category_id = await category_id_cache.get_or_load(name, load)
+    else:
+        category_id = await load()
+    if category_id is None:
+        return None
+    return await category_payload(session, category_id, cached)
+
+
+@subscribe("category")
+def evict_categories(category_ids: list[str] | None) -> None:
+    """
+    drop the cached payloads and name lookups of the categories changed by
+    any worker, or the whole caches when any category may have changed
+
+    parameters
+    ----------
+    category_ids: list[str] | None
+        ids of the changed categories
+    """
+    if category_ids is None:
+        category_payload_cache.clear()
+        category_id_cache.clear()
+        return
+    changed = set(map(UUID, category_ids))
+    category_payload_cache.invalidate(*changed)
+    # a renamed or deleted category no longer owns its cached name
+    category_id_cache.invalidate_if(lambda name, cat_id: cat_id in changed)
+
+
+async def category_conflicts(
+    session: AsyncSession, requests: list[CategoryRequestValidator]
+) -> dict[int, list[str]]:
+    """
+    find the categories of a batch that would violate a unique constraint,
+    either because their name or code already exists in the table or because
+    an earlier category of the batch uses it. Existing values are looked up
+    with a single SELECT
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the bulk create
+    requests: list[CategoryRequestValidator]
+        categories of the batch
+
+    return: dict[int, list[str]]
+        position of every conflicting category in the batch, mapped to the
+        description of its conflicts
+    """
+    values = {
+        field: {getattr(request, field) for request in requests}
+        for field in UNIQUE_FIELDS
+    }
+    stmt = select(Category.name, Category.code).where(
+        or_(
+            Category.name.in_(values["name"]),
+            Category.code.in_(values["code"]),
+        )
+    )
+    taken: dict[str, set[str]] = {field: set() for field in UNIQUE_FIELDS}
+    for row in await session.execute(stmt):
+        taken["name"].add(row.name)
+        taken["code"].add(row.code)
+
+    seen: dict[str, set[str]] = {field: set() for field in UNIQUE_FIELDS}
+    conflicts: dict[int, list[str]] = {}
+    for index, request in enumerate(requests):
+        for field in UNIQUE_FIELDS:
+            value = getattr(request, field)
+            if value in taken[field]:
+                conflicts.setdefault(index, []).append(
+                    f"Category with {field} {value} already exists"
+                )
+            elif value in seen[field]:
+                conflicts.setdefault(index, []).append(
+                    f"Category {field} {value} is repeated in the batch"
+                )
+        if index not in conflicts:
+            # only categories that are inserted claim their name and code
+            for field in UNIQUE_FIELDS:
+                seen[field].add(getattr(request, field))
+    return conflicts
+
+
+async def bulk_create_categories(
+    session: AsyncSession, requests: list[CategoryRequestValidator]
+) -> tuple[list[Category], dict[int, list[str]]]:
+    """
+    insert the categories of a batch that do not conflict with the table or
+    with each other. The rows are sent as multi row INSERT ... ON CONFLICT DO
+    NOTHING RETURNING statements, batched by the insertmanyvalues feature of
+    the dialect, in the transaction of the session. A row taken by a
+    concurrent write in the meantime is skipped by the database and reported
+    as a conflict. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the bulk create
+    requests: list[CategoryRequestValidator]
+        categories of the batch
+
+    return: tuple[list[Category], dict[int, list[str]]]
+        the inserted categories, in batch order, and the conflicts of the
+        categories left out
+    """
+    conflicts = await category_conflicts(session, requests)
+    rows = [
+        request.model_dump()
+        for index, request in enumerate(requests)
+        if index not in conflicts
+    ]
+    if not rows:
+        return [], conflicts
+    stmt = (
+        dialect_insert(session, Category)
+        .on_conflict_do_nothing()
+        .returning(Category)
+    )
+    inserted = {
+        cat_obj.name: cat_obj
+        for cat_obj in (await session.scalars(stmt, rows)).all()
+    }
+    categories = []
+    for index, request in enumerate(requests):
+        if index in conflicts:
+            continue
+        cat_obj = inserted.get(request.name)
+        if cat_obj is None:
+            # a concurrent write took the name or code after the check
+            conflicts[index] = [
+                f"Category with name {request.name} or code {request.code} "
+                "already exists"
+            ]
+            continue
+        # a new category has no products, mark the collection as loaded
+        set_committed_value(cat_obj, "products", [])
+        categories.append(cat_obj)
+    return categories, dict(sorted(conflicts.items()))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+This module contains the statements that move inventory stock
+
+Stock is never read into python and written back. A movement inserts its
+inventory transaction and adds its signed quantity to the inventory row in the
+database, where the row lock taken by the UPDATE orders concurrent movements
+on the same inventory without losing any of them
+"""
+from datetime import datetime
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.models.basemodel import utc_timestamp
+from main.database.models.inventory import Inventory
+from main.database.queries.upsert import dialect_insert
+from sqlalchemy import insert
+from sqlalchemy import Integer
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy import true
+from sqlalchemy import update
+from sqlalchemy import UUID as SQL_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import NamedTuple
+from uuid import UUID
+
+
+class StockMovement(NamedTuple):
+    """stock movement recorded against an inventory"""
+
+    id: UUID
+    inventory_id: UUID
+    stock: int
+
+
+def stock_update_stmt(
+    inventory_id: UUID, quantity: int, non_negative: bool = True
+):
+    """
+    UPDATE inventory SET quantity = quantity + :quantity ... RETURNING the
+    new stock. With non_negative the row is left untouched, and nothing is
+    returned, when the movement would take the stock below zero
+
+    parameters
+    ----------
+    inventory_id: UUID
+        inventory the stock is moved on
+    quantity: int
+        signed number of units moved
+    non_negative: bool
+        reject movements that would oversell the inventory
+    """
+    stmt = (
+        update(Inventory)
+        .where(Inventory.id == inventory_id)
+        .values(quantity=Inventory.quantity + quantity)
+        .returning(Inventory.id, Inventory.quantity)
+    )
+    if non_negative:
+        stmt = stmt.where(Inventory.quantity + quantity >= 0)
+    return stmt
+
+
+async def apply_stock_movement(
+    session: AsyncSession,
+    inventory_id: UUID,
+    quantity: int,
+    non_negative: bool = True,
+) -> StockMovement | None:
+    """
+    record an inventory transaction and apply its quantity to the inventory
+    stock. On postgresql both writes run in one statement, the inventory
+    UPDATE and the transaction INSERT being data modifying CTEs, so a
+    movement costs a single round trip. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    inventory_id: UUID
+        inventory the stock is moved on
+    quantity: int
+        signed number of units moved
+    non_negative: bool
+        reject movements that would oversell the inventory
+
+    return: StockMovement | None
+        the recorded movement, or None when the inventory does not exist or
+        the movement was rejected
+    """
+    transaction_id = InventoryTransaction.id_factory()
+    moved = stock_update_stmt(inventory_id, quantity, non_negative)
+
+    if session.bind.dialect.name != "postgresql":
+        # dialects without data modifying CTEs run the same two writes as
+        # separate statements of the transaction
+        moved_row = (await session.execute(moved)).first()
+        if moved_row is None:
+            return None
+        await session.execute(
+            insert(InventoryTransaction).values(
+                id=transaction_id,
+                quantity=quantity,
+                inventory_id=inventory_id,
+            )
+        )
+        return StockMovement(transaction_id, inventory_id, moved_row.quantity)
+
+    moved_cte = moved.cte("moved_stock")
+    recorded_cte = (
+        insert(InventoryTransaction)
+        .from_select(
+            ["id", "quantity", "inventory_id"],
+            select(
+                literal(transaction_id, SQL_UUID),
+                literal(quantity, Integer),
+                moved_cte.c.id,
+            ),
+        )
+        .returning(InventoryTransaction.id)
+        .cte("recorded_transaction")
+    )
+    stmt = (
+        select(
+            recorded_cte.c.id,
+            moved_cte.c.id.label("inventory_id"),
+            moved_cte.c.quantity.label("stock"),
+        )
+        .select_from(moved_cte)
+        .join(recorded_cte, true())
+    )
+    row = (await session.execute(stmt)).first()
+    return StockMovement(*row) if row else None
+
+
+def transaction_history_stmt(
+    inventory_id: UUID, since: datetime, until: datetime, limit: int
+) -> Select:
+    """
+    select the most recent transactions of an inventory created in
+    [since, until). The bounds on created let postgresql prune every monthly
+    partition of inventory_transaction outside of the range, and the
+    (inventory_id, created) index serves the scan within the partitions left
+
+    parameters
+    ----------
+    inventory_id: UUID
+        inventory the transactions were recorded against
+    since: datetime
+        inclusive lower bound on created
+    until: datetime
+        exclusive upper bound on created
+    limit: int
+        maximum number of transactions to select
+
+    return: Select
+    """
+    return (
+        select(InventoryTransaction)
+        .where(
+            InventoryTransaction.inventory_id == inventory_id,
+            InventoryTransaction.created >= since,
+            InventoryTransaction.created < until,
+        )
+        .order_by(
+            InventoryTransaction.created.desc(),
+            InventoryTransaction.id.desc(),
+        )
+        .limit(limit)
+    )
+
+
+async def bulk_upsert_inventories(
+    session: AsyncSession, rows: list[dict]
+) -> int:
+    """
+    INSERT inventories, or set the quantity of the inventory of the same
+    product and country, as multi row INSERT ... ON CONFLICT DO UPDATE
+    statements. Used by the catalog import, whose quantities are the stock
+    counted by the supplier, not movements; no transaction is recorded. A
+    (product_id, country) pair must appear once in the rows. The caller
+    commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    rows: list[dict]
+        product_id, country and quantity of the inventories
+
+    return: int
+        number of inventories inserted or updated
+    """
+    stmt = dialect_insert(session, Inventory)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Inventory.product_id, Inventory.country],
+        set_={"quantity": stmt.excluded.quantity, "updated": utc_timestamp()},
+    ).returning(Inventory.id)
+    return len((await session.execute(stmt, rows)).all())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+This module contains the statements of the product path operations
+"""
+from main.database.models.basemodel import utc_timestamp
+from main.database.models.product import Product
+from main.database.queries.upsert import dialect_insert
+from sqlalchemy import Insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+# columns overwritten when a product is upserted over an existing sku
+UPSERT_FIELDS = ("name", "description", "price", "category_id", "is_active")
+
+
+def product_upsert_stmt(session: AsyncSession) -> Insert:
+    """
+    return the INSERT of products updating UPSERT_FIELDS of the product
+    holding the same sku
+
+    parameters
+    ----------
+    session: AsyncSession
+        session the statement is executed with
+
+    return: Insert
+    """
+    stmt = dialect_insert(session, Product)
+    return stmt.on_conflict_do_update(
+        index_elements=[Product.sku],
+        set_={
+            **{field: stmt.excluded[field] for field in UPSERT_FIELDS},
+            "updated": utc_timestamp(),
+        },
+    )
+
+
+async def upsert_product(session: AsyncSession, values: dict) -> Product:
+    """
+    INSERT a product, or UPDATE the product holding the same sku in place,
+    with a single INSERT ... ON CONFLICT (sku) DO UPDATE statement. The
+    caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    values: dict
+        column values of the product, sku included
+
+    return: Product
+        the inserted or updated product
+    """
+    stmt = (
+        product_upsert_stmt(session)
+        .values(**values)
+        .returning(Product)
+        # refresh the product if the session already holds it
+        .execution_options(populate_existing=True)
+    )
+    return (await session.scalars(stmt)).one()
+
+
+async def bulk_upsert_products(
+    session: AsyncSession, rows: list[dict]
+) -> dict[str, UUID]:
+    """
+    INSERT products, or UPDATE the products holding their skus in place, as
+    multi row INSERT ... ON CONFLICT (sku) DO UPDATE statements batched by
+    the insertmanyvalues feature of the dialect. A sku must appear once in
+    the rows. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    rows: list[dict]
+        column values of the products, sku included
+
+    return: dict[str, UUID]
+        the ids of the inserted or updated products by sku
+    """
+    stmt = product_upsert_stmt(session).returning(Product.sku, Product.id)
+    return dict((await session.execute(stmt, rows)).tuples().all())
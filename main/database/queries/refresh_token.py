@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+This module contains the statements of the refresh token path operations
+
+Refresh tokens are random strings, so they are stored as their sha256 hash
+and looked up through the unique index of the hash, no password hashing is
+involved. A refresh marks the presented token revoked and issues a new one of
+the same family with a single UPDATE ... RETURNING, so concurrent refreshes
+with one token cannot both succeed
+"""
+import hashlib
+import secrets
+from datetime import timedelta
+from main.database.models.admin import Admin
+from main.database.models.basemodel import utc_now
+from main.database.models.refresh_token import RefreshToken
+from main.utils.uuid7 import uuid7
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+# lifetime of a refresh token, every refresh issues one with a new lifetime
+REFRESH_TOKEN_EXPIRES = timedelta(days=14)
+
+
+class InvalidRefreshToken(LookupError):
+    """raised when a refresh token is unknown, expired or revoked"""
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    return the stored hash of a refresh token
+
+    parameters
+    ----------
+    token: str
+        refresh token sent to the client
+
+    return: str
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def issue_refresh_token(
+    session: AsyncSession, admin_id: UUID, family_id: UUID | None = None
+) -> str:
+    """
+    store a new refresh token of the admin, starting a new family unless one
+    is supplied. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    admin_id: UUID
+        admin the token belongs to
+    family_id: UUID | None
+        family of the rotated token
+
+    return: str
+        the refresh token, only its hash is stored
+    """
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id or uuid7(),
+            expires=utc_now() + REFRESH_TOKEN_EXPIRES,
+            admin_id=admin_id,
+        )
+    )
+    await session.flush()
+    return token
+
+
+async def rotate_refresh_token(
+    session: AsyncSession, token: str
+) -> tuple[str, str]:
+    """
+    revoke the presented refresh token and issue the next one of its family.
+    A token presented after it was rotated was stolen or replayed, its whole
+    family is revoked. The caller commits the session, also when
+    InvalidRefreshToken is raised so that the revocation is stored
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    token: str
+        refresh token presented by the client
+
+    return: tuple[str, str]
+        email of the admin and the new refresh token
+    """
+    token_hash = hash_refresh_token(token)
+    stmt = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires > utc_now(),
+        )
+        .values(revoked=True)
+        .returning(
+            RefreshToken.admin_id,
+            RefreshToken.family_id,
+            select(Admin.email)
+            .where(Admin.id == RefreshToken.admin_id)
+            .scalar_subquery(),
+        )
+    )
+    row = (await session.execute(stmt)).first()
+    if row is None or row[2] is None:
+        # revoke the family of a replayed token, a no-op for unknown ones
+        await revoke_refresh_family(session, token)
+        raise InvalidRefreshToken("Invalid refresh token")
+    admin_id, family_id, email = row
+    return email, await issue_refresh_token(session, admin_id, family_id)
+
+
+async def revoke_refresh_family(session: AsyncSession, token: str) -> bool:
+    """
+    revoke every token of the family of the refresh token, taking effect on
+    their next refresh. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    token: str
+        refresh token of the family
+
+    return: bool
+        whether the token is known
+    """
+    family_id = (
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+        .values(revoked=True)
+    )
+    return result.rowcount > 0
+
+
+async def revoke_admin_refresh_tokens(
+    session: AsyncSession, admin_id: UUID
+) -> None:
+    """
+    revoke every refresh token of the admin, e.g. when its password changes.
+    The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    admin_id: UUID
+        admin the tokens belong to
+    """
+    await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.admin_id == admin_id,
+            RefreshToken.revoked.is_(False),
+        )
+        .values(revoked=True)
+    )
+
+
+async def purge_refresh_tokens(session: AsyncSession) -> None:
+    """
+    delete the expired refresh tokens, the caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    """
+    await session.execute(
+        delete(RefreshToken).where(RefreshToken.expires < utc_now())
+    )
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+This module contains the INSERT ... ON CONFLICT statements of the write paths
+
+A row conflicting with a unique constraint is skipped, or updated in place, by
+the database and simply missing from the RETURNING rows, so a duplicate is a
+regular result of the statement instead of an IntegrityError that aborts the
+transaction and has to be rolled back
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# dialects providing INSERT ... ON CONFLICT, with their insert constructs
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(session: AsyncSession, model):
+    """
+    return the INSERT construct of the session dialect for the model, it
+    provides on_conflict_do_nothing and on_conflict_do_update
+
+    parameters
+    ----------
+    session: AsyncSession
+        session the statement is executed with
+    model:
+        orm model the rows are inserted into
+
+    return: Insert
+    """
+    dialect_name = session.bind.dialect.name
+    if dialect_name not in DIALECT_INSERTS:
+        raise NotImplementedError(
+            f"INSERT ... ON CONFLICT is not supported on {dialect_name}"
+        )
+    return DIALECT_INSERTS[dialect_name](model)
+
+
+async def insert_or_nothing(session: AsyncSession, model, values: dict):
+    """
+    INSERT a row, doing nothing when it conflicts with any unique constraint
+    of the table. The caller commits the session
+
+    parameters
+    ----------
+    session: AsyncSession
+        session of the write path operation
+    model:
+        orm model the row is inserted into
+    values: dict
+        column values of the row
+
+    return:
+        the inserted model object, or None when the row conflicted
+    """
+    stmt = (
+        dialect_insert(session, model)
+        .values(**values)
+        .on_conflict_do_nothing()
+        .returning(model)
+    )
+    return (await session.scalars(stmt)).first()
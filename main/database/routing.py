@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+This module contains the session routing between the primary database and its
+read replicas
+
+Read path operations use a session bound to one of the replica engines while
+write path operations use the primary. After a write, the primary WAL position
+(LSN) is returned to the client as a consistency token; reads that present the
+token are only served by a replica that has replayed up to that position, or
+by the primary when no replica catches up in time. An unreachable replica is
+skipped in favour of the next one, and of the primary when none is reachable
+"""
+import asyncio
+import re
+from fastapi import Header
+from fastapi import Response
+from functools import lru_cache
+from functools import partial
+from itertools import cycle
+from main.database.engine import async_db_engine
+from main.database.engine import create_async_db_engine
+from main.utils import http_exc
+from main.validators.config import get_db_env_vars
+from sqlalchemy import exc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from time import monotonic
+from typing import Annotated
+from typing import Awaitable
+from typing import Callable
+
+
+# header used to exchange the consistency token with clients
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+# current WAL position of the primary, read after a commit
+CURRENT_LSN = text("SELECT pg_current_wal_lsn()")
+
+# textual representation of a postgresql pg_lsn value
+LSN_PATTERN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+
+def lsn_to_int(lsn: str) -> int:
+    """
+    convert a postgresql LSN of the form "16/B374D848" to an integer
+
+    parameters
+    ----------
+    lsn: str
+        textual LSN
+
+    return: int
+    """
+    if not LSN_PATTERN.match(lsn):
+        raise ValueError(f"invalid consistency token {lsn}")
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def parse_replica_host(replica_host: str, default_port: int) -> tuple:
+    """
+    split a replica "host" or "host:port" entry into its host and port
+
+    return: tuple
+        (host, port)
+    """
+    host, _, port = replica_host.partition(":")
+    return host, int(port) if port else default_port
+
+
+@lru_cache
+def async_replica_engines() -> tuple[AsyncEngine, ...]:
+    """
+    return the asynchronous engines of the configured read replicas, built
+    once per worker process
+    """
+    db_vars = get_db_env_vars()
+    engines = []
+    for replica_host in db_vars.DB_REPLICA_HOSTS:
+        host, port = parse_replica_host(replica_host, db_vars.DB_PORT)
+        engines.append(
+            create_async_db_engine(
+                db_vars.model_copy(update={"DB_HOST": host, "DB_PORT": port})
+            )
+        )
+    return tuple(engines)
+
+
+@lru_cache
+def replica_rotation() -> cycle:
+    """return the round robin iterator over the replica engines"""
+    return cycle(async_replica_engines())
+
+
+async def dispose_replica_engines() -> None:
+    """close every pooled connection of the replica engines"""
+    if async_replica_engines.cache_info().currsize:
+        for _engine in async_replica_engines():
+            await _engine.dispose()
+        replica_rotation.cache_clear()
+        async_replica_engines.cache_clear()
+
+
+async def replica_caught_up(session: AsyncSession, token: str) -> bool:
+    """
+    check that the replica the session is bound to has replayed the WAL up to
+    the LSN of the consistency token
+    """
+    caught_up = await session.scalar(
+        text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"),
+        {"lsn": token},
+    )
+    return bool(caught_up)
+
+
+async def open_replica_session(token: str | None) -> AsyncSession | None:
+    """
+    open a session on the next replica in the rotation
+
+    parameters
+    ----------
+    token: str | None
+        consistency token presented by the client
+
+    return: AsyncSession | None
+        the session, None when the replica is unreachable or has not replayed
+        the WAL up to the token
+    """
+    _session = AsyncSession(next(replica_rotation()), expire_on_commit=False)
+    try:
+        # the session keeps the connection used for the check
+        if token is None:
+            await _session.connection()
+            return _session
+        if await replica_caught_up(_session, token):
+            return _session
+    except (exc.DBAPIError, OSError):
+        # the replica is down or unreachable, the next one is tried
+        pass
+    await _session.close()
+    return None
+
+
+async def open_read_session(token: str | None) -> AsyncSession:
+    """
+    open a session for a read path operation
+
+    without replicas every read goes to the primary. Without a token the next
+    reachable replica in the rotation is used. With a token the replicas are
+    polled until one has caught up or DB_REPLICA_MAX_WAIT elapses. The
+    primary serves the read when no replica is reachable or caught up
+
+    parameters
+    ----------
+    token: str | None
+        consistency token presented by the client
+
+    return: AsyncSession
+    """
+    replicas = async_replica_engines()
+    if not replicas:
+        return AsyncSession(async_db_engine(), expire_on_commit=False)
+
+    db_vars = get_db_env_vars()
+    deadline = monotonic() + db_vars.DB_REPLICA_MAX_WAIT
+    while True:
+        for _ in replicas:
+            _session = await open_replica_session(token)
+            if _session is not None:
+                return _session
+        if token is None or monotonic() >= deadline:
+            return AsyncSession(async_db_engine(), expire_on_commit=False)
+        await asyncio.sleep(db_vars.DB_REPLICA_POLL_INTERVAL)
+
+
+def check_consistency_token(consistency_token: str | None) -> None:
+    """reject a malformed consistency token with a 400 response"""
+    if consistency_token is not None:
+        try:
+            lsn_to_int(consistency_token)
+        except ValueError as value_error:
+            raise http_exc.bad_request(value_error)
+
+
+async def async_read_session(
+    consistency_token: Annotated[
+        str | None, Header(alias=CONSISTENCY_HEADER)
+    ] = None,
+):
+    """
+    Create an asynchronous database session for read path operations, routed
+    to a read replica that satisfies the consistency token of the request
+    """
+    check_consistency_token(consistency_token)
+    _session = await open_read_session(consistency_token)
+    try:
+        yield _session
+    finally:
+        await _session.close()
+
+
+async def async_read_session_factory(
+    consistency_token: Annotated[
+        str | None, Header(alias=CONSISTENCY_HEADER)
+    ] = None,
+) -> Callable[[], Awaitable[AsyncSession]]:
+    """
+    Return a coroutine function opening a read session routed like the
+    async_read_session ones, for the path operations that use the session
+    after the response has started, e.g. streamed responses, and close it
+    themselves
+    """
+    check_consistency_token(consistency_token)
+    return partial(open_read_session, consistency_token)
+
+
+async def set_consistency_token(
+    session: AsyncSession, response: Response
+) -> None:
+    """
+    attach the WAL position of the primary to the response after a committed
+    write, so the next reads of the client observe the write. The position
+    is read once the commit returned, past the commit record of the write
+
+    parameters
+    ----------
+    session: AsyncSession
+        primary session used for the write, after its commit
+    response: Response
+        response of the write path operation
+    """
+    if session.bind.dialect.name != "postgresql":
+        return
+    lsn = await session.scalar(CURRENT_LSN)
+    # end the transaction opened by the lookup
+    await session.commit()
+    response.headers[CONSISTENCY_HEADER] = str(lsn)
+
+
+def set_consistency_token_sync(session: Session, response: Response) -> None:
+    """
+    attach the WAL position of the primary to the response after a write
+    committed by a synchronous session, as set_consistency_token does
+
+    parameters
+    ----------
+    session: Session
+        primary session used for the write, after its commit
+    response: Response
+        response of the write path operation
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    lsn = session.scalar(CURRENT_LSN)
+    # end the transaction opened by the lookup
+    session.commit()
+    response.headers[CONSISTENCY_HEADER] = str(lsn)
@@ -1,32 +1,69 @@
 #!/usr/bin/python3
 """
 This module contains shared imports and object between the admin_router modules
+
+The admin a token belongs to is resolved once per request by the current_admin
+dependency. Validated tokens are cached by their (sub, jti) claims for a short
+time, so authenticated requests usually cost no query, and the entries of an
+admin are evicted on every worker when the admin is changed, deleted or one of
+its tokens is revoked. Service clients authenticate with the API key of the
+X-API-Key header instead, verified in memory by the require_scope dependency
 """
-import jwt
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+from fastapi import Depends
 from fastapi import HTTPException
+from fastapi import Security
 from fastapi import status
+from fastapi.security import APIKeyHeader
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
+from main.database.engine import async_db_session
 from main.database.models.admin import Admin
+from main.database.models.revoked_token import RevokedToken
+from main.database.notify import subscribe
+from main.database.queries.api_key import api_key_registry
+from main.utils.cache import TTLCache
+from main.utils.keyring import load_keyring
+from main.validators.config import get_jwt_env_vars
 from main.validators.token import TokenData
+from sqlalchemy import exists
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Annotated
+from uuid import uuid4
 
 
-# get the public and private keys used to generate the toke
-with open("private_key.pem", "r") as file_obj:
-    PRIVATE_KEY = file_obj.read()
-with open("public_key.pem", "r") as file_obj:
-    PUBLIC_KEY = file_obj.read()
+# keys used to sign and verify the tokens, parsed once per worker
+keyring = load_keyring(get_jwt_env_vars())
 
-# set the algorithm used to encode and decode jwt
-ALGORITHM = "RS256"
+# validated tokens served without a query, a revocation reaches the other
+# workers through the change notifications and at the latest after the ttl
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = 60.0
 
+# admin columns kept for a validated token, the password is never cached
+CACHED_ADMIN_COLUMNS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "created",
+    "updated",
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# schemes of the path operations open to admins and service clients
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="token", auto_error=False
+)
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+# (sub, jti) of a validated token -> column values of its admin
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
 
 
 def create_token(
@@ -50,19 +87,27 @@ def create_token(
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    # update the to_encode dictionary with the expire datetime object
-    to_encode.update({"exp": expire})
+    # update the to_encode dictionary with the expire datetime object and a
+    # unique identifier allowing the token to be revoked
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     # encode the data
-    encoded_jwt = jwt.encode(to_encode, PRIVATE_KEY, algorithm=ALGORITHM)
+    encoded_jwt = keyring.sign(to_encode)
     return encoded_jwt
 
 
-def validate_token(
-    token: str,
-    session: Session,
-):
+def credential_error() -> HTTPException:
+    """return the error of a request with an invalid token"""
+    return HTTPException(
+        status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credential",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def validate_token(token: Annotated[str, Depends(oauth2_scheme)]):
     """
-    authenticate the supplied token
+    check the signature and the expiration of the supplied token, tokens
+    without a jti claim cannot be revoked and are rejected
 
     parameters
     ----------
@@ -71,21 +116,112 @@ def validate_token(
 
     return: TokenData
     """
-    # create a credential error exception object
-    cred_exc = HTTPException(
-        status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credential",
-    )
     try:
-        payload: dict = jwt.decode(token, PUBLIC_KEY, [ALGORITHM])
-        username: str = payload.get("sub")
-        if not username:
-            raise cred_exc
-        # check if username still exists in database
-        stmt = select(Admin).where(Admin.email == username)
-        admin_obj = session.scalars(stmt).first()
-        if not admin_obj:
-            raise cred_exc
-    except InvalidTokenError as err_obj:
-        raise cred_exc
-    return TokenData(email=username)
+        payload: dict = keyring.verify(
+            token, options={"require": ["exp", "sub", "jti"]}
+        )
+    except InvalidTokenError:
+        raise credential_error()
+    return TokenData(
+        email=payload["sub"],
+        jti=payload["jti"],
+        expires=datetime.fromtimestamp(payload["exp"], timezone.utc),
+    )
+
+
+async def current_admin(
+    token_data: Annotated[TokenData, Depends(validate_token)],
+    session: AsyncSession = Depends(async_db_session),
+) -> Admin:
+    """
+    resolve the supplied token to its admin, querying the database only when
+    the token is not cached. The admin is detached, it can be attached to a
+    session with session.add without being loaded again, its password is not
+    loaded
+
+    parameters
+    ----------
+    token_data: TokenData
+        claims of the validated token
+    session: AsyncSession
+        primary database session used to check that the admin still exists
+        and that the token was not revoked, a replica lagging behind a
+        revocation would let the token be cached as valid
+
+    return: Admin
+    """
+
+    async def load_admin() -> dict | None:
+        stmt = select(
+            *(getattr(Admin, column) for column in CACHED_ADMIN_COLUMNS)
+        ).where(
+            Admin.email == token_data.email,
+            ~exists().where(RevokedToken.jti == token_data.jti),
+        )
+        row = (await session.execute(stmt)).first()
+        return row._asdict() if row else None
+
+    values = await token_cache.get_or_load(
+        (token_data.email, token_data.jti), load_admin
+    )
+    if values is None:
+        raise credential_error()
+    admin_obj = Admin()
+    # the constructor skips the id and timestamps, the values are set as
+    # loaded from the database
+    for column, value in values.items():
+        set_committed_value(admin_obj, column, value)
+    # the columns not cached, like the password, are marked expired and are
+    # loaded on access once the admin is attached to a session
+    make_transient_to_detached(admin_obj)
+    return admin_obj
+
+
+@subscribe("admin")
+def evict_tokens(admin_ids: list[str] | None) -> None:
+    """
+    drop the cached tokens of the changed admins
+
+    parameters
+    ----------
+    admin_ids: list[str] | None
+        ids of the changed admins, None for every admin
+    """
+    if admin_ids is None:
+        token_cache.clear()
+        return
+    changed = set(admin_ids)
+    token_cache.invalidate_if(lambda key, values: str(values["id"]) in changed)
+
+
+def require_scope(scope: str):
+    """
+    return a dependency authorizing the service clients whose API key grants
+    the scope, verified in memory, and the admins, who hold every scope
+
+    parameters
+    ----------
+    scope: str
+        scope required by the path operation, e.g. "inventory:write"
+    """
+
+    async def authorize(
+        api_key: Annotated[str | None, Security(api_key_scheme)],
+        token: Annotated[str | None, Security(optional_oauth2_scheme)],
+        session: AsyncSession = Depends(async_db_session),
+    ) -> None:
+        if api_key is not None:
+            entry = api_key_registry.verify(api_key)
+            if entry is None:
+                raise credential_error()
+            if scope not in entry.scopes:
+                raise HTTPException(
+                    status.HTTP_403_FORBIDDEN,
+                    detail=f"API key is missing the {scope} scope",
+                )
+            return
+        if token is None:
+            raise credential_error()
+        await current_admin(validate_token(token), session)
+
+    return authorize
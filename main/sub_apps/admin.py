@@ -5,7 +5,8 @@ Admin FastAPI Sub-application
 This module defines the FastAPI sub-application for admin-related operations.
 It includes routes for creating admins, authenticating admins, updating admin
 information, and changing admin passwords. The application also handles
-token-based authentication for secure access.
+token-based authentication for secure access, resolving the token of a request
+to its admin with the current_admin dependency.
 
 Modules and Packages:
 - FastAPI: Main framework
@@ -13,30 +14,61 @@ Modules and Packages:
 - Validators: Request and response validation for admin operations
 - Security: OAuth2 for authentication
 
-Token expiration duration: 30 minutes
+Token expiration duration: 30 minutes, refresh tokens: 14 days
 """
 from datetime import timedelta
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Response, Security
+from fastapi import status
 from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from main.database.engine import db_session
+from main.database.engine import async_db_session
 from main.database.models.admin import Admin
-from main.sub_apps import create_token, oauth2_scheme, validate_token
+from main.database.models.basemodel import as_utc
+from main.database.models.basemodel import utc_now
+from main.database.models.revoked_token import RevokedToken
+from main.database.notify import publish_change
+from main.database.queries.refresh_token import InvalidRefreshToken
+from main.database.queries.refresh_token import issue_refresh_token
+from main.database.queries.refresh_token import purge_refresh_tokens
+from main.database.queries.refresh_token import revoke_admin_refresh_tokens
+from main.database.queries.refresh_token import revoke_refresh_family
+from main.database.queries.refresh_token import rotate_refresh_token
+from main.database.queries.upsert import insert_or_nothing
+from main.database.routing import set_consistency_token
+from main.sub_apps import create_token, current_admin, validate_token
+from main.sub_apps import credential_error
+from main.sub_apps import require_scope
+from main.sub_apps.admin_routers import api_key
 from main.sub_apps.admin_routers import category
-from main.utils import sqlalchemy_err_utils
+from main.sub_apps.admin_routers import export
+from main.sub_apps.admin_routers import inventory
+from main.sub_apps.admin_routers import product
+from main.utils import http_exc
+from main.utils.passwords import password_hasher
 from main.validators.admin import (
     AdminRequestValidator,
     AdminResponseValidator,
     NewAdminPassRequestValidator,
     PutAdminRequestValidator,
 )
-from main.validators.token import Token
-from sqlalchemy import exc, select, update
-from sqlalchemy.orm import Session
+from main.validators.token import (
+    RefreshTokenRequestValidator,
+    Token,
+    TokenData,
+)
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_utils import Password
 from typing import Annotated
 
 # Create an instance of the FastAPI sub-application
-admin = FastAPI(title="Admin Sub-Application", version="1.0")
+# responses are rendered with orjson
+admin = FastAPI(
+    title="Admin Sub-Application",
+    version="1.0",
+    default_response_class=ORJSONResponse,
+)
 
 # Token expiration duration (30 minutes)
 access_token_expires = timedelta(minutes=30)
@@ -55,9 +87,10 @@ access_token_expires = timedelta(minutes=30)
 email, and password. Upon successful creation, the new admin's details will be returned.
 """,
 )
-def create_admin(
+async def create_admin(
     request: AdminRequestValidator,
-    session: Session = Depends(db_session),
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
 ):
     """
     Create a new admin account.
@@ -69,27 +102,30 @@ def create_admin(
     **Parameters:**
     - `request`: AdminRequestValidator
         Contains admin details (name, email,password).
-    - `session`: Session
+    - `response`: Response
+        Response carrying the consistency token of the write.
+    - `session`: AsyncSession
         Database session dependency.
 
     **Returns:**
     - `AdminResponseValidator`: The created admin object.
 
     **Raises:**
-    - `IntegrityError`: If the admin email already exists in the database.
+    - `HTTPException`: 409 if the admin email already exists in the database.
     """
-    # Create an admin object from the request data
-    admin_obj = Admin(**request.model_dump())
-    try:
-        # Add the admin object to the database session
-        session.add(admin_obj)
-        # Commit the session to persist changes in the database
-        session.commit()
-    except exc.IntegrityError as IntegrityError:
-        # Roll back the session in case of an IntegrityError
-        # (e.g., duplicate email)
-        session.rollback()
-        raise sqlalchemy_err_utils.integrity_error_handler(IntegrityError)
+    # hash the password in the pool, the column stores the hash as it is
+    values = request.model_dump()
+    values["password"] = Password(await password_hasher.hash(request.password))
+    # Insert the admin, a row conflicting on the email is skipped
+    admin_obj = await insert_or_nothing(session, Admin, values)
+    if not admin_obj:
+        raise http_exc.conflict(
+            ValueError(f"Admin with email {request.email} already exists")
+        )
+    # Commit the session to persist changes in the database
+    await session.commit()
+    # let the next reads of the client observe the new admin
+    await set_consistency_token(session, response)
 
     # Return the newly created admin object
     return admin_obj
@@ -104,48 +140,154 @@ def create_admin(
     
     This endpoint generates an access token for admin authentication.  
     The token is required to access other protected routes. It is valid for \
-30 minutes and must be passed as a Bearer token in subsequent requests.
+30 minutes and must be passed as a Bearer token in subsequent requests.  
+    The refresh token returned with it is exchanged at `/refresh` for a new \
+access token without sending the password again.
 """,
 )
-def login_for_access_token(
+async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: Session = Depends(db_session),
+    session: AsyncSession = Depends(async_db_session),
 ):
     """
     Generate an authentication token for an admin.
 
     This endpoint authenticates an admin using their email and password, and
-    returns a token for future requests.
+    returns a token for future requests along with a refresh token.
 
     **Parameters:**
     - `form_data`: OAuth2PasswordRequestForm
         Contains `username` (email) and `password`.
-    - `session`: Session
+    - `session`: AsyncSession
         Database session dependency.
 
     **Returns:**
-    - `Token`: Access token for authentication.
+    - `Token`: Access and refresh tokens for authentication.
 
     **Raises:**
     - `HTTPException`: If the email or password is incorrect.
     """
     # Query the admin table
     stmt = select(Admin).where(Admin.email == form_data.username)
-    admin_obj = session.scalars(stmt).first()
-    if not admin_obj or admin_obj.password != form_data.password:
+    admin_obj = (await session.scalars(stmt)).first()
+    valid, new_hash = False, None
+    if admin_obj:
+        # verify the password in the pool, off the event loop
+        valid, new_hash = await password_hasher.verify_and_update(
+            form_data.password, admin_obj.password.hash
+        )
+    if admin_obj is None or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect Username and/or Password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # the stored hash used outdated settings, store the new one
+        await session.execute(
+            update(Admin)
+            .where(Admin.id == admin_obj.id)
+            .values(password=Password(new_hash))
+        )
+    # start a new refresh token family, dropping the expired tokens
+    await purge_refresh_tokens(session)
+    refresh_token = await issue_refresh_token(session, admin_obj.id)
+    await session.commit()
     return {
         "access_token": create_token(
             {"sub": admin_obj.email},
             access_token_expires,
+        ),
+        "refresh_token": refresh_token,
+    }
+
+
+@admin.post(
+    "/refresh",
+    response_model=Token,
+    tags=["ADMIN"],
+    description="""
+    **Refresh Authentication Token**
+
+    This endpoint exchanges a refresh token for a new access token and a new \
+refresh token, the presented refresh token can no longer be used.  
+    Presenting a refresh token a second time revokes every token obtained \
+from it.
+""",
+)
+async def refresh_access_token(
+    request: RefreshTokenRequestValidator,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Rotate a refresh token.
+
+    **Parameters:**
+    - `request`: RefreshTokenRequestValidator
+        Contains the `refresh_token` returned by the last login or refresh.
+    - `session`: AsyncSession
+        Database session dependency.
+
+    **Returns:**
+    - `Token`: New access and refresh tokens.
+
+    **Raises:**
+    - `HTTPException`: 401 Unauthorized - If the refresh token is unknown,
+        expired, revoked or was already used.
+    """
+    try:
+        email, refresh_token = await rotate_refresh_token(
+            session, request.refresh_token
         )
+    except InvalidRefreshToken:
+        # store the revocation of the family of a replayed token
+        await session.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await session.commit()
+    return {
+        "access_token": create_token({"sub": email}, access_token_expires),
+        "refresh_token": refresh_token,
     }
 
 
+@admin.post(
+    "/revoke-refresh-token",
+    tags=["ADMIN"],
+    description="""
+    **Revoke Refresh Token**
+
+    This endpoint revokes a refresh token and every token obtained from it, \
+their next refresh is rejected.
+""",
+)
+async def revoke_refresh_token(
+    request: RefreshTokenRequestValidator,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Revoke a refresh token.
+
+    Unknown tokens are answered like known ones, the response does not tell
+    whether a token exists.
+
+    **Parameters:**
+    - `request`: RefreshTokenRequestValidator
+        Contains the `refresh_token` to revoke.
+    - `session`: AsyncSession
+        Database session dependency.
+
+    **Returns:**
+    - `JSONResponse`: A success message.
+    """
+    await revoke_refresh_family(session, request.refresh_token)
+    await session.commit()
+    return JSONResponse(content={"detail": "success"})
+
+
 @admin.get(
     "/admin-info",
     response_model=AdminResponseValidator,
@@ -158,9 +300,8 @@ provided token.
     It returns the admin's full profile, including name and email.
 """,
 )
-def get_admin_info(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Session = Depends(db_session),
+async def get_admin_info(
+    admin_obj: Annotated[Admin, Depends(current_admin)],
 ):
     """
     Retrieve admin information.
@@ -168,19 +309,12 @@ def get_admin_info(
     This endpoint fetches admin details using a valid authentication token.
 
     **Parameters:**
-    - `token`: str
-        Bearer token for authentication.
-    - `session`: Session
-        Database session dependency.
+    - `admin_obj`: Admin
+        Admin the bearer token belongs to.
 
     **Returns:**
     - `AdminResponseValidator`: The admin object.
     """
-    # fetch admin email from the token
-    token_data = validate_token(token, session)
-    # fetch admin object from database
-    stmt = select(Admin).where(Admin.email == token_data.email)
-    admin_obj = session.scalars(stmt).first()
     return admin_obj
 
 
@@ -197,10 +331,11 @@ and other details.
     Only non-null fields from the request body will be updated.
 """,
 )
-def update_admin_info(
+async def update_admin_info(
     request: PutAdminRequestValidator,
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Session = Depends(db_session),
+    admin_obj: Annotated[Admin, Depends(current_admin)],
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
 ):
     """
     Update admin information.
@@ -211,29 +346,34 @@ def update_admin_info(
     **Parameters:**
     - `request`: PutAdminRequestValidator
         Contains fields to update.
-    - `token`: str
-        Bearer token for authentication.
-    - `session`: Session
+    - `admin_obj`: Admin
+        Admin the bearer token belongs to.
+    - `response`: Response
+        Response carrying the consistency token of the write.
+    - `session`: AsyncSession
         Database session dependency.
 
     **Returns:**
     - `AdminResponseValidator`: The updated admin object.
     """
-    # validate and fetch admin email from token
-    token_data = validate_token(token, session)
-    admin_email = token_data.email
     # get update data
     data = {key: value for key, value in request.model_dump().items() if value}
     # create the update statement
     stmt = (
         update(Admin)
-        .where(Admin.email == admin_email)
+        .where(Admin.id == admin_obj.id)
         .values(**data)
         .returning(Admin)
     )
     # execute the update statement
-    admin_obj = session.scalars(stmt).first()
-    session.commit()
+    updated_obj = (await session.scalars(stmt)).first()
+    if updated_obj is None:
+        # the admin was deleted after its token was cached
+        raise credential_error()
+    admin_obj = updated_obj
+    await publish_change(session, "admin", [admin_obj.id])
+    await session.commit()
+    await set_consistency_token(session, response)
     return admin_obj
 
 
@@ -250,10 +390,11 @@ the current password does not match the stored password, an error will be \
 raised.
 """,
 )
-def change_password(
+async def change_password(
     request: NewAdminPassRequestValidator,
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Session = Depends(db_session),
+    admin_obj: Annotated[Admin, Depends(current_admin)],
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
 ):
     """
     Change admin password.
@@ -264,9 +405,11 @@ def change_password(
     **Parameters:**
     - `request`: NewAdminPassRequestValidator
         Contains `old_password` and `new_password`.
-    - `token`: str
-        Bearer token for authentication.
-    - `session`: Session
+    - `admin_obj`: Admin
+        Admin the bearer token belongs to.
+    - `response`: Response
+        Response carrying the consistency token of the write.
+    - `session`: AsyncSession
         Database session dependency.
 
     **Returns:**
@@ -275,24 +418,44 @@ def change_password(
     **Raises:**
     - `HTTPException`: If the old password is incorrect.
     """
-    # validate the supplied token
-    token_data = validate_token(token, session)
-    # get admin email from token_data
-    admin_email = token_data.email
-    # obtain the admin object in the admin table
-    admin_obj = session.scalars(
-        select(Admin).where(Admin.email == admin_email),
-    ).first()
-    # check that the new password is same as the old one
-    if not admin_obj or admin_obj.password != request.old_password:
+    # the password of the admin is never cached, read the stored one
+    password = await session.scalar(
+        select(Admin.password).where(Admin.id == admin_obj.id)
+    )
+    # check that the old password is same as the stored one
+    valid = (
+        password is not None
+        and (
+            await password_hasher.verify_and_update(
+                request.old_password, password.hash
+            )
+        )[0]
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Old password is incorrect",
         )
-    # update the admin_obj password field with new password
-    admin_obj.password = request.new_password
+    new_password = Password(await password_hasher.hash(request.new_password))
+    # update the password, the updated admin row is returned by the UPDATE
+    stmt = (
+        update(Admin)
+        .where(Admin.id == admin_obj.id)
+        .values(password=new_password)
+        .returning(Admin)
+        .execution_options(populate_existing=True)
+    )
+    updated_obj = (await session.scalars(stmt)).first()
+    if updated_obj is None:
+        # the admin was deleted after its token was cached
+        raise credential_error()
+    admin_obj = updated_obj
+    # sessions started with the old password can no longer be refreshed
+    await revoke_admin_refresh_tokens(session, admin_obj.id)
+    await publish_change(session, "admin", [admin_obj.id])
     # commit the changes to the database
-    session.commit()
+    await session.commit()
+    await set_consistency_token(session, response)
 
     return admin_obj
 
@@ -308,9 +471,9 @@ def change_password(
     A valid token is required for authentication.
 """,
 )
-def delete_admin(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Session = Depends(db_session),
+async def delete_admin(
+    admin_obj: Annotated[Admin, Depends(current_admin)],
+    session: AsyncSession = Depends(async_db_session),
 ):
     """
     Delete an admin account.
@@ -319,10 +482,9 @@ def delete_admin(
     authentication token. The admin is permanently removed from the database.
 
     **Parameters:**
-    - `token`: str
-        Bearer token for authentication and identification of the admin to be
-        deleted.
-    - `session`: Session
+    - `admin_obj`: Admin
+        Admin the bearer token belongs to, the admin to be deleted.
+    - `session`: AsyncSession
         Database session used for querying and deleting the admin object.
 
     **Returns:**
@@ -334,18 +496,96 @@ def delete_admin(
     - `HTTPException`: 404 Not Found - If the admin does not exist in the
         database.
     """
-    # fetch admin email from the token
-    token_data = validate_token(token, session)
-    # fetch admin object from database
-    stmt = select(Admin).where(Admin.email == token_data.email)
-    admin_obj = session.scalars(stmt).first()
+    # attach the detached admin to the session and delete it from table
+    session.add(admin_obj)
+    await session.delete(admin_obj)
+    await publish_change(session, "admin", [admin_obj.id])
+    await session.commit()
 
-    # delete admin_obj from table
-    session.delete(admin_obj)
-    session.commit()
+    response = JSONResponse(content={"detail": "success"})
+    await set_consistency_token(session, response)
+    return response
 
-    return JSONResponse(content={"detail": "success"})
+
+@admin.post(
+    "/logout",
+    tags=["ADMIN"],
+    description="""
+    **Revoke Authentication Token**
+
+    This endpoint revokes the bearer token sent with the request.  
+    The token is rejected by every protected route from then on, other tokens \
+of the admin remain valid.
+""",
+)
+async def logout(
+    token_data: Annotated[TokenData, Depends(validate_token)],
+    admin_obj: Annotated[Admin, Depends(current_admin)],
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Revoke the supplied authentication token.
+
+    The token is recorded as revoked until it expires and the cached
+    validations of the admin tokens are evicted on every worker.
+
+    **Parameters:**
+    - `token_data`: TokenData
+        Claims of the bearer token to revoke.
+    - `admin_obj`: Admin
+        Admin the bearer token belongs to.
+    - `session`: AsyncSession
+        Database session dependency.
+
+    **Returns:**
+    - `JSONResponse`: A success message indicating the token was revoked.
+
+    **Raises:**
+    - `HTTPException`: 401 Unauthorized - If the token is invalid, expired or
+        already revoked.
+    """
+    # purge the revoked tokens that have expired anyway
+    await session.execute(
+        delete(RevokedToken).where(RevokedToken.expires < utc_now())
+    )
+    # a concurrent revocation of the same token is skipped
+    await insert_or_nothing(
+        session,
+        RevokedToken,
+        {
+            "jti": token_data.jti,
+            "expires": as_utc(token_data.expires),
+            "admin_id": admin_obj.id,
+        },
+    )
+    await publish_change(session, "admin", [admin_obj.id])
+    await session.commit()
+
+    response = JSONResponse(content={"detail": "success"})
+    await set_consistency_token(session, response)
+    return response
+
+
+@admin.get(
+    "/password-stats",
+    dependencies=[Security(require_scope(category.STATS_SCOPE))],
+    tags=["ADMIN"],
+)
+async def password_stats():
+    """
+    Get the configuration and the queueing counters of the password hashing
+    pool of this worker process
+    """
+    return password_hasher.stats()
 
 
 # include the category router
 admin.include_router(category.router)
+# include the inventory router
+admin.include_router(inventory.router)
+# include the product router
+admin.include_router(product.router)
+# include the api key router
+admin.include_router(api_key.router)
+# include the export router
+admin.include_router(export.router)
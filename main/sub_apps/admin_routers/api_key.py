@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+This module contains the api key router and path operations for managing the
+API keys of the service clients, available to authenticated admins
+"""
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import status
+from main.database.engine import async_db_session
+from main.database.models.api_key import ApiKey
+from main.database.notify import publish_change
+from main.database.queries.api_key import api_key_entry
+from main.database.queries.api_key import api_key_registry
+from main.database.queries.api_key import new_api_key
+from main.database.routing import async_read_session
+from main.sub_apps import current_admin
+from main.utils import http_exc
+from main.validators.api_key import ApiKeyRequestValidator
+from main.validators.api_key import ApiKeyResponseValidator
+from main.validators.api_key import NewApiKeyResponseValidator
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# instantiate the api key fastpi router object
+router = APIRouter(dependencies=[Depends(current_admin)])
+
+
+@router.post(
+    "/api-keys",
+    status_code=status.HTTP_201_CREATED,
+    response_model=NewApiKeyResponseValidator,
+    tags=["API KEYS"],
+)
+async def create_api_key(
+    request: ApiKeyRequestValidator,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Create an API key granting the requested scopes. The key is returned
+    once as "<key_id>.<secret>", only a hash of the secret is stored
+    """
+    key_id, secret = new_api_key()
+    api_key = ApiKey(
+        name=request.name,
+        key_id=key_id,
+        secret_hash=api_key_registry.hash_secret(secret),
+        scopes=" ".join(sorted(set(request.scopes))),
+    )
+    session.add(api_key)
+    await session.flush()
+    # the other workers load the new key when notified
+    await publish_change(session, "api_key", [key_id])
+    await session.commit()
+    api_key_registry.add(api_key_entry(api_key))
+
+    return {
+        **ApiKeyResponseValidator.model_validate(api_key).model_dump(),
+        "api_key": f"{key_id}.{secret}",
+    }
+
+
+@router.get(
+    "/api-keys",
+    response_model=list[ApiKeyResponseValidator],
+    tags=["API KEYS"],
+)
+async def get_api_keys(session: AsyncSession = Depends(async_read_session)):
+    """Get every API key, revoked ones included, without their secrets"""
+    return (await session.scalars(select(ApiKey).order_by(ApiKey.id))).all()
+
+
+@router.delete(
+    "/api-keys/{key_id}",
+    response_model=ApiKeyResponseValidator,
+    tags=["API KEYS"],
+)
+async def revoke_api_key(
+    key_id: str,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Revoke an API key, it is rejected by every worker as soon as the change
+    is notified
+    """
+    api_key = (
+        await session.scalars(
+            update(ApiKey)
+            .where(ApiKey.key_id == key_id)
+            .values(revoked=True)
+            .returning(ApiKey)
+        )
+    ).first()
+    if not api_key:
+        raise http_exc.not_found(ApiKey, key_id)
+    await publish_change(session, "api_key", [key_id])
+    await session.commit()
+
+    return api_key
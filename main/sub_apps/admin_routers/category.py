@@ -4,26 +4,139 @@ This module contains the category router and path operations for carrying
 out CRUD operations on the Category database table
 """
 from fastapi import APIRouter
+from fastapi import Body
+from fastapi import Depends
+from fastapi import Header
+from fastapi import Query
+from fastapi import Response
+from fastapi import Security
+from main.database.engine import async_db_session
+from main.database.notify import publish_change
+from main.database.routing import async_read_session
+from main.database.routing import async_read_session_factory
+from main.database.routing import CONSISTENCY_HEADER
+from main.database.routing import set_consistency_token
 from main.database.models.category import Category
+from main.database.queries.category import bulk_create_categories
+from main.database.queries.category import category_id_cache
+from main.database.queries.category import category_page_stmt
+from main.database.queries.category import category_payload
+from main.database.queries.category import category_payload_by_name
+from main.database.queries.category import category_payload_cache
+from main.database.queries.category import serialize_category_page
+from main.database.queries.upsert import insert_or_nothing
 from main.sub_apps import *
+from main.sub_apps import require_scope
+from main.utils import http_exc
+from main.utils.pagination import decode_cursor
+from main.utils.pagination import encode_cursor
+from main.validators.category import CategoryBulkResponseValidator
+from main.validators.category import CategoryPageResponseValidator
 from main.validators.category import CategoryRequestValidator
 from main.validators.category import CategoryResponseValidator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Annotated
+from typing import Awaitable
+from typing import Callable
+from uuid import UUID
 
 
 # instantiate the category fastpi router object
 router = APIRouter()
 
+# number of categories returned per page of the category listing
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# number of categories accepted by a single bulk create
+MAX_BULK_SIZE = 5000
+
+# consistency token of the read path operations bypassing the caches
+ConsistencyToken = Annotated[str | None, Header(alias=CONSISTENCY_HEADER)]
+
+# scope of the API keys of the monitoring jobs reading the cache counters
+STATS_SCOPE = "inventory:stats"
+
 
 @router.get(
     "/categories",
-    response_model=list[CategoryResponseValidator],
+    response_model=CategoryPageResponseValidator,
     tags=["READ"],
 )
-async def all_categories(session: Session = Depends(db_session)):
-    """get all records in the inventory-db database category table"""
-    # query the database for all category objects
-    categories = session.scalars(select(Category)).all()
-    return categories
+async def all_categories(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    name_prefix: str | None = None,
+    code_prefix: str | None = None,
+    session: AsyncSession = Depends(async_read_session),
+):
+    """
+    get a page of records in the inventory-db database category table ordered
+    by (created, id), optionally filtered on a name and/or code prefix. The
+    next_cursor of a page is passed back as cursor to fetch the next one. The
+    page is serialized with orjson without validating the response model
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as value_error:
+            raise http_exc.bad_request(value_error)
+    # query the database for one page of category objects, the extra row
+    # only tells whether there is a next page
+    stmt = category_page_stmt(limit + 1, after, name_prefix, code_prefix)
+    categories = (await session.scalars(stmt)).all()
+    next_cursor = None
+    if len(categories) > limit:
+        categories = categories[:limit]
+        next_cursor = encode_cursor(categories[-1].created, categories[-1].id)
+
+    return Response(
+        content=serialize_category_page(categories, next_cursor),
+        media_type="application/json",
+    )
+
+
+async def lookup_category(
+    lookup: Callable[..., Awaitable[bytes | None]],
+    identifier: UUID | str,
+    session: AsyncSession,
+    consistency_token: str | None,
+    open_session: Callable[[], Awaitable[AsyncSession]],
+) -> bytes:
+    """
+    return the serialized payload of a category, from the cache filled by the
+    primary session, or, for a request carrying a consistency token, from a
+    read session satisfying the token without the cache
+
+    parameters
+    ----------
+    lookup: Callable
+        category_payload or category_payload_by_name
+    identifier: UUID | str
+        id or name of the category
+    session: AsyncSession
+        session of the primary
+    consistency_token: str | None
+        consistency token presented by the client
+    open_session: Callable
+        coroutine function opening the read session of the token
+
+    return: bytes
+    """
+    if consistency_token is None:
+        payload = await lookup(session, identifier)
+    else:
+        read_session = await open_session()
+        try:
+            payload = await lookup(read_session, identifier, cached=False)
+        finally:
+            await read_session.close()
+    # raise HTTPException if category object not found
+    if not payload:
+        raise http_exc.not_found(Category, identifier)
+    return payload
 
 
 @router.get(
@@ -32,22 +145,19 @@ async def all_categories(session: Session = Depends(db_session)):
     tags=["READ"],
 )
 async def get_category_by_id(
-    identifier: UUID, session: Session = Depends(db_session)
+    identifier: UUID,
+    consistency_token: ConsistencyToken = None,
+    session: AsyncSession = Depends(async_db_session),
+    open_session=Depends(async_read_session_factory),
 ):
     """
     Get a given record from the inventory-db category table using category_id filter
     """
-    # create select statement object
-    stmt = select(Category).where(Category.id == identifier)
-    # query the database for a given category using its name
-    cat_obj = session.scalars(stmt).first()
-    # raise HTTPException if category object not found
-    if not cat_obj:
-        # rollback the session
-        session.rollback()
-        raise http_exc.not_found(Category, identifier)
-
-    return cat_obj
+    # get the serialized category from the cache or the database
+    payload = await lookup_category(
+        category_payload, identifier, session, consistency_token, open_session
+    )
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get(
@@ -56,42 +166,103 @@ async def get_category_by_id(
     tags=["READ"],
 )
 async def get_category_by_name(
-    identifier: str, session: Session = Depends(db_session)
+    identifier: str,
+    consistency_token: ConsistencyToken = None,
+    session: AsyncSession = Depends(async_db_session),
+    open_session=Depends(async_read_session_factory),
 ):
     """
     Get a given record from the inventory-db category table using category_id filter
     """
-    # create select statement object
-    stmt = select(Category).where(Category.name == identifier)
-    # query the database for a given category using its name
-    cat_obj = session.scalars(stmt).first()
-    # raise HTTPException if category object not found
-    if not cat_obj:
-        # rollback the session
-        session.rollback()
-        raise http_exc.not_found(Category, identifier)
-
-    return cat_obj
+    # get the serialized category from the cache or the database
+    payload = await lookup_category(
+        category_payload_by_name,
+        identifier,
+        session,
+        consistency_token,
+        open_session,
+    )
+    return Response(content=payload, media_type="application/json")
 
 
 @router.post(
     "/new-category", response_model=CategoryResponseValidator, tags=["WRITE"]
 )
 async def create_category(
-    request: CategoryRequestValidator, session: Session = Depends(db_session)
+    request: CategoryRequestValidator,
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
 ):
-    """Insert a new category into the Category table"""
-    # create Category object
-    cat_obj = Category(**request.model_dump())
-    try:
-        # add the cat_obj to the session object
-        session.add(cat_obj)
-        # commit the changes to the database
-        session.commit()
-    except exc.IntegrityError as IntegrityError:
-        # rollback the session
-        session.rollback()
-        # pass error_obj to integrity_error_handler and raise the correct error
-        raise sqlalchemy_err_utils.integrity_error_handler(IntegrityError)
+    """
+    Insert a new category into the Category table, a category whose name or
+    code already exists is skipped by the INSERT and reported as a conflict
+    """
+    cat_obj = await insert_or_nothing(session, Category, request.model_dump())
+    if not cat_obj:
+        raise http_exc.conflict(
+            ValueError(
+                f"Category with name {request.name} or code {request.code} "
+                "already exists"
+            )
+        )
+    await publish_change(session, "category", [cat_obj.id])
+    # commit the changes to the database
+    await session.commit()
+    # a new category has no products, mark the collection as loaded
+    set_committed_value(cat_obj, "products", [])
+    # let the next reads of the client observe the new category
+    await set_consistency_token(session, response)
 
     return cat_obj
+
+
+@router.post(
+    "/new-categories",
+    response_model=CategoryBulkResponseValidator,
+    tags=["WRITE"],
+)
+async def create_categories(
+    request: Annotated[
+        list[CategoryRequestValidator], Body(max_length=MAX_BULK_SIZE)
+    ],
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Insert a batch of new categories into the Category table in a single
+    transaction. Categories whose name or code already exists, or is used by
+    an earlier category of the batch, are skipped and reported by their
+    position in the batch instead of failing the whole batch
+    """
+    categories, conflicts = await bulk_create_categories(session, request)
+    await publish_change(
+        session, "category", [cat_obj.id for cat_obj in categories]
+    )
+    # commit the changes to the database
+    await session.commit()
+    # let the next reads of the client observe the new categories
+    await set_consistency_token(session, response)
+
+    return {
+        "created": categories,
+        "conflicts": [
+            {"index": index, "detail": detail}
+            for index, detail in conflicts.items()
+        ],
+    }
+
+
+@router.get(
+    "/cache-stats",
+    dependencies=[Security(require_scope(STATS_SCOPE))],
+    tags=["READ"],
+)
+async def cache_stats():
+    """
+    Get the size and the hit, miss, eviction and expiration counters of the
+    category lookup caches of this worker process
+    """
+    return {
+        "category_payloads": category_payload_cache.stats(),
+        "category_ids": category_id_cache.stats(),
+    }
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+This module contains the export router and path operations for dumping the
+catalog and the inventory transaction ledger, available to the admins and to
+the service clients whose API key grants the inventory:export scope
+"""
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi import Security
+from fastapi.responses import StreamingResponse
+from main.database.export import export_chunks
+from main.database.export import export_columns
+from main.database.export import EXPORT_MEDIA_TYPES
+from main.database.export import EXPORT_MODELS
+from main.database.export import export_stmt
+from main.database.export import ExportFormat
+from main.database.export import ExportTable
+from main.database.routing import async_read_session_factory
+from main.sub_apps import require_scope
+from main.utils import http_exc
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+from typing import Awaitable
+from typing import Callable
+
+
+# instantiate the export fastpi router object
+router = APIRouter()
+
+# scope of the API keys of the BI jobs dumping the tables
+EXPORT_SCOPE = "inventory:export"
+
+
+@router.get(
+    "/export/{table}",
+    dependencies=[Security(require_scope(EXPORT_SCOPE))],
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {
+                media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()
+            }
+        }
+    },
+    tags=["READ"],
+)
+async def export_table(
+    table: ExportTable,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+    columns: str | None = None,
+    since: datetime | None = None,
+    open_session: Callable[[], Awaitable[AsyncSession]] = Depends(
+        async_read_session_factory
+    ),
+):
+    """
+    Stream every row of a table as NDJSON or CSV, optionally only the rows
+    updated at or after since and only the comma separated columns. The rows
+    are read through a server side cursor and sent as they are fetched, the
+    export runs in constant memory whatever the size of the table
+    """
+    model = EXPORT_MODELS[table]
+    try:
+        stmt = export_stmt(model, export_columns(model, columns), since)
+    except ValueError as value_error:
+        raise http_exc.bad_request(value_error)
+    return StreamingResponse(
+        export_chunks(open_session, stmt, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{table}.{export_format}"'
+            )
+        },
+    )
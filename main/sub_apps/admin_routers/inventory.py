@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+"""
+This module contains the inventory router and path operations for moving the
+stock of the Inventory database table
+"""
+from datetime import datetime
+from datetime import timedelta
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi import Request
+from fastapi import Response
+from fastapi import Security
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from main.database import ingest
+from main.database.engine import async_db_session
+from main.database.engine import db_session
+from main.database.models.basemodel import as_utc
+from main.database.models.basemodel import utc_now
+from main.database.models.inventory import Inventory
+from main.database.queries.inventory import apply_stock_movement
+from main.database.queries.inventory import transaction_history_stmt
+from main.database.routing import async_read_session
+from main.database.routing import set_consistency_token
+from main.database.routing import set_consistency_token_sync
+from main.sub_apps import require_scope
+from main.utils import http_exc
+from main.validators.inventory_transaction import (
+    BulkIngestResponseValidator,
+)
+from main.validators.inventory_transaction import (
+    InventoryTransactionResponseValidator,
+)
+from main.validators.inventory_transaction import (
+    StockMovementRequestValidator,
+)
+from main.validators.inventory_transaction import (
+    StockMovementResponseValidator,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Annotated
+from uuid import UUID
+
+
+# instantiate the inventory fastpi router object
+router = APIRouter()
+
+# stock movements are sent by admins and by service clients, POS terminals
+# and ETL jobs, with an API key granting this scope
+WRITE_SCOPE = "inventory:write"
+
+# default period and maximum size of a transaction history page
+DEFAULT_HISTORY_PERIOD = timedelta(days=30)
+MAX_HISTORY_SIZE = 1000
+
+
+@router.post(
+    "/stock-movement",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Security(require_scope(WRITE_SCOPE))],
+    response_model=StockMovementResponseValidator,
+    tags=["WRITE"],
+)
+async def move_stock(
+    request: StockMovementRequestValidator,
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Record an inventory transaction and apply its signed quantity to the
+    inventory stock in a single atomic database operation
+    """
+    movement = await apply_stock_movement(
+        session, request.inventory_id, request.quantity, request.non_negative
+    )
+    if not movement:
+        # find out whether the inventory is missing or the movement oversold it
+        stock = await session.scalar(
+            select(Inventory.quantity).where(
+                Inventory.id == request.inventory_id
+            )
+        )
+        await session.rollback()
+        if stock is None:
+            raise http_exc.not_found(Inventory, request.inventory_id)
+        raise http_exc.conflict(
+            ValueError(
+                f"Insufficient stock {stock} for a movement of "
+                f"{request.quantity}"
+            )
+        )
+    await session.commit()
+    # let the next reads of the client observe the new stock
+    await set_consistency_token(session, response)
+
+    return movement._asdict()
+
+
+def ingest_batch(
+    session: Session, response: Response, body: bytes, content_type: str
+) -> ingest.IngestResult:
+    """
+    parse, validate and ingest a batch of stock movements in a single
+    transaction, run in the threadpool as the COPY goes through the
+    synchronous driver
+
+    parameters
+    ----------
+    session: Session
+        synchronous session of the ingestion
+    response: Response
+        response the consistency token is attached to
+    body: bytes
+        body of the batch
+    content_type: str
+        media type of the batch
+
+    return: IngestResult
+    """
+    try:
+        rows = ingest.parse_batch(body, content_type)
+    except ingest.BatchValidationError as err_obj:
+        raise http_exc.unprocessable_entity(err_obj.errors)
+    except ValueError as err_obj:
+        raise http_exc.unsupported_media_type(err_obj)
+    try:
+        movements = ingest.validate_batch(rows)
+        result = ingest.ingest_transactions(session, movements)
+    except ingest.BatchValidationError as err_obj:
+        raise http_exc.unprocessable_entity(err_obj.errors)
+    except ingest.UnknownInventoryError as err_obj:
+        session.rollback()
+        raise http_exc.not_found(
+            Inventory, ", ".join(map(str, err_obj.inventory_ids))
+        )
+    session.commit()
+    # let the next reads of the client observe the new stock
+    set_consistency_token_sync(session, response)
+    return result
+
+
+@router.post(
+    "/inventory-transactions/bulk",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Security(require_scope(WRITE_SCOPE))],
+    response_model=BulkIngestResponseValidator,
+    tags=["WRITE"],
+)
+async def ingest_transactions(
+    request: Request,
+    response: Response,
+    session: Session = Depends(db_session),
+):
+    """
+    Ingest a batch of stock movements sent as NDJSON (application/x-ndjson),
+    one {"inventory_id", "quantity"} object per line, or as CSV (text/csv)
+    with an inventory_id,quantity header. The batch is validated as a whole,
+    copied into a staging table and merged into the inventory transactions
+    and stocks by a single statement. Invalid rows or unknown inventories
+    reject the whole batch
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    result = await run_in_threadpool(
+        ingest_batch, session, response, body, content_type
+    )
+    return result._asdict()
+
+
+@router.get(
+    "/inventory-transactions/{inventory_id}",
+    response_model=list[InventoryTransactionResponseValidator],
+    tags=["READ"],
+)
+async def transaction_history(
+    inventory_id: UUID,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_HISTORY_SIZE)] = 100,
+    session: AsyncSession = Depends(async_read_session),
+):
+    """
+    Get the most recent transactions of an inventory created between since
+    and until, the last 30 days by default. Only the partitions of the
+    inventory_transaction table covering the period are scanned
+    """
+    until = as_utc(until) if until else utc_now()
+    since = as_utc(since) if since else until - DEFAULT_HISTORY_PERIOD
+    stmt = transaction_history_stmt(inventory_id, since, until, limit)
+    return (await session.scalars(stmt)).all()
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+This module contains the product router and path operations for writing to
+the Product database table
+"""
+import csv
+import io
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Response
+from fastapi import Security
+from fastapi import UploadFile
+from main.database.catalog_import import check_header
+from main.database.catalog_import import import_catalog
+from main.database.engine import async_db_session
+from main.database.models.product import Product
+from main.database.notify import publish_change
+from main.database.queries.product import upsert_product
+from main.database.routing import set_consistency_token
+from main.sub_apps import require_scope
+from main.sub_apps.admin_routers.inventory import WRITE_SCOPE
+from main.utils import http_exc
+from main.utils import sqlalchemy_err_utils
+from main.validators.catalog_import import CatalogImportResponseValidator
+from main.validators.product import ProductRequestValidator
+from main.validators.product import ProductResponseValidator
+from sqlalchemy import exc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# instantiate the product fastpi router object
+router = APIRouter()
+
+
+@router.put(
+    "/product",
+    dependencies=[Security(require_scope(WRITE_SCOPE))],
+    response_model=ProductResponseValidator,
+    tags=["WRITE"],
+)
+async def put_product(
+    request: ProductRequestValidator,
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Insert a product into the Product table, or update the product holding
+    the same sku in place, with a single INSERT ... ON CONFLICT (sku) DO
+    UPDATE statement
+    """
+    # category listing the product before the upsert, if it existed
+    stmt = select(Product.category_id).where(Product.sku == request.sku)
+    previous_category_id = await session.scalar(stmt)
+    try:
+        prod_obj = await upsert_product(session, request.model_dump())
+        # load the inventories of the response in the same transaction
+        await session.refresh(prod_obj, ["inventories"])
+        await publish_change(session, "product", [prod_obj.id])
+        # the cached categories list their products
+        await publish_change(
+            session,
+            "category",
+            {prod_obj.category_id, previous_category_id} - {None},
+        )
+        # commit the changes to the database
+        await session.commit()
+    except exc.IntegrityError as IntegrityError:
+        # the name belongs to another sku or the category does not exist
+        await session.rollback()
+        raise sqlalchemy_err_utils.integrity_error_handler(IntegrityError)
+    # let the next reads of the client observe the product
+    await set_consistency_token(session, response)
+
+    return prod_obj
+
+
+@router.post(
+    "/products/import",
+    dependencies=[Security(require_scope(WRITE_SCOPE))],
+    response_model=CatalogImportResponseValidator,
+    tags=["WRITE"],
+)
+async def import_products(
+    file: UploadFile,
+    response: Response,
+    session: AsyncSession = Depends(async_db_session),
+):
+    """
+    Import a supplier catalog uploaded as a CSV file with the columns
+    category_code, sku, name, price and optionally description, is_active,
+    country and quantity, one row per product and country. The file is read
+    in chunks, each validated and upserted in bulk in its own transaction.
+    Invalid rows are left out and reported with their zero based row index
+    """
+    # the upload is spooled to a temporary file, read it a chunk at a time
+    file_obj = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(file_obj)
+        # a file that is not UTF-8 CSV is rejected when it is read, the
+        # chunks read before stay imported
+        try:
+            check_header(reader.fieldnames)
+            report = await import_catalog(session, reader)
+        except (ValueError, csv.Error) as value_error:
+            raise http_exc.bad_request(value_error)
+    finally:
+        # leave the upload to be closed by its owner
+        file_obj.detach()
+    # let the next reads of the client observe the catalog
+    await set_consistency_token(session, response)
+
+    return report._asdict()
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""
+This module contains the in-memory table verifying the API keys of the
+service clients
+
+A key is sent as "<key_id>.<secret>", it is verified by comparing the
+HMAC-SHA256 of the secret, keyed with the server pepper, to the hash of the key
+held in memory, without any database round trip. The table is reloaded from
+the database in the background, periodically and whenever a key is changed,
+and revoked keys are evicted as soon as the change is notified
+
+usage:
+    entry = api_key_registry.verify(request.headers["X-API-Key"])
+    if entry is None or "inventory:write" not in entry.scopes:
+        ...
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyEntry(NamedTuple):
+    """verified fields of an active API key"""
+
+    key_id: str
+    secret_hash: str
+    scopes: frozenset[str]
+
+
+class ApiKeyRegistry:
+    """in-memory table of the active API keys of the worker"""
+
+    def __init__(self, pepper: bytes) -> None:
+        """
+        Initializes an empty table
+
+        parameters
+        ----------
+        pepper: bytes
+            key of the HMAC of the secrets, shared by every worker
+        """
+        self.pepper = pepper
+        self.keys: dict[str, ApiKeyEntry] = {}
+        # bumped by every eviction so that a reload started before it does
+        # not restore an evicted key
+        self._generation = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Event | None = None
+
+    def hash_secret(self, secret: str) -> str:
+        """
+        return the stored hash of an API key secret
+
+        parameters
+        ----------
+        secret: str
+            secret part of the key
+
+        return: str
+        """
+        return hmac.new(
+            self.pepper, secret.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+    def verify(self, api_key: str) -> ApiKeyEntry | None:
+        """
+        return the entry of a valid API key, None otherwise
+
+        parameters
+        ----------
+        api_key: str
+            key sent by the client, "<key_id>.<secret>"
+
+        return: ApiKeyEntry | None
+        """
+        key_id, _, secret = api_key.partition(".")
+        entry = self.keys.get(key_id)
+        if entry is None or not secret:
+            return None
+        # constant time comparison, the hash is not leaked through timing
+        if not hmac.compare_digest(
+            self.hash_secret(secret), entry.secret_hash
+        ):
+            return None
+        return entry
+
+    def add(self, entry: ApiKeyEntry) -> None:
+        """
+        make a key usable immediately, used by the worker creating it
+
+        parameters
+        ----------
+        entry: ApiKeyEntry
+            entry of the new key
+        """
+        self.keys[entry.key_id] = entry
+
+    def evict(self, *key_ids: str) -> None:
+        """
+        drop keys from the table, reloads in flight are discarded
+
+        parameters
+        ----------
+        key_ids: str
+            key_id of the keys to drop
+        """
+        self._generation += 1
+        for key_id in key_ids:
+            self.keys.pop(key_id, None)
+
+    def request_refresh(self) -> None:
+        """wake the background reload up, safe to call from any thread"""
+        # read both once, the reload task resets them when it stops
+        loop, changed = self._loop, self._changed
+        if loop is not None and changed is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(changed.set)
+
+    async def refresh(
+        self, load: Callable[[], Awaitable[Iterable[ApiKeyEntry]]]
+    ) -> bool:
+        """
+        replace the table with the active keys read from the database
+
+        parameters
+        ----------
+        load: Callable
+            coroutine function returning the entries of the active keys
+
+        return: bool
+            False when the keys were evicted during the reload and it has
+            to be repeated
+        """
+        generation = self._generation
+        keys = {entry.key_id: entry for entry in await load()}
+        if generation != self._generation:
+            return False
+        self.keys = keys
+        return True
+
+    async def run(
+        self,
+        load: Callable[[], Awaitable[Iterable[ApiKeyEntry]]],
+        interval: float,
+    ) -> None:
+        """
+        reload the table every interval seconds and when a change is
+        requested, until cancelled. A failed reload keeps the current table
+
+        parameters
+        ----------
+        load: Callable
+            coroutine function returning the entries of the active keys
+        interval: float
+            seconds between two periodic reloads
+        """
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        try:
+            while True:
+                self._changed.clear()
+                try:
+                    if not await self.refresh(load):
+                        continue
+                except Exception as err_obj:
+                    logger.warning("API keys reload failed: %s", err_obj)
+                try:
+                    await asyncio.wait_for(self._changed.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = self._changed = None
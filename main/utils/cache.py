@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""
+This module contains the bounded in-process cache of the read path operations
+
+Entries expire ttl seconds after they were stored and the least recently used
+entry is evicted once the cache holds maxsize entries. Concurrent misses on
+the same key wait for the single load started by the first one, so a cold key
+under load costs one database query
+"""
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+
+
+class TTLCache:
+    """least recently used cache whose entries expire after a time to live"""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """
+        Initializes an empty cache
+
+        parameters
+        ----------
+        maxsize: int
+            maximum number of entries held
+        ttl: float
+            seconds an entry is served after it was stored
+        clock: Callable
+            source of the current time in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Future] = {}
+        # bumped by every invalidation so that loads started before it do
+        # not store the value they read
+        self._generation = 0
+
+    def __len__(self) -> int:
+        """return the number of entries held, expired ones included"""
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        return the live value stored for the key, counting a hit or a miss
+
+        parameters
+        ----------
+        key: Hashable
+            key of the value
+        default: Any
+            value returned on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        store the value for the key, evicting the least recently used entry
+        when the cache is full
+
+        parameters
+        ----------
+        key: Hashable
+            key of the value
+        value: Any
+            value to store
+        """
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """
+        drop the entries of the keys, loads in flight are not stored
+
+        parameters
+        ----------
+        keys: Hashable
+            keys of the entries to drop
+        """
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def invalidate_if(self, predicate: Callable[[Hashable, Any], bool]):
+        """
+        drop the entries for which the predicate is true, loads in flight are
+        not stored
+
+        parameters
+        ----------
+        predicate: Callable
+            called with the key and the value of every entry
+        """
+        self._generation += 1
+        for key in [
+            key
+            for key, (_, value) in self._entries.items()
+            if predicate(key, value)
+        ]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """drop every entry, loads in flight are not stored"""
+        self._generation += 1
+        self._entries.clear()
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        return the value of the key, loading it on a miss. A miss on a key
+        that is already being loaded waits for that load instead of starting
+        another one. None results are returned but not stored
+
+        parameters
+        ----------
+        key: Hashable
+            key of the value
+        loader: Callable
+            coroutine function reading the value from its source
+
+        return: Any
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        pending = self._loading.get(key)
+        if pending is not None:
+            # shield the shared load from the cancellation of a waiter
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err_obj:
+            future.set_exception(err_obj)
+            # mark the exception retrieved, it is raised here and there may
+            # be no waiter to retrieve it
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if value is not None and generation == self._generation:
+                self.set(key, value)
+            return value
+        finally:
+            del self._loading[key]
+
+    def stats(self) -> dict:
+        """return the size and the counters of the cache"""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -5,9 +5,10 @@ HTTPException depending on error type
 """
 from fastapi import status
 from fastapi import HTTPException
+from uuid import UUID
 
 
-def not_found(model, identifier: str):
+def not_found(model, identifier: str | UUID):
     """
     404_NOT_FOUND exception
 
@@ -15,7 +16,7 @@ def not_found(model, identifier: str):
     ----------
     model_name: str
         The sqlalchemy model queried
-    identifier: str
+    identifier: str | UUID
         The identifier used as query filter
 
     return: HTTPException
@@ -57,3 +58,36 @@ def bad_request(sql_exc: Exception):
     return HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST, detail=str(sql_exc)
     )
+
+
+def unprocessable_entity(errors: list):
+    """
+    422_UNPROCESSABLE_ENTITY error raised when rows of a batch are invalid
+
+    parameters
+    ----------
+    errors: list
+        errors of the invalid rows
+
+    return: HTTPException
+    """
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors
+    )
+
+
+def unsupported_media_type(err: Exception):
+    """
+    415_UNSUPPORTED_MEDIA_TYPE error raised when a request body is sent in a
+    format the path operation does not read
+
+    parameters
+    ----------
+    err:
+        error raised on reading the body
+
+    return: HTTPException
+    """
+    return HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(err)
+    )
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""
+This module contains the keyring signing and verifying the authentication
+tokens
+
+The PEM files are parsed once into key objects, PyJWT uses key objects as they
+are instead of parsing the PEM again on every encode and decode. Every key has
+an identifier sent in the kid header of the tokens it signs, so several keys
+can verify tokens at the same time while a key is rotated, and its algorithm
+is fixed by the key type, a token cannot select another one
+
+usage:
+    keyring = load_keyring(get_jwt_env_vars())
+    token = keyring.sign({"sub": "admin@admin.com", "exp": expire})
+    payload = keyring.verify(token)
+"""
+import hashlib
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from cryptography.hazmat.primitives.serialization import PublicFormat
+from jwt.exceptions import InvalidTokenError
+from main.validators.config import JWTEnvironmentVariableValidator
+from main.validators.config import JWTKeyValidator
+from typing import Any
+from typing import NamedTuple
+
+# algorithm of the elliptic curve keys by curve name
+CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+class JWTKey(NamedTuple):
+    """parsed key of the keyring, private_key is None for verify only keys"""
+
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Any = None
+
+
+def key_algorithm(public_key) -> str:
+    """
+    return the signature algorithm used with the key
+
+    parameters
+    ----------
+    public_key:
+        public key object
+
+    return: str
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if (
+        isinstance(public_key, ec.EllipticCurvePublicKey)
+        and public_key.curve.name in CURVE_ALGORITHMS
+    ):
+        return CURVE_ALGORITHMS[public_key.curve.name]
+    raise ValueError(f"Unsupported token key type {type(public_key)}")
+
+
+def key_id(public_key) -> str:
+    """
+    return an identifier derived from the public key, the same in every
+    worker loading the key
+
+    parameters
+    ----------
+    public_key:
+        public key object
+
+    return: str
+    """
+    der = public_key.public_bytes(
+        Encoding.DER, PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def load_key(config: JWTKeyValidator) -> JWTKey:
+    """
+    parse the PEM files of a key
+
+    parameters
+    ----------
+    config: JWTKeyValidator
+        files and settings of the key
+
+    return: JWTKey
+    """
+    private_key = public_key = None
+    if config.private_key_file:
+        with open(config.private_key_file, "rb") as file_obj:
+            private_key = load_pem_private_key(file_obj.read(), password=None)
+        public_key = private_key.public_key()
+    if config.public_key_file:
+        with open(config.public_key_file, "rb") as file_obj:
+            public_key = load_pem_public_key(file_obj.read())
+    if public_key is None:
+        raise ValueError("A token key needs a private or a public key file")
+    return JWTKey(
+        config.kid or key_id(public_key),
+        config.algorithm or key_algorithm(public_key),
+        public_key,
+        private_key,
+    )
+
+
+class Keyring:
+    """active keys of the authentication tokens"""
+
+    def __init__(self, keys: list[JWTKey], signing_kid: str | None = None):
+        """
+        Initializes the keyring
+
+        parameters
+        ----------
+        keys: list[JWTKey]
+            keys verifying tokens
+        signing_kid: str | None
+            kid of the key signing new tokens, the first key with a private
+            key when None
+        """
+        self.keys = {key.kid: key for key in keys}
+        signing_keys = [
+            key
+            for key in keys
+            if key.private_key is not None and signing_kid in (None, key.kid)
+        ]
+        if not signing_keys:
+            raise ValueError(f"No private token key with kid {signing_kid}")
+        self.signing_key = signing_keys[0]
+
+    def sign(self, payload: dict) -> str:
+        """
+        sign the payload with the signing key
+
+        parameters
+        ----------
+        payload: dict
+            claims of the token
+
+        return: str
+        """
+        return jwt.encode(
+            payload,
+            self.signing_key.private_key,
+            algorithm=self.signing_key.algorithm,
+            headers={"kid": self.signing_key.kid},
+        )
+
+    def verify(self, token: str, **options) -> dict:
+        """
+        verify the token with the key named by its kid header and return its
+        claims, tokens without a kid were signed before keys were identified
+        and are verified with the signing key
+
+        parameters
+        ----------
+        token: str
+            encoded token
+        options:
+            keyword arguments of jwt.decode
+
+        return: dict
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.signing_key if kid is None else self.keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown token key {kid}")
+        return jwt.decode(token, key.public_key, [key.algorithm], **options)
+
+
+def load_keyring(config: JWTEnvironmentVariableValidator) -> Keyring:
+    """
+    parse the configured keys into a keyring
+
+    parameters
+    ----------
+    config: JWTEnvironmentVariableValidator
+        authentication token settings
+
+    return: Keyring
+    """
+    return Keyring(
+        [load_key(key_config) for key_config in config.JWT_KEYS],
+        config.JWT_SIGNING_KID,
+    )
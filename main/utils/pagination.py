@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""
+This module contains utility functions to encode and decode the opaque cursors
+used by keyset paginated listings
+"""
+import json
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+from uuid import UUID
+
+
+def encode_cursor(created: datetime, identifier: UUID) -> str:
+    """
+    encode the (created, id) keyset position of the last row of a page into an
+    opaque cursor
+
+    parameters
+    ----------
+    created: datetime
+        created value of the last row of the page
+    identifier: UUID
+        id of the last row of the page
+
+    return: str
+    """
+    position = json.dumps([created.isoformat(), str(identifier)])
+    return urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    decode an opaque cursor back into its (created, id) keyset position
+
+    parameters
+    ----------
+    cursor: str
+        cursor returned with a previous page
+
+    return: tuple
+        (created, id)
+
+    raises: ValueError
+        if the cursor is malformed
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        created, identifier = json.loads(urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(created), UUID(identifier)
+    except (Base64Error, TypeError, ValueError) as err_obj:
+        raise ValueError(f"invalid cursor {cursor}") from err_obj
@@ -0,0 +1,291 @@
+#!/usr/bin/python3
+"""
+This module contains the hashing and verification of the admin passwords
+
+PBKDF2 keeps a CPU busy for tens of milliseconds per hash, run on the event
+loop a burst of logins stalls every other request of the worker. The hashes
+are computed in a pool of processes instead, threads where processes are not
+available, and at most max_concurrency of them at the same time, the others
+waiting in a queue whose length and wait time are reported by stats
+
+usage:
+    password = Password(await password_hasher.hash(secret))
+    valid, new_hash = await password_hasher.verify_and_update(secret, stored)
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from main.validators.config import get_password_env_vars
+from main.validators.config import PasswordEnvironmentVariableValidator
+from passlib.context import CryptContext
+from typing import Any
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# scheme of the admin password column
+SCHEME = "pbkdf2_sha512"
+
+
+@lru_cache
+def crypt_context(rounds: int) -> CryptContext:
+    """
+    return the passlib context hashing with the rounds, built once per
+    process of the pool
+
+    parameters
+    ----------
+    rounds: int
+        iterations of new hashes, hashes with fewer need an update
+    """
+    return CryptContext(
+        schemes=[SCHEME],
+        **{
+            f"{SCHEME}__default_rounds": rounds,
+            f"{SCHEME}__min_rounds": rounds,
+        },
+    )
+
+
+def hash_password(secret: str, rounds: int) -> str:
+    """
+    hash the secret, run in the pool
+
+    parameters
+    ----------
+    secret: str
+        password in clear
+    rounds: int
+        iterations of the hash
+
+    return: str
+    """
+    return crypt_context(rounds).hash(secret)
+
+
+def verify_password(
+    secret: str, hash_: str | bytes, rounds: int
+) -> tuple[bool, str | None]:
+    """
+    check the secret against a stored hash, run in the pool
+
+    parameters
+    ----------
+    secret: str
+        password in clear
+    hash_: str | bytes
+        stored hash
+    rounds: int
+        iterations of new hashes
+
+    return: tuple[bool, str | None]
+        whether the secret matches and, when it does and the stored hash is
+        outdated, a new hash of the secret
+    """
+    return crypt_context(rounds).verify_and_update(secret, hash_)
+
+
+class PasswordHasher:
+    """bounded pool hashing and verifying passwords off the event loop"""
+
+    def __init__(
+        self,
+        rounds: int,
+        executor: str = "process",
+        workers: int | None = None,
+        max_concurrency: int | None = None,
+    ) -> None:
+        """
+        Initializes the hasher, the pool is started by the first hash
+
+        parameters
+        ----------
+        rounds: int
+            iterations of new hashes
+        executor: str
+            "process" or "thread"
+        workers: int | None
+            workers of the pool, the cpu count when None
+        max_concurrency: int | None
+            hashes computed at the same time, the number of workers when None
+        """
+        self.rounds = rounds
+        self.executor_kind = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self._executor: Executor | None = None
+        # one semaphore per event loop, asyncio primitives are bound to the
+        # loop they are first used in
+        self._semaphores: dict[asyncio.AbstractEventLoop, Any] = {}
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _start_executor(self) -> Executor:
+        """start the pool, falling back to threads if processes fail"""
+        if self.executor_kind == "process":
+            try:
+                # forked children would inherit the threads and sockets of
+                # the worker, a fork server starts them from a clean process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                return ProcessPoolExecutor(self.workers, mp_context=context)
+            except (OSError, NotImplementedError, ImportError) as err_obj:
+                logger.warning(
+                    "password process pool unavailable, using threads: %s",
+                    err_obj,
+                )
+                self.executor_kind = "thread"
+        # hashlib releases the GIL while computing PBKDF2, threads hash in
+        # parallel as well
+        return ThreadPoolExecutor(
+            self.workers, thread_name_prefix="password-hasher"
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """return the concurrency cap of the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            self._semaphores = {
+                known_loop: known
+                for known_loop, known in self._semaphores.items()
+                if not known_loop.is_closed()
+            }
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(
+                self.max_concurrency
+            )
+        return semaphore
+
+    async def _run(self, function: Callable, *args) -> Any:
+        """
+        run the function in the pool once a slot of the concurrency cap is
+        free, restarting a broken process pool with threads
+        """
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            semaphore = self._semaphore()
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.perf_counter()
+        wait = started_at - queued_at
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.in_flight += 1
+        try:
+            if self._executor is None:
+                self._executor = self._start_executor()
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._executor, function, *args
+                )
+            except BrokenProcessPool as err_obj:
+                logger.warning(
+                    "password process pool broken, using threads: %s",
+                    err_obj,
+                )
+                # release the dead pool and its management thread
+                self._executor.shutdown(wait=False)
+                self.executor_kind = "thread"
+                self._executor = self._start_executor()
+                return await loop.run_in_executor(
+                    self._executor, function, *args
+                )
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - started_at
+            semaphore.release()
+
+    async def hash(self, secret: str) -> str:
+        """
+        hash a new password
+
+        parameters
+        ----------
+        secret: str
+            password in clear
+
+        return: str
+        """
+        return await self._run(hash_password, secret, self.rounds)
+
+    async def verify_and_update(
+        self, secret: str, hash_: str | bytes
+    ) -> tuple[bool, str | None]:
+        """
+        check a password against its stored hash
+
+        parameters
+        ----------
+        secret: str
+            password in clear
+        hash_: str | bytes
+            stored hash
+
+        return: tuple[bool, str | None]
+            whether the password matches and the new hash to store when the
+            stored one is outdated
+        """
+        return await self._run(verify_password, secret, hash_, self.rounds)
+
+    def stats(self) -> dict:
+        """return the configuration and the queueing counters of the pool"""
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "rounds": self.rounds,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+            "run_seconds": self.run_seconds,
+        }
+
+    def shutdown(self) -> None:
+        """stop the workers of the pool, a later hash starts a new one"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+def create_password_hasher(
+    config: PasswordEnvironmentVariableValidator,
+) -> PasswordHasher:
+    """
+    return the hasher configured by the environment variables
+
+    parameters
+    ----------
+    config: PasswordEnvironmentVariableValidator
+        password hashing settings
+
+    return: PasswordHasher
+    """
+    return PasswordHasher(
+        config.PASSWORD_ROUNDS,
+        config.PASSWORD_EXECUTOR,
+        config.PASSWORD_WORKERS,
+        config.PASSWORD_MAX_CONCURRENCY,
+    )
+
+
+# hasher of the worker, its pool is started by the first request hashing
+password_hasher = create_password_hasher(get_password_env_vars())
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""
+This module contains the generator of the time ordered UUID version 7 ids
+
+A UUIDv7 (RFC 9562) starts with the 48 bit unix timestamp in milliseconds, so
+new ids always land on the right edge of the primary key B-tree instead of on
+random pages. The 12 bits following the version are used as a counter within
+the millisecond, keeping the ids generated by a process strictly increasing,
+and the last 62 bits are random
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from sqlalchemy import literal_column
+from sqlalchemy import UUID as SQL_UUID
+from sqlalchemy.sql.expression import ColumnElement
+from uuid import UUID
+
+# largest value of the 12 bit counter within a millisecond
+MAX_COUNTER = 0xFFF
+RAND_B_MASK = (1 << 62) - 1
+
+# the first 6 bytes of a random UUID are overlaid with the millisecond
+# timestamp and its version nibble is turned from 4 into 7
+UUID7_SQL = (
+    "encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) PLACING "
+    "substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)"
+    "::bigint) FROM 3) FROM 1 FOR 6), 52, 1), 53, 1), 'hex')::uuid"
+)
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> UUID:
+    """
+    generate a time ordered UUID version 7, every id generated by the process
+    is greater than the ones generated before it
+
+    return: UUID
+    """
+    global _last_ms, _counter
+    rand = int.from_bytes(os.urandom(10), "big")
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_ms:
+            # a new millisecond starts the counter at a random value leaving
+            # room for at least 2048 more ids
+            _last_ms = timestamp_ms
+            _counter = (rand >> 64) & 0x7FF
+        else:
+            # same millisecond, or the clock went back, keep counting and
+            # borrow the next millisecond when the counter is exhausted
+            _counter += 1
+            if _counter > MAX_COUNTER:
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+    return UUID(
+        int=(timestamp_ms << 80)
+        | (0x7 << 76)
+        | (counter << 64)
+        | (0b10 << 62)
+        | (rand & RAND_B_MASK)
+    )
+
+
+def uuid7_time(value: UUID) -> datetime:
+    """
+    return the UTC time, to the millisecond, a UUID version 7 was generated at
+
+    parameters
+    ----------
+    value: UUID
+        UUID version 7
+
+    return: datetime
+    """
+    if value.version != 7:
+        raise ValueError(f"{value} is not a version 7 UUID")
+    return datetime.fromtimestamp((value.int >> 80) / 1000, timezone.utc)
+
+
+def uuid7_sql() -> ColumnElement:
+    """
+    postgresql expression generating a UUID version 7 in the database, for
+    the ids of rows created by set based statements. Unlike uuid7 the ids are
+    only ordered to the millisecond
+
+    return: ColumnElement
+    """
+    return literal_column(UUID7_SQL, SQL_UUID)
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+This module contains the validator models of the service client API keys
+"""
+from main.validators.basemodel import Base
+from main.validators.basemodel import base_config
+from pydantic import BaseModel
+from pydantic import field_validator
+from typing import Literal
+
+# scopes an API key can be granted
+ApiKeyScope = Literal["inventory:write", "inventory:export", "inventory:stats"]
+
+
+class ApiKeyRequestValidator(BaseModel):
+    """Validator model for a new API key recieved from a web request"""
+
+    name: str
+    scopes: list[ApiKeyScope]
+
+
+class ApiKeyResponseValidator(Base, BaseModel):
+    """Validator model for an API key sent with a web response"""
+
+    model_config = base_config
+
+    name: str
+    key_id: str
+    scopes: list[str]
+    revoked: bool
+
+    @field_validator("scopes", mode="before")
+    @classmethod
+    def split_scopes(cls, value):
+        """split the space separated scopes stored with the key"""
+        return value.split() if isinstance(value, str) else value
+
+
+class NewApiKeyResponseValidator(ApiKeyResponseValidator):
+    """
+    Validator model for a created API key, the only response carrying the
+    key itself
+    """
+
+    api_key: str
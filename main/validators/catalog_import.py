@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+This module contains the pydantic models validating the rows of a catalog
+import and its report
+"""
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import model_validator
+from pydantic_extra_types.country import CountryAlpha2
+from typing import Optional
+
+
+class CatalogImportRowValidator(BaseModel):
+    """
+    Validator model for a row of a catalog import, a product of a category
+    and optionally its inventory in a country. The lengths are those of the
+    product and category columns
+    """
+
+    category_code: str = Field(max_length=5)
+    sku: str = Field(max_length=8)
+    name: str = Field(max_length=30)
+    description: Optional[str] = None
+    price: float
+    is_active: bool = True
+    country: Optional[CountryAlpha2] = None
+    quantity: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_inventory(self):
+        """an inventory needs both its country and its quantity"""
+        if (self.country is None) != (self.quantity is None):
+            raise ValueError("country and quantity must be given together")
+        return self
+
+
+class CatalogImportRowErrorValidator(BaseModel):
+    """Validator model for the errors of a row left out of an import"""
+
+    row: int
+    errors: list[dict]
+
+
+class CatalogImportResponseValidator(BaseModel):
+    """Validator model for the report of a catalog import"""
+
+    rows: int
+    products: int
+    inventories: int
+    errors: list[CatalogImportRowErrorValidator]
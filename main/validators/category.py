@@ -3,6 +3,7 @@
 This module contains the pydantic model for validation of input and output data
 for the category orm model
 """
+
 from main.validators.basemodel import Base
 from main.validators.basemodel import base_config
 from main.validators.basemodel import BaseResponseValidator
@@ -26,3 +27,33 @@ class CategoryResponseValidator(Base, CategoryRequestValidator):
     """Validator model for category model data sent with a web response"""
 
     products: list[BaseResponseValidator]
+
+
+class CategoryPageResponseValidator(BaseModel):
+    """
+    Validator model for a page of categories sent with a web response, the
+    next_cursor is None on the last page
+    """
+
+    items: list[CategoryResponseValidator]
+    next_cursor: str | None = None
+
+
+class CategoryConflictValidator(BaseModel):
+    """
+    Validator model for a category of a batch that was not created because
+    its name or code is already taken, index is its position in the batch
+    """
+
+    index: int
+    detail: list[str]
+
+
+class CategoryBulkResponseValidator(BaseModel):
+    """
+    Validator model for the outcome of a batch of new categories sent with a
+    web response
+    """
+
+    created: list[CategoryResponseValidator]
+    conflicts: list[CategoryConflictValidator]
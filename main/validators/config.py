@@ -3,6 +3,8 @@
 This module contains validator for environment variables in the project .env file
 """
 from functools import lru_cache
+from pydantic import BaseModel
+from pydantic import SecretStr
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 from typing import Literal
@@ -11,7 +13,8 @@ from typing import Literal
 class DBEnvironmentVariableValidator(BaseSettings):
     """Database Environment variable validator class"""
 
-    model_config = SettingsConfigDict(env_file=".env")
+    # the .env file also holds the variables of the other validators
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     DB_NAME: str
     DB_USER: str
@@ -19,8 +22,104 @@ class DBEnvironmentVariableValidator(BaseSettings):
     DB_PORT: int
     DB_PASSWORD: str
 
+    # connection pool configuration, applied once per worker process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+
+    # read replicas as a json list of "host" or "host:port" entries
+    DB_REPLICA_HOSTS: list[str] = []
+    # seconds a read with a consistency token waits for a replica to catch up
+    # before it is sent to the primary instead
+    DB_REPLICA_MAX_WAIT: float = 0.0
+    DB_REPLICA_POLL_INTERVAL: float = 0.05
+
 
 @lru_cache
 def get_db_env_vars():
     """return database environment variables validator"""
     return DBEnvironmentVariableValidator()
+
+
+class JWTKeyValidator(BaseModel):
+    """
+    key of the tokens, a key without a private key file only verifies the
+    tokens signed before it was retired
+    """
+
+    private_key_file: str | None = None
+    public_key_file: str | None = None
+    # identifier sent in the kid header, derived from the public key when
+    # not set
+    kid: str | None = None
+    # inferred from the key type when not set, RS256, ES256 or EdDSA
+    algorithm: str | None = None
+
+
+class JWTEnvironmentVariableValidator(BaseSettings):
+    """Authentication token environment variable validator class"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # active keys as a json list of JWTKeyValidator objects, a key is rotated
+    # by adding the new one, signing with it once every worker loaded it and
+    # removing the old one after the lifetime of the tokens it signed
+    JWT_KEYS: list[JWTKeyValidator] = [
+        JWTKeyValidator(
+            private_key_file="private_key.pem",
+            public_key_file="public_key.pem",
+        )
+    ]
+    # kid of the key signing new tokens, the first key with a private key
+    # when not set
+    JWT_SIGNING_KID: str | None = None
+
+
+@lru_cache
+def get_jwt_env_vars():
+    """return authentication token environment variables validator"""
+    return JWTEnvironmentVariableValidator()
+
+
+class PasswordEnvironmentVariableValidator(BaseSettings):
+    """Password hashing environment variable validator class"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # pbkdf2_sha512 iterations of new hashes, stored hashes with fewer are
+    # rehashed on the next successful login
+    PASSWORD_ROUNDS: int = 25_000
+    # pool the hashes are computed in, thread pools are used where process
+    # pools are not available
+    PASSWORD_EXECUTOR: Literal["process", "thread"] = "process"
+    # workers of the pool, the cpu count when not set
+    PASSWORD_WORKERS: int | None = None
+    # hashes computed at the same time, the others wait in a queue
+    PASSWORD_MAX_CONCURRENCY: int | None = None
+
+
+@lru_cache
+def get_password_env_vars():
+    """return password hashing environment variables validator"""
+    return PasswordEnvironmentVariableValidator()
+
+
+class ApiKeyEnvironmentVariableValidator(BaseSettings):
+    """Service API key environment variable validator class"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # secret mixed into the stored hashes of the API key secrets, a leaked
+    # api_key table alone does not allow to verify guessed secrets
+    API_KEY_PEPPER: SecretStr
+    # seconds between two reloads of the in-memory key table, changes made by
+    # other workers are also loaded as soon as they are notified
+    API_KEY_REFRESH_INTERVAL: float = 30.0
+
+
+@lru_cache
+def get_api_key_env_vars():
+    """return service API key environment variables validator"""
+    return ApiKeyEnvironmentVariableValidator()
@@ -28,3 +28,33 @@ class InventoryTransactionResponseValidator(
     """
 
     pass
+
+
+class StockMovementRequestValidator(InventoryTransactionRequestValidator):
+    """
+    Validator model for a stock movement recieved from a web request, the
+    movement is rejected when non_negative is set and it would take the
+    inventory stock below zero
+    """
+
+    non_negative: bool = True
+
+
+class StockMovementResponseValidator(BaseModel):
+    """Validator model for a recorded stock movement sent with a web response"""
+
+    model_config = base_config
+
+    id: UUID
+    inventory_id: UUID
+    stock: int
+
+
+class BulkIngestResponseValidator(BaseModel):
+    """
+    Validator model for the outcome of an ingested batch of inventory
+    transactions sent with a web response
+    """
+
+    transactions: int
+    inventories: int
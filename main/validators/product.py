@@ -7,6 +7,7 @@ from main.validators.basemodel import Base
 from main.validators.basemodel import base_config
 from main.validators.basemodel import BaseResponseValidator
 from pydantic import BaseModel
+from pydantic import Field
 from typing import Optional
 from uuid import UUID
 
@@ -16,8 +17,8 @@ class ProductRequestValidator(BaseModel):
 
     model_config = base_config
 
-    name: str
-    sku: str
+    name: str = Field(max_length=30)
+    sku: str = Field(max_length=8)
     description: Optional[str] = None
     price: float
     category_id: UUID
@@ -2,6 +2,7 @@
 """
 This module contains the validator for authentication token
 """
+from datetime import datetime
 from pydantic import BaseModel
 from pydantic import EmailStr
 
@@ -11,9 +12,20 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str = "bearer"
+    # exchanged at /refresh for a new access token without the password
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequestValidator(BaseModel):
+    """Refresh token sent to be rotated or revoked"""
+
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     """Authentication token data"""
 
     email: EmailStr
+    # unique identifier of the token, used to revoke it
+    jti: str
+    expires: datetime
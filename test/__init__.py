@@ -3,6 +3,9 @@
 This module contains object imports common to all modules in the test paackage
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker
 from test.test_database.test_models.test_admin import admin_obj
@@ -19,8 +22,11 @@ from test.test_database.test_models.test_product import prod_obj
 from test.test_database.test_models.test_product import prod_kwarg_with_cat_id
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Create in-memory SQLite database for testing, the shared cache makes the
+# same database reachable from the synchronous and asynchronous engines
+SQLITE_DATABASE = "file:inventory-test?mode=memory&cache=shared&uri=true"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_DATABASE}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_DATABASE}"
 _engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
@@ -32,3 +38,18 @@ _engine = create_engine(
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=_engine
 )
+
+
+# Create the asynchronous engine used by the async path operations, every
+# session opens a fresh connection since each test request runs in its own
+# event loop
+_async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=NullPool,
+)
+
+
+# Create asynchronous test session
+TestingAsyncSessionLocal = async_sessionmaker(
+    _async_engine, autoflush=False, expire_on_commit=False
+)
@@ -5,6 +5,10 @@ for testing
 """
 import pytest
 from main.database.base import Base
+from main.database.queries.api_key import api_key_registry
+from main.database.queries.category import category_id_cache
+from main.database.queries.category import category_payload_cache
+from main.sub_apps import token_cache
 from sqlalchemy import exc
 from test import _engine
 from test import TestingSessionLocal
@@ -36,6 +40,16 @@ def setup_database():
     Base.metadata.drop_all(bind=_engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """empty the in-process caches, the database is recreated for every test"""
+    yield
+    category_payload_cache.clear()
+    category_id_cache.clear()
+    token_cache.clear()
+    api_key_registry.keys.clear()
+
+
 @pytest.fixture(autouse=True)
 def db_session():
     """
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the bulk import of supplier catalogs
+"""
+import asyncio
+import pytest
+from main.database.catalog_import import check_header
+from main.database.catalog_import import import_catalog
+from main.database.catalog_import import validate_chunk
+from main.database.models.category import Category
+from main.database.models.product import Product
+from sqlalchemy import event
+from sqlalchemy import select
+from test import _async_engine
+from test import TestingAsyncSessionLocal
+
+
+def catalog_rows(count: int, code: str = "COMP") -> list[dict]:
+    """return count catalog rows of the category code"""
+    return [
+        {
+            "category_code": code,
+            "sku": f"{index:08}",
+            "name": f"product-{index}",
+            "price": "1.5",
+            "country": "NG",
+            "quantity": str(index),
+        }
+        for index in range(count)
+    ]
+
+
+def run_import(rows: list[dict], chunk_size: int):
+    """import the rows with a test session"""
+
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await import_catalog(session, rows, chunk_size)
+
+    return asyncio.run(run())
+
+
+def test_check_header():
+    """test that check_header requires the category, sku, name and price"""
+    check_header(["category_code", "sku", "name", "price", "country"])
+    with pytest.raises(ValueError, match="sku, price"):
+        check_header(["category_code", "name"])
+    with pytest.raises(ValueError):
+        check_header(None)
+
+
+def test_validate_chunk_offsets():
+    """
+    test that validate_chunk indexes the rows from the start of the chunk
+    and keeps the valid rows of a chunk holding invalid ones
+    """
+    rows = catalog_rows(3)
+    rows[1]["price"] = "free"
+    valid, errors = validate_chunk(10, rows)
+    assert [index for index, _ in valid] == [10, 12]
+    assert [error["row"] for error in errors] == [11]
+    assert errors[0]["errors"][0]["loc"] == ["price"]
+
+
+def test_import_catalog_chunks(db_session, cat_kwargs):
+    """
+    test that every chunk of the catalog runs the same statements whatever
+    its number of rows, the category codes being resolved once
+    """
+    db_session.add(Category(**cat_kwargs))
+    db_session.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(_async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        report = run_import(catalog_rows(10), chunk_size=5)
+    finally:
+        event.remove(
+            _async_engine.sync_engine, "before_cursor_execute", record
+        )
+    assert report.rows == 10 and report.products == 10
+    assert report.inventories == 10 and report.errors == []
+    # codes, then per chunk: existing products and the two upserts
+    assert statements.count("SELECT") == 3
+    assert statements.count("INSERT") == 4
+    assert len(db_session.scalars(select(Product)).all()) == 10
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the database engine factory
+"""
+from main.database.engine import create_db_engine
+from main.validators.config import DBEnvironmentVariableValidator
+from sqlalchemy.pool import QueuePool
+
+
+def test_create_db_engine_pool_config():
+    """
+    test that the engine is backed by a QueuePool configured from the
+    database environment variables
+    """
+    db_vars = DBEnvironmentVariableValidator(
+        DB_POOL_SIZE=3,
+        DB_MAX_OVERFLOW=4,
+        DB_POOL_TIMEOUT=5,
+        DB_POOL_RECYCLE=60,
+    )
+    _engine = create_db_engine(db_vars)
+    assert (
+        isinstance(_engine.pool, QueuePool)
+        and _engine.pool.size() == 3
+        and _engine.pool._max_overflow == 4
+        and _engine.pool._timeout == 5
+        and _engine.pool._recycle == 60
+        and _engine.pool._pre_ping
+    )
+    _engine.dispose()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the streaming export of the tables
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from main.database.export import csv_chunk
+from main.database.export import export_chunks
+from main.database.export import export_columns
+from main.database.export import export_stmt
+from main.database.models.category import Category
+from test import TestingAsyncSessionLocal
+
+
+def test_export_columns():
+    """test that export_columns selects known columns once, in order"""
+    assert {"id", "created", "updated"} <= set(export_columns(Category, None))
+    assert export_columns(Category, "code, name,code") == ["code", "name"]
+    with pytest.raises(ValueError):
+        export_columns(Category, "code,secret")
+
+
+def test_csv_chunk_formats_values():
+    """test that csv_chunk writes datetimes in ISO 8601 and None as empty"""
+    line = csv_chunk([(datetime(2024, 1, 2, 3, 4, 5, 6), None, 1)]).decode()
+    assert line == "2024-01-02T03:04:05.000006,,1\r\n"
+
+
+def test_export_chunks_partitions(db_session):
+    """
+    test that export_chunks encodes every partition of the cursor into its
+    own chunk and closes the session it opened
+    """
+    db_session.add_all(
+        Category(name=f"category-{index}", code=f"C{index}", description="")
+        for index in range(5)
+    )
+    db_session.commit()
+    sessions = []
+
+    async def open_session():
+        sessions.append(TestingAsyncSessionLocal())
+        return sessions[-1]
+
+    async def collect():
+        stmt = export_stmt(Category, ["code", "name"])
+        return [
+            chunk
+            async for chunk in export_chunks(open_session, stmt, "ndjson", 2)
+        ]
+
+    chunks = asyncio.run(collect())
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert sorted(row["code"] for row in rows) == [f"C{i}" for i in range(5)]
+    assert not sessions[0].in_transaction()
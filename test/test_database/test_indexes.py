@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the indexes declared on the orm models
+"""
+from main.database.models.inven_transaction import InventoryTransaction
+from sqlalchemy import inspect
+from test import _engine
+
+
+# expected indexes of each table as {name: (columns, unique)}
+EXPECTED_INDEXES = {
+    "category": {
+        "ix_category_created_id": (["created", "id"], False),
+        "ix_category_name_pattern": (["name"], False),
+        "ix_category_code_pattern": (["code"], False),
+    },
+    "product": {
+        "ix_product_category_id": (["category_id"], False),
+    },
+    "inventory": {
+        "ix_inventory_product_id_country": (["product_id", "country"], True),
+    },
+    "inventory_transaction": {
+        "ix_inventory_transaction_inventory_id_created": (
+            ["inventory_id", "created"],
+            False,
+        ),
+        "ix_inventory_transaction_created_brin": (["created"], False),
+    },
+}
+
+
+def test_expected_indexes_exist():
+    """
+    test that every foreign key and lookup index is created with the tables
+    """
+    inspector = inspect(_engine)
+    for table_name, expected in EXPECTED_INDEXES.items():
+        indexes = {
+            index["name"]: (index["column_names"], bool(index["unique"]))
+            for index in inspector.get_indexes(table_name)
+        }
+        assert indexes == expected, table_name
+
+
+def test_inventory_transaction_created_index_is_brin():
+    """test that the created index of inventory_transaction is a BRIN index"""
+    index = next(
+        index
+        for index in InventoryTransaction.__table__.indexes
+        if index.name == "ix_inventory_transaction_created_brin"
+    )
+    assert index.dialect_options["postgresql"]["using"] == "brin"
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the bulk ingestion of inventory transactions
+"""
+import pytest
+from main.database.ingest import BatchValidationError
+from main.database.ingest import ingest_transactions
+from main.database.ingest import parse_batch
+from main.database.ingest import UnknownInventoryError
+from main.database.ingest import validate_batch
+from main.database.models.category import Category
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.models.inventory import Inventory
+from main.database.models.product import Product
+from sqlalchemy import func
+from sqlalchemy import select
+from uuid import uuid4
+
+INVENTORY_ID = "6a0c0f3e-7a2b-4c1e-9e0e-8f2d1b3c4a5e"
+
+
+@pytest.fixture()
+def inventory(db_session, cat_kwargs, prod_kwargs, inv_kwargs) -> Inventory:
+    """fixture to create and return an inventory holding 3 units"""
+    inv_obj = Inventory(**inv_kwargs)
+    prod_obj = Product(**prod_kwargs)
+    prod_obj.inventories.append(inv_obj)
+    cat_obj = Category(**cat_kwargs)
+    cat_obj.products.append(prod_obj)
+    db_session.add(cat_obj)
+    db_session.commit()
+    return inv_obj
+
+
+def test_parse_batch_formats():
+    """test that NDJSON and CSV batches parse into the same rows"""
+    ndjson = f'{{"inventory_id": "{INVENTORY_ID}", "quantity": 2}}\n\n'
+    csv_data = f"inventory_id,quantity\r\n{INVENTORY_ID},2\r\n"
+    assert validate_batch(
+        parse_batch(ndjson.encode(), "application/x-ndjson")
+    ) == validate_batch(parse_batch(csv_data, "text/csv; charset=utf-8"))
+
+
+def test_parse_batch_fail_media_type():
+    """test that parse_batch rejects unsupported batch formats"""
+    with pytest.raises(ValueError):
+        parse_batch(b"[]", "application/json")
+
+
+def test_parse_batch_fail_not_utf8():
+    """test that a batch that is not UTF-8 is reported as an invalid batch"""
+    with pytest.raises(BatchValidationError):
+        parse_batch(b"inventory_id,quantity\r\n\xff,1\r\n", "text/csv")
+
+
+def test_validate_batch_fail_reports_rows():
+    """test that validate_batch reports the errors of every invalid row"""
+    rows = [
+        {"inventory_id": INVENTORY_ID, "quantity": 1},
+        {"inventory_id": "invalid", "quantity": 1},
+        {"inventory_id": INVENTORY_ID},
+    ]
+    with pytest.raises(BatchValidationError) as exc_info:
+        validate_batch(rows)
+    errors = exc_info.value.errors
+    assert [error["row"] for error in errors] == [1, 2]
+    assert errors[1]["errors"][0]["loc"] == ["quantity"]
+
+
+def test_ingest_transactions_applies_net_deltas(db_session, inventory):
+    """
+    test that ingest_transactions records every movement and applies their
+    net quantity to the inventory stock
+    """
+    movements = validate_batch(
+        [{"inventory_id": inventory.id, "quantity": q} for q in (5, -2, 4)]
+    )
+    result = ingest_transactions(db_session, movements)
+    db_session.commit()
+    db_session.refresh(inventory)
+    assert result.transactions == 3 and result.inventories == 1
+    assert inventory.quantity == 10
+    assert (
+        db_session.scalar(select(func.sum(InventoryTransaction.quantity))) == 7
+    )
+
+
+def test_ingest_transactions_fail_unknown_inventory(db_session, inventory):
+    """test that a batch moving an unknown inventory is rejected as a whole"""
+    unknown_id = uuid4()
+    movements = validate_batch(
+        [
+            {"inventory_id": inventory.id, "quantity": 1},
+            {"inventory_id": unknown_id, "quantity": 1},
+        ]
+    )
+    with pytest.raises(UnknownInventoryError) as exc_info:
+        ingest_transactions(db_session, movements)
+    assert exc_info.value.inventory_ids == [unknown_id]
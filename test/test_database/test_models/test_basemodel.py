@@ -5,7 +5,11 @@ This module contains test functions for the BaseModel class
 """
 import pytest
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from main.database.models.basemodel import BaseModel
+from main.database.models.basemodel import to_dicts
+from uuid import uuid4
 
 
 class BaseModels(BaseModel):
@@ -13,6 +17,11 @@ class BaseModels(BaseModel):
     pass
 
 
+class UUID4Models(BaseModel):
+    __tablename__ = "uuid4models"
+    id_factory = staticmethod(uuid4)
+
+
 @pytest.fixture
 def basemodel_inst(db_session):
     """create a new mapped user object"""
@@ -40,6 +49,33 @@ def test_basemodel_to_dict(basemodel_inst):
     )
 
 
+def test_basemodel_to_dicts(db_session, basemodel_inst):
+    """test that to_dicts returns the to_dict of every object in order"""
+    insts = [basemodel_inst, UUID4Models(), BaseModels()]
+    db_session.add_all(insts[1:])
+    db_session.commit()
+    assert to_dicts(insts) == [inst.to_dict() for inst in insts]
+
+
+def test_basemodel_to_dict_datetimes():
+    """
+    test that to_dict formats naive and aware datetimes as naive text and
+    keeps unset datetimes as None
+    """
+    inst = BaseModels()
+    inst.created = datetime(2024, 1, 2, 3, 4, 5, 678)
+    inst.updated = datetime(
+        2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=1))
+    )
+    assert inst.to_dict()["created"] == "2024-01-02T03:04:05"
+    assert inst.to_dict()["updated"] == "2024-01-02T03:04:05"
+    assert BaseModels().to_dict() == {
+        "id": None,
+        "created": None,
+        "updated": None,
+    }
+
+
 def test_basemodel__str__(basemodel_inst):
     """
     test that basemodel __str__ method print a human readable representation
@@ -54,3 +90,21 @@ def test_basemodel__repr__(basemodel_inst):
     of the object
     """
     assert repr(basemodel_inst)
+
+
+def test_basemodel_time_ordered_ids(db_session):
+    """test that basemodel ids are version 7 uuids in creation order"""
+    insts = [BaseModels() for _ in range(20)]
+    for inst in insts:
+        db_session.add(inst)
+        db_session.flush()
+    ids = [inst.id for inst in insts]
+    assert ids == sorted(ids) and all(id_.version == 7 for id_ in ids)
+
+
+def test_basemodel_id_factory_override(db_session):
+    """test that a model id_factory replaces the default id generator"""
+    inst = UUID4Models()
+    db_session.add(inst)
+    db_session.commit()
+    assert inst.id.version == 4
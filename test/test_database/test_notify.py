@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the change notifications between workers
+"""
+import asyncio
+import json
+import pytest
+from collections import defaultdict
+from main.database import notify
+from main.database.notify import change_payloads
+from main.database.notify import dispatch
+from main.database.notify import handle_notification
+from main.database.notify import listen
+from main.database.notify import publish_change
+from main.database.notify import subscribe
+from main.database.queries.category import category_id_cache
+from main.database.queries.category import category_payload_cache
+from test import TestingAsyncSessionLocal
+from uuid import uuid4
+
+
+@pytest.fixture()
+def changes(monkeypatch) -> list:
+    """
+    fixture to replace the subscribers with one recording the changes of the
+    widget table
+    """
+    monkeypatch.setattr(notify, "_subscribers", defaultdict(list))
+    received = []
+    subscribe("widget")(lambda ids: received.append(ids))
+    return received
+
+
+class StandInConnection:
+    """
+    stand-in of an asyncpg connection, the health check fails once the
+    connection was closed by the test
+    """
+
+    def __init__(self):
+        self.listeners = {}
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def execute(self, query):
+        if self.closed:
+            raise ConnectionError("connection lost")
+
+    def notify(self, payload: str):
+        self.listeners[notify.CHANNEL](self, 1, notify.CHANNEL, payload)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+
+def test_change_payloads_fit_limit():
+    """test that large changes are split into payloads postgres accepts"""
+    ids = [str(uuid4()) for _ in range(1000)]
+    payloads = change_payloads("category", ids)
+    assert len(payloads) > 1
+    assert all(len(payload) < 8000 for payload in payloads)
+    decoded = [json.loads(payload) for payload in payloads]
+    assert all(change["table"] == "category" for change in decoded)
+    assert [id_ for change in decoded for id_ in change["ids"]] == ids
+
+
+def test_dispatch_survives_failing_subscriber(changes):
+    """test that a failing subscriber does not stop the others"""
+
+    @subscribe("widget")
+    def broken(ids):
+        raise RuntimeError("broken subscriber")
+
+    subscribe("widget")(lambda ids: changes.append(("after", ids)))
+    dispatch("widget", ["1"])
+    assert changes == [["1"], ("after", ["1"])]
+
+
+def test_publish_change_after_commit(changes):
+    """
+    test that published changes reach the local subscribers once the
+    transaction commits and are dropped when it rolls back
+    """
+
+    async def main():
+        async with TestingAsyncSessionLocal() as session:
+            await publish_change(session, "widget", ["rolled-back"])
+            await session.rollback()
+            await publish_change(session, "widget", ["a", "b"])
+            assert changes == []
+            await session.commit()
+
+    asyncio.run(main())
+    assert changes == [["a", "b"]]
+
+
+def test_listen_dispatches_and_recovers(changes):
+    """
+    test that the listener dispatches received changes and, after losing its
+    connection, reconnects and tells the subscribers to drop everything
+    """
+    connections = []
+
+    async def connect():
+        connections.append(StandInConnection())
+        return connections[-1]
+
+    async def main():
+        task = asyncio.create_task(
+            listen(connect, retry_interval=0.01, health_check_interval=0.01)
+        )
+        while not connections:
+            await asyncio.sleep(0.01)
+        connections[0].notify(json.dumps({"table": "widget", "ids": ["7"]}))
+        connections[0].notify("not json")
+        connections[0].closed = True
+        while len(connections) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert changes == [["7"], None]
+    assert connections[-1].closed
+
+
+def test_category_changes_evict_cache():
+    """
+    test that category changes evict the cached category payloads and the
+    cached ids of their names
+    """
+    category_id = uuid4()
+    category_payload_cache.set(category_id, b"{}")
+    category_id_cache.set("category-name", category_id)
+    handle_notification(
+        None,
+        1,
+        notify.CHANNEL,
+        json.dumps({"table": "category", "ids": [str(category_id)]}),
+    )
+    assert category_payload_cache.get(category_id) is None
+    assert category_id_cache.get("category-name") is None
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the inventory_transaction partition maintenance
+"""
+from datetime import date
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.partitions import add_months
+from main.database.partitions import attach_partition_sql
+from main.database.partitions import create_partition_sql
+from main.database.partitions import expired_partitions
+from main.database.partitions import move_default_rows_sql
+from main.database.partitions import partition_month
+from main.database.partitions import partition_name
+from sqlalchemy import inspect
+
+
+def test_add_months_across_years():
+    """test that month arithmetic rolls over the year boundaries"""
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_name_round_trip():
+    """test that a partition name maps back to the month it holds"""
+    name = partition_name(date(2026, 3, 1))
+    assert name == "inventory_transaction_p202603"
+    assert partition_month(name) == date(2026, 3, 1)
+    assert partition_month("inventory_transaction_default") is None
+
+
+def test_create_partition_sql_bounds():
+    """test that a partition covers its month up to the next one"""
+    sql = create_partition_sql(date(2026, 12, 1))
+    assert (
+        "inventory_transaction_p202612 PARTITION OF inventory_transaction"
+        in sql
+        and "FROM ('2026-12-01') TO ('2027-01-01')" in sql
+    )
+
+
+def test_expired_partitions():
+    """
+    test that only monthly partitions older than the retention period expire
+    """
+    names = [
+        partition_name(date(2024, 9, 1)),
+        partition_name(date(2024, 10, 1)),
+        partition_name(date(2026, 10, 1)),
+        "inventory_transaction_default",
+    ]
+    expired = expired_partitions(names, 24, today=date(2026, 10, 18))
+    assert expired == ["inventory_transaction_p202409"]
+
+
+def test_inventory_transaction_keys():
+    """
+    test that the table primary key holds the partition key while the orm
+    still identifies transactions by id
+    """
+    table = InventoryTransaction.__table__
+    assert [column.name for column in table.primary_key] == ["id", "created"]
+    assert [
+        column.name for column in inspect(InventoryTransaction).primary_key
+    ] == ["id"]
+    assert (
+        table.dialect_options["postgresql"]["partition_by"]
+        == "RANGE (created)"
+    )
+
+
+def test_move_default_rows_into_partition():
+    """
+    test that the rows of a month held by the default partition are moved
+    into the partition of the month before it is attached
+    """
+    sql = move_default_rows_sql(date(2026, 12, 1))
+    assert sql.startswith(
+        "WITH moved AS (DELETE FROM inventory_transaction_default "
+        "WHERE created >= '2026-12-01' AND created < '2027-01-01'"
+    )
+    assert sql.endswith(
+        "INSERT INTO inventory_transaction_p202612 SELECT * FROM moved"
+    )
+    assert attach_partition_sql(date(2026, 12, 1)) == (
+        "ALTER TABLE inventory_transaction ATTACH PARTITION "
+        "inventory_transaction_p202612 "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
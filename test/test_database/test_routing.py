@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the primary and read replica session routing
+"""
+import asyncio
+import pytest
+from itertools import cycle
+from main.database import routing
+from main.database.engine import async_db_engine
+from main.database.routing import lsn_to_int
+from main.database.routing import open_read_session
+from main.database.routing import parse_replica_host
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def test_lsn_to_int_success():
+    """test that a textual LSN converts to its integer WAL position"""
+    assert lsn_to_int("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert lsn_to_int("0/1") < lsn_to_int("1/0")
+
+
+def test_lsn_to_int_fail_invalid_token():
+    """test that a malformed consistency token is rejected"""
+    with pytest.raises(ValueError):
+        lsn_to_int("16-B374D848")
+
+
+def test_parse_replica_host():
+    """test that replica entries default to the primary port"""
+    assert parse_replica_host("replica-1", 5432) == ("replica-1", 5432)
+    assert parse_replica_host("replica-2:6432", 5432) == ("replica-2", 6432)
+
+
+def test_open_read_session_no_replicas():
+    """test that reads go to the primary when no replica is configured"""
+
+    async def bind_of_read_session():
+        _session = await open_read_session("0/1")
+        await _session.close()
+        return _session.bind
+
+    assert asyncio.run(bind_of_read_session()) is async_db_engine()
+
+
+def test_open_read_session_unreachable_replica(monkeypatch, tmp_path):
+    """test that reads fall back to the primary when no replica is reachable"""
+    # a database in a missing directory cannot be opened
+    replica = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    )
+    monkeypatch.setattr(routing, "async_replica_engines", lambda: (replica,))
+    monkeypatch.setattr(routing, "replica_rotation", lambda: cycle((replica,)))
+
+    async def binds_of_read_sessions():
+        binds = []
+        for token in (None, "0/1"):
+            _session = await open_read_session(token)
+            await _session.close()
+            binds.append(_session.bind)
+        await replica.dispose()
+        return binds
+
+    assert asyncio.run(binds_of_read_sessions()) == [async_db_engine()] * 2
@@ -4,8 +4,12 @@ This module contains shared objects between test_sub_apps package modules
 """
 import pytest
 from fastapi.testclient import TestClient
+from main.database.engine import async_db_session
 from main.database.engine import db_session
+from main.database.routing import async_read_session
+from main.database.routing import async_read_session_factory
 from main.sub_apps.admin import admin
+from test import TestingAsyncSessionLocal
 from test import TestingSessionLocal
 
 
@@ -18,8 +22,25 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+def override_get_async_db_factory():
+    async def open_session():
+        return TestingAsyncSessionLocal()
+
+    return open_session
+
+
 # Update the app to use the test database
 admin.dependency_overrides[db_session] = override_get_db
+admin.dependency_overrides[async_db_session] = override_get_async_db
+admin.dependency_overrides[async_read_session] = override_get_async_db
+admin.dependency_overrides[
+    async_read_session_factory
+] = override_get_async_db_factory
 
 
 # Create test client
@@ -38,3 +59,18 @@ def token(admin_kwargs):
 
     # yield token from login response
     yield login_response.json()["access_token"]
+
+
+@pytest.fixture()
+def api_key_headers(token):
+    """
+    fixture to create an API key granting the inventory:write scope and
+    yield the headers authenticating a service client with it
+    """
+    response = client.post(
+        "/api-keys",
+        json={"name": "pos-terminal", "scopes": ["inventory:write"]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 201
+    yield {"X-API-Key": response.json()["api_key"]}
@@ -3,11 +3,39 @@
 This module contains testsuites for operations defined in the sub_application
 admin module
 """
+import pytest
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from main.database.models.admin import Admin
+from main.database.models.refresh_token import RefreshToken
+from main.sub_apps import keyring
+from main.sub_apps import token_cache
+from main.utils.passwords import password_hasher
+from passlib.hash import pbkdf2_sha512
+from sqlalchemy import delete
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy_utils import Password
+from test import _async_engine
 from test.test_sub_apps import client
 from test.test_sub_apps import token
 from uuid import uuid4
 
 
+@pytest.fixture()
+def statements():
+    """fixture to record the sql statements run by the async path operations"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(_async_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(_async_engine.sync_engine, "before_cursor_execute", record)
+
+
 def test_create_admin_success(admin_kwargs):
     """
     test create_admin operation creates successfully with the right request body
@@ -391,6 +419,9 @@ def test_change_password_success(token, admin_kwargs):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert response.status_code == 200
+    # the returned admin carries the updated timestamp set by the database
+    admin_obj = response.json()
+    assert admin_obj["updated"] > admin_obj["created"]
     # verify that the password change is effected in the database by logging in
     # with new password but first with old password
     response = client.post("/token", data=admin_kwargs)
@@ -506,3 +537,200 @@ def test_delete_admin_fail_no_token():
     """
     delete_response = client.delete("/delete-admin")
     assert delete_response.status_code == 401
+
+
+def test_validated_token_cached(token, statements):
+    """
+    test that the admin of a token is read from the database on the first
+    authenticated request only
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/admin-info", headers=headers)
+    assert response.status_code == 200
+    assert len(statements) == 1
+    statements.clear()
+    for _ in range(3):
+        assert client.get("/admin-info", headers=headers).json() == (
+            response.json()
+        )
+    assert statements == []
+
+
+def test_token_without_jti_rejected(token, admin_kwargs):
+    """test that tokens which cannot be revoked are rejected"""
+    legacy_token = keyring.sign(
+        {
+            "sub": admin_kwargs["email"],
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+        }
+    )
+    response = client.get(
+        "/admin-info", headers={"Authorization": f"Bearer {legacy_token}"}
+    )
+    assert response.status_code == 401
+
+
+def test_logout_revokes_token(token, admin_kwargs):
+    """
+    test that a token is rejected once revoked, even when its validation was
+    cached, while the other tokens of the admin remain valid
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/admin-info", headers=headers).status_code == 200
+    other_token = client.post("/token", data=admin_kwargs).json()[
+        "access_token"
+    ]
+    response = client.post("/logout", headers=headers)
+    assert response.status_code == 200
+    assert client.get("/admin-info", headers=headers).status_code == 401
+    assert client.post("/logout", headers=headers).status_code == 401
+    response = client.get(
+        "/admin-info", headers={"Authorization": f"Bearer {other_token}"}
+    )
+    assert response.status_code == 200
+
+
+def test_admin_changes_evict_cached_tokens(token, admin_kwargs):
+    """
+    test that changing the password of an admin evicts its cached tokens and
+    that the tokens of a deleted admin are rejected
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/admin-info", headers=headers).status_code == 200
+    assert len(token_cache) == 1
+    response = client.put(
+        "/change-password",
+        json={"old_password": admin_kwargs["password"], "new_password": "new"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert len(token_cache) == 0
+    assert client.get("/admin-info", headers=headers).status_code == 200
+    assert client.delete("/delete-admin", headers=headers).status_code == 200
+    assert client.get("/admin-info", headers=headers).status_code == 401
+
+
+def test_login_rehashes_outdated_password(db_session, admin_kwargs):
+    """
+    test that logging in with a password hashed with fewer rounds than
+    configured stores a new hash of the password
+    """
+    outdated = pbkdf2_sha512.using(rounds=1_000).hash(admin_kwargs["password"])
+    db_session.add(
+        Admin(
+            email=admin_kwargs["email"],
+            password=Password(outdated),
+            first_name=admin_kwargs["first_name"],
+            last_name=admin_kwargs["last_name"],
+        )
+    )
+    db_session.commit()
+    response = client.post("/token", data=admin_kwargs)
+    assert response.status_code == 200
+    db_session.expire_all()
+    stored = db_session.scalar(select(Admin.password)).hash.decode()
+    assert stored != outdated
+    assert pbkdf2_sha512.from_string(stored).rounds == password_hasher.rounds
+    response = client.post("/token", data=admin_kwargs)
+    assert response.status_code == 200
+    assert client.get("/password-stats").status_code == 401
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    stats = client.get("/password-stats", headers=headers).json()
+    assert stats["completed"] >= 2
+
+
+@pytest.fixture()
+def login(admin_kwargs):
+    """fixture to create a new admin and return its login response"""
+    assert client.post("/new-admin", json=admin_kwargs).status_code == 201
+    response = client.post("/token", data=admin_kwargs)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_tokens(login, statements):
+    """
+    test that a refresh returns a working access token and a new refresh
+    token with two statements and no password hashing
+    """
+    hashes = password_hasher.completed
+    statements.clear()
+    response = client.post(
+        "/refresh", json={"refresh_token": login["refresh_token"]}
+    )
+    assert response.status_code == 200
+    tokens = response.json()
+    assert len(statements) == 2
+    assert password_hasher.completed == hashes
+    assert tokens["refresh_token"] != login["refresh_token"]
+    response = client.get(
+        "/admin-info",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_family(login):
+    """
+    test that presenting a rotated refresh token again revokes the tokens
+    obtained from it
+    """
+    first = login["refresh_token"]
+    second = client.post("/refresh", json={"refresh_token": first}).json()[
+        "refresh_token"
+    ]
+    response = client.post("/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    response = client.post("/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+def test_revoke_refresh_token(login, admin_kwargs):
+    """
+    test that a revoked refresh token is rejected on its next refresh while
+    the other logins keep theirs
+    """
+    other = client.post("/token", data=admin_kwargs).json()["refresh_token"]
+    refresh_token = {"refresh_token": login["refresh_token"]}
+    response = client.post("/revoke-refresh-token", json=refresh_token)
+    assert response.status_code == 200
+    assert client.post("/refresh", json=refresh_token).status_code == 401
+    response = client.post("/refresh", json={"refresh_token": other})
+    assert response.status_code == 200
+    response = client.post(
+        "/revoke-refresh-token", json={"refresh_token": "unknown"}
+    )
+    assert response.status_code == 200
+
+
+def test_change_password_revokes_refresh_tokens(login, admin_kwargs):
+    """test that changing the password revokes the refresh tokens"""
+    response = client.put(
+        "/change-password",
+        json={"old_password": admin_kwargs["password"], "new_password": "new"},
+        headers={"Authorization": f"Bearer {login['access_token']}"},
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/refresh", json={"refresh_token": login["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+def test_update_admin_info_fail_deleted_admin(token, admin_kwargs, db_session):
+    """
+    test that updating an admin deleted after its token was cached answers
+    401 instead of failing
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/admin-info", headers=headers).status_code == 200
+    # delete the admin without evicting its cached token
+    db_session.execute(delete(RefreshToken))
+    db_session.execute(delete(Admin))
+    db_session.commit()
+    response = client.put("/update-info", json=admin_kwargs, headers=headers)
+    assert response.status_code == 401
@@ -0,0 +1,427 @@
+#!/usr/bin/python3
+"""
+This module contains testsuites for the path operations of the category router
+"""
+import pytest
+from main.database.base import Base
+from main.database.models.category import Category
+from main.database.models.product import Product
+from main.database.routing import async_read_session
+from main.database.routing import async_read_session_factory
+from main.sub_apps.admin import admin
+from main.validators.category import CategoryPageResponseValidator
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
+from test import _async_engine
+from test.test_sub_apps import client
+from test.test_sub_apps import override_get_async_db
+from test.test_sub_apps import override_get_async_db_factory
+from test.test_sub_apps import token
+from uuid import UUID
+from uuid import uuid4
+
+
+@pytest.fixture()
+def statements():
+    """fixture to record the sql statements run by the async path operations"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(_async_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(_async_engine.sync_engine, "before_cursor_execute", record)
+
+
+# in-memory SQLite database standing for a replica lagging behind the primary
+STALE_DATABASE = "file:inventory-stale?mode=memory&cache=shared&uri=true"
+
+
+@pytest.fixture()
+def stale_replica(db_session):
+    """
+    fixture to route the read sessions to a replica database and yield a
+    function copying the categories of the primary to it, which the replica
+    then keeps while the primary changes
+    """
+    # the connection of the static pool keeps the shared database alive
+    stale_engine = create_engine(
+        f"sqlite:///{STALE_DATABASE}", poolclass=StaticPool
+    )
+    stale_async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{STALE_DATABASE}", poolclass=NullPool
+    )
+    Base.metadata.create_all(bind=stale_engine)
+
+    def replicate():
+        rows = db_session.execute(select(Category.__table__)).mappings()
+        with stale_engine.begin() as connection:
+            connection.execute(insert(Category.__table__), list(rows))
+
+    async def override_read_session():
+        async with AsyncSession(stale_async_engine) as _session:
+            yield _session
+
+    def override_read_session_factory():
+        async def open_session():
+            return AsyncSession(stale_async_engine)
+
+        return open_session
+
+    admin.dependency_overrides[async_read_session] = override_read_session
+    admin.dependency_overrides[
+        async_read_session_factory
+    ] = override_read_session_factory
+    yield replicate
+    admin.dependency_overrides[async_read_session] = override_get_async_db
+    admin.dependency_overrides[
+        async_read_session_factory
+    ] = override_get_async_db_factory
+    Base.metadata.drop_all(bind=stale_engine)
+    stale_engine.dispose()
+
+
+def test_create_category_success(cat_kwargs):
+    """
+    test that create_category inserts a new category and returns it without
+    products
+    """
+    response = client.post("/new-category", json=cat_kwargs)
+    assert response.status_code == 200
+    cat_obj = response.json()
+    assert (
+        cat_obj["id"]
+        and cat_obj["name"] == cat_kwargs["name"]
+        and cat_obj["products"] == []
+    )
+
+
+def test_create_category_fail_conflict(cat_kwargs):
+    """
+    test that create_category returns a 409 status code when the category
+    name already exists
+    """
+    response = client.post("/new-category", json=cat_kwargs)
+    assert response.status_code == 200
+    response = client.post("/new-category", json=cat_kwargs)
+    assert response.status_code == 409
+
+
+def test_get_category_by_id_success(cat_kwargs):
+    """test that get_category_by_id returns an existing category"""
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    response = client.get(f"/category-by-id/{cat_id}")
+    assert response.status_code == 200 and response.json()["id"] == cat_id
+
+
+def test_get_category_by_id_fail_not_found():
+    """
+    test that get_category_by_id returns a 404 status code for an unknown id
+    """
+    response = client.get(f"/category-by-id/{uuid4()}")
+    assert response.status_code == 404
+
+
+def test_get_category_by_name_success(cat_kwargs):
+    """test that get_category_by_name returns an existing category"""
+    client.post("/new-category", json=cat_kwargs)
+    response = client.get(f"/category-by-name/{cat_kwargs['name']}")
+    assert (
+        response.status_code == 200
+        and response.json()["code"] == cat_kwargs["code"]
+    )
+
+
+def test_get_category_by_name_fail_not_found():
+    """
+    test that get_category_by_name returns a 404 status code for an unknown
+    name
+    """
+    response = client.get("/category-by-name/unknown")
+    assert response.status_code == 404
+
+
+def create_categories(count: int) -> list:
+    """create count categories and return their ids"""
+    return [
+        client.post(
+            "/new-category",
+            json={
+                "name": f"category-{index}",
+                "code": f"C{index:03}",
+                "description": "category description",
+            },
+        ).json()["id"]
+        for index in range(count)
+    ]
+
+
+def test_all_categories_success(cat_kwargs):
+    """test that all_categories returns every category in a single page"""
+    client.post("/new-category", json=cat_kwargs)
+    response = client.get("/categories")
+    page = response.json()
+    assert (
+        response.status_code == 200
+        and len(page["items"]) == 1
+        and page["next_cursor"] is None
+    )
+
+
+def test_all_categories_keyset_pages():
+    """
+    test that following next_cursor walks every category exactly once in
+    pages of at most limit categories
+    """
+    cat_ids = create_categories(5)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        page = client.get("/categories", params=params).json()
+        assert len(page["items"]) <= 2
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(cat_ids)
+
+
+def test_all_categories_prefix_filters():
+    """test that all_categories filters on the name and code prefixes"""
+    create_categories(12)
+    by_name = client.get("/categories", params={"name_prefix": "category-1"})
+    by_code = client.get("/categories", params={"code_prefix": "C00"})
+    assert len(by_name.json()["items"]) == 3  # 1, 10 and 11
+    assert len(by_code.json()["items"]) == 10
+
+
+def test_all_categories_fail_invalid_cursor():
+    """test that all_categories rejects a malformed cursor"""
+    response = client.get("/categories", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_all_categories_fail_limit_too_large():
+    """test that all_categories rejects a limit above the maximum page size"""
+    response = client.get("/categories", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def test_all_categories_constant_queries(db_session, statements):
+    """
+    test that listing categories with products runs the same number of
+    queries whatever the number of categories
+    """
+    for index, cat_id in enumerate(create_categories(5)):
+        db_session.add_all(
+            Product(
+                name=f"product-{index}-{number}",
+                sku=f"{index}{number:07}",
+                price=1.0,
+                category_id=UUID(cat_id),
+            )
+            for number in range(2)
+        )
+    db_session.commit()
+    statements.clear()
+    page = client.get("/categories").json()
+    # one query for the categories and one for all of their products
+    assert len(statements) == 2
+    assert all(len(item["products"]) == 2 for item in page["items"])
+
+
+def test_all_categories_matches_response_model(db_session, prod_kwargs):
+    """
+    test that the page serialized without validation is the document the
+    response model would have produced
+    """
+    cat_id = create_categories(2)[0]
+    db_session.add(Product(**prod_kwargs | {"category_id": UUID(cat_id)}))
+    db_session.commit()
+    page = client.get("/categories").json()
+    expected = CategoryPageResponseValidator.model_validate(page).model_dump(
+        mode="json", by_alias=True
+    )
+    assert page == expected
+    assert list(page["items"][0]) == list(expected["items"][0])
+
+
+def test_create_categories_success():
+    """
+    test that create_categories inserts every category of the batch, in
+    order, with a single INSERT statement
+    """
+    batch = [
+        {"name": f"category-{i}", "code": f"C{i}", "description": "bulk"}
+        for i in range(30)
+    ]
+    response = client.post("/new-categories", json=batch)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["conflicts"] == []
+    assert [cat["name"] for cat in body["created"]] == [
+        cat["name"] for cat in batch
+    ]
+    assert all(cat["id"] and cat["products"] == [] for cat in body["created"])
+    response = client.get("/categories", params={"limit": 100})
+    assert len(response.json()["items"]) == 30
+
+
+def test_create_categories_single_insert(statements):
+    """test that create_categories sends the batch as one multi row INSERT"""
+    batch = [
+        {"name": f"category-{i}", "code": f"C{i}", "description": "bulk"}
+        for i in range(30)
+    ]
+    client.post("/new-categories", json=batch)
+    inserts = [stmt for stmt in statements if stmt.startswith("INSERT")]
+    assert len(inserts) == 1
+
+
+def test_create_categories_conflicts(cat_kwargs):
+    """
+    test that create_categories reports the categories conflicting with the
+    table or with the batch and inserts the others
+    """
+    client.post("/new-category", json=cat_kwargs)
+    batch = [
+        {"name": "fresh", "code": "FRSH", "description": "new"},
+        {"name": cat_kwargs["name"], "code": "OTHER", "description": "taken"},
+        {"name": "again", "code": "FRSH", "description": "repeated"},
+        {"name": "last", "code": "LAST", "description": "new"},
+    ]
+    response = client.post("/new-categories", json=batch)
+    assert response.status_code == 200
+    body = response.json()
+    assert [cat["name"] for cat in body["created"]] == ["fresh", "last"]
+    assert [conflict["index"] for conflict in body["conflicts"]] == [1, 2]
+    assert "already exists" in body["conflicts"][0]["detail"][0]
+    assert "repeated" in body["conflicts"][1]["detail"][0]
+
+
+def test_create_categories_fail_invalid_item():
+    """test that create_categories validates every category of the batch"""
+    batch = [{"name": "too-long", "code": "TOOLONG", "description": "bad"}]
+    response = client.post("/new-categories", json=batch)
+    assert response.status_code == 422
+
+
+def test_create_category_fail_conflict_code(cat_kwargs):
+    """
+    test that create_category returns a 409 status code when only the
+    category code already exists
+    """
+    client.post("/new-category", json=cat_kwargs)
+    response = client.post(
+        "/new-category", json={**cat_kwargs, "name": "another"}
+    )
+    assert response.status_code == 409
+    response = client.get("/category-by-name/another")
+    assert response.status_code == 404
+
+
+def test_create_category_single_round_trip(cat_kwargs, statements):
+    """
+    test that create_category answers from the INSERT ... RETURNING row,
+    server generated timestamps included, without reloading the category
+    """
+    response = client.post("/new-category", json=cat_kwargs)
+    cat_obj = response.json()
+    assert cat_obj["created"] and cat_obj["created"] == cat_obj["updated"]
+    assert len(statements) == 1 and statements[0].startswith("INSERT")
+    assert "RETURNING" in statements[0]
+
+
+def test_get_category_cached(cat_kwargs, prod_kwargs, statements, token):
+    """
+    test that category lookups are served from the cache until a write
+    changes the category
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    before = client.get("/cache-stats", headers=headers).json()[
+        "category_payloads"
+    ]
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    first = client.get(f"/category-by-name/{cat_kwargs['name']}").json()
+    statements.clear()
+    assert client.get(f"/category-by-id/{cat_id}").json() == first
+    assert client.get(f"/category-by-name/{cat_kwargs['name']}").json() == (
+        first
+    )
+    assert statements == []
+    # a new product of the category invalidates its cached payload
+    client.put(
+        "/product",
+        json={**prod_kwargs, "category_id": cat_id},
+        headers=headers,
+    )
+    response = client.get(f"/category-by-id/{cat_id}")
+    assert len(response.json()["products"]) == 1
+    stats = client.get("/cache-stats", headers=headers).json()[
+        "category_payloads"
+    ]
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 2
+
+
+def test_cache_stats_authorization():
+    """test that the cache counters are not served without credentials"""
+    assert client.get("/cache-stats").status_code == 401
+
+
+def test_get_category_refilled_from_primary(
+    cat_kwargs, prod_kwargs, stale_replica, token
+):
+    """
+    test that the lookup evicted by a write is refilled from the primary,
+    not from a replica that has not replayed the write yet
+    """
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    stale_replica()
+    paths = (
+        f"/category-by-id/{cat_id}",
+        f"/category-by-name/{cat_kwargs['name']}",
+    )
+    for path in paths:
+        assert client.get(path).json()["products"] == []
+    client.put(
+        "/product",
+        json={**prod_kwargs, "category_id": cat_id},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    # the replica still lists no product for the category
+    for path in paths:
+        assert len(client.get(path).json()["products"]) == 1
+
+
+def test_get_category_token_bypasses_cache(db_session, cat_kwargs):
+    """
+    test that a lookup carrying a consistency token is read from the read
+    session instead of the cache
+    """
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    client.get(f"/category-by-id/{cat_id}")
+    # change the row without the change notification evicting the cache
+    db_session.execute(
+        update(Category)
+        .where(Category.id == UUID(cat_id))
+        .values(description="changed")
+    )
+    db_session.commit()
+    headers = {"X-Consistency-Token": "0/16B3748"}
+    for path in (
+        f"/category-by-id/{cat_id}",
+        f"/category-by-name/{cat_kwargs['name']}",
+    ):
+        response = client.get(path, headers=headers)
+        assert response.json()["description"] == "changed"
+    response = client.get(f"/category-by-id/{cat_id}")
+    assert response.json()["description"] == cat_kwargs["description"]
@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+"""
+This module contains testsuites for the path operations of the export router
+"""
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+from datetime import timedelta
+from test.test_sub_apps import api_key_headers
+from test.test_sub_apps import client
+from test.test_sub_apps import token
+
+
+@pytest.fixture()
+def auth_headers(token) -> dict:
+    """fixture to return the headers authenticating an admin"""
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def products(cat_kwargs, prod_kwargs, api_key_headers) -> list[dict]:
+    """fixture to create three products of a category and return them"""
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    return [
+        client.put(
+            "/product",
+            json=prod_kwargs
+            | {
+                "name": f"product-{index}",
+                "sku": f"{index:08}",
+                "category_id": cat_id,
+            },
+            headers=api_key_headers,
+        ).json()
+        for index in range(3)
+    ]
+
+
+def test_export_ndjson(products, auth_headers):
+    """test that export_table streams every row as one JSON object per line"""
+    response = client.get("/export/products", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["id"] for row in rows) == sorted(
+        prod["id"] for prod in products
+    )
+    assert {"id", "name", "sku", "price", "updated"} <= set(rows[0])
+
+
+def test_export_csv_columns(products, auth_headers):
+    """test that export_table streams the selected columns as CSV"""
+    response = client.get(
+        "/export/products",
+        params={"format": "csv", "columns": "sku,name"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["sku", "name"]
+    assert sorted(rows[1:]) == sorted(
+        [prod["sku"], prod["name"]] for prod in products
+    )
+
+
+def test_export_since(products, auth_headers):
+    """test that export_table only streams the rows updated since the time"""
+    since = datetime.fromisoformat(products[-1]["updated"])
+    later = client.get(
+        "/export/products",
+        params={"since": (since + timedelta(days=1)).isoformat()},
+        headers=auth_headers,
+    )
+    recent = client.get(
+        "/export/products",
+        params={"since": since.isoformat()},
+        headers=auth_headers,
+    )
+    assert later.text == ""
+    assert products[-1]["id"] in recent.text
+
+
+def test_export_fail_unknown_column(auth_headers):
+    """test that export_table rejects a column the table does not have"""
+    response = client.get(
+        "/export/categories",
+        params={"columns": "id,password"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_export_fail_unknown_table(auth_headers):
+    """test that export_table only exports the catalog and ledger tables"""
+    response = client.get("/export/admin", headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_export_authorization(token, api_key_headers):
+    """
+    test that export_table requires a credential and an API key granting the
+    inventory:export scope
+    """
+    export_key = client.post(
+        "/api-keys",
+        json={"name": "bi-dump", "scopes": ["inventory:export"]},
+        headers={"Authorization": f"Bearer {token}"},
+    ).json()["api_key"]
+    assert client.get("/export/categories").status_code == 401
+    assert (
+        client.get("/export/categories", headers=api_key_headers).status_code
+        == 403
+    )
+    assert (
+        client.get(
+            "/export/categories", headers={"X-API-Key": export_key}
+        ).status_code
+        == 200
+    )
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""
+This module contains testsuites for the path operations of the inventory router
+"""
+import pytest
+from main.database.models.category import Category
+from main.database.models.inven_transaction import InventoryTransaction
+from main.database.models.inventory import Inventory
+from main.database.models.product import Product
+from sqlalchemy import select
+from test.test_sub_apps import api_key_headers
+from test.test_sub_apps import client
+from test.test_sub_apps import token
+from uuid import UUID
+from uuid import uuid4
+
+
+@pytest.fixture()
+def inventory_id(db_session, cat_kwargs, prod_kwargs, inv_kwargs) -> str:
+    """fixture to create an inventory holding 3 units and return its id"""
+    inv_obj = Inventory(**inv_kwargs)
+    prod_obj = Product(**prod_kwargs)
+    prod_obj.inventories.append(inv_obj)
+    cat_obj = Category(**cat_kwargs)
+    cat_obj.products.append(prod_obj)
+    db_session.add(cat_obj)
+    db_session.commit()
+    return str(inv_obj.id)
+
+
+def stock_of(db_session, inventory_id: str) -> int:
+    """return the stock of an inventory as stored in the database"""
+    db_session.expire_all()
+    return db_session.scalar(
+        select(Inventory.quantity).where(Inventory.id == UUID(inventory_id))
+    )
+
+
+def test_move_stock_success(db_session, inventory_id, api_key_headers):
+    """
+    test that move_stock records the transaction and applies its quantity to
+    the inventory stock
+    """
+    response = client.post(
+        "/stock-movement",
+        json={"inventory_id": inventory_id, "quantity": -2},
+        headers=api_key_headers,
+    )
+    movement = response.json()
+    assert (
+        response.status_code == 201
+        and movement["inventory_id"] == inventory_id
+        and movement["stock"] == 1
+    )
+    assert stock_of(db_session, inventory_id) == 1
+    trans_obj = db_session.get(InventoryTransaction, UUID(movement["id"]))
+    assert trans_obj.quantity == -2
+
+
+def test_move_stock_fail_insufficient_stock(
+    db_session, inventory_id, api_key_headers
+):
+    """
+    test that move_stock rejects a movement that would oversell the inventory
+    and leaves the stock untouched
+    """
+    response = client.post(
+        "/stock-movement",
+        json={"inventory_id": inventory_id, "quantity": -5},
+        headers=api_key_headers,
+    )
+    assert response.status_code == 409
+    assert stock_of(db_session, inventory_id) == 3
+    assert not db_session.scalars(select(InventoryTransaction)).all()
+
+
+def test_move_stock_success_negative_allowed(
+    db_session, inventory_id, api_key_headers
+):
+    """
+    test that move_stock applies an overselling movement when the non
+    negative guard is disabled
+    """
+    response = client.post(
+        "/stock-movement",
+        json={
+            "inventory_id": inventory_id,
+            "quantity": -5,
+            "non_negative": False,
+        },
+        headers=api_key_headers,
+    )
+    assert response.status_code == 201 and response.json()["stock"] == -2
+
+
+def test_move_stock_fail_not_found(api_key_headers):
+    """test that move_stock returns 404 for an unknown inventory"""
+    response = client.post(
+        "/stock-movement",
+        json={"inventory_id": str(uuid4()), "quantity": 1},
+        headers=api_key_headers,
+    )
+    assert response.status_code == 404
+
+
+def test_transaction_history_success(inventory_id, api_key_headers):
+    """
+    test that transaction_history returns the recent transactions of an
+    inventory, most recent first
+    """
+    for quantity in (5, -1):
+        client.post(
+            "/stock-movement",
+            json={"inventory_id": inventory_id, "quantity": quantity},
+            headers=api_key_headers,
+        )
+    response = client.get(f"/inventory-transactions/{inventory_id}")
+    assert response.status_code == 200
+    assert [trans["quantity"] for trans in response.json()] == [-1, 5]
+
+
+def test_transaction_history_outside_period(inventory_id, api_key_headers):
+    """test that transaction_history excludes transactions out of the period"""
+    client.post(
+        "/stock-movement",
+        json={"inventory_id": inventory_id, "quantity": 5},
+        headers=api_key_headers,
+    )
+    response = client.get(
+        f"/inventory-transactions/{inventory_id}",
+        params={"until": "2000-01-01T00:00:00Z"},
+    )
+    assert response.status_code == 200 and response.json() == []
+
+
+def test_ingest_transactions_success_csv(
+    db_session, inventory_id, api_key_headers
+):
+    """
+    test that ingest_transactions records a CSV batch and applies its net
+    quantity to the inventory stock
+    """
+    batch = f"inventory_id,quantity\n{inventory_id},4\n{inventory_id},-6\n"
+    response = client.post(
+        "/inventory-transactions/bulk",
+        content=batch,
+        headers={**api_key_headers, "content-type": "text/csv"},
+    )
+    assert response.status_code == 201
+    assert response.json() == {"transactions": 2, "inventories": 1}
+    assert stock_of(db_session, inventory_id) == 1
+
+
+def test_ingest_transactions_success_ndjson(
+    db_session, inventory_id, api_key_headers
+):
+    """test that ingest_transactions records an NDJSON batch"""
+    batch = "\n".join(
+        f'{{"inventory_id": "{inventory_id}", "quantity": 1}}'
+        for _ in range(3)
+    )
+    response = client.post(
+        "/inventory-transactions/bulk",
+        content=batch,
+        headers={**api_key_headers, "content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    assert stock_of(db_session, inventory_id) == 6
+
+
+def test_ingest_transactions_fail_invalid_rows(
+    db_session, inventory_id, api_key_headers
+):
+    """test that a batch with invalid rows is rejected as a whole"""
+    batch = f"inventory_id,quantity\n{inventory_id},4\n{inventory_id},many\n"
+    response = client.post(
+        "/inventory-transactions/bulk",
+        content=batch,
+        headers={**api_key_headers, "content-type": "text/csv"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["row"] == 1
+    assert stock_of(db_session, inventory_id) == 3
+
+
+def test_ingest_transactions_fail_unknown_inventory(
+    db_session, inventory_id, api_key_headers
+):
+    """test that a batch moving an unknown inventory is rejected"""
+    batch = f"inventory_id,quantity\n{inventory_id},4\n{uuid4()},1\n"
+    response = client.post(
+        "/inventory-transactions/bulk",
+        content=batch,
+        headers={**api_key_headers, "content-type": "text/csv"},
+    )
+    assert response.status_code == 404
+    assert stock_of(db_session, inventory_id) == 3
+    assert not db_session.scalars(select(InventoryTransaction)).all()
+
+
+def test_ingest_transactions_fail_media_type(inventory_id, api_key_headers):
+    """test that ingest_transactions rejects unsupported batch formats"""
+    response = client.post(
+        "/inventory-transactions/bulk",
+        json=[{"inventory_id": inventory_id, "quantity": 1}],
+        headers=api_key_headers,
+    )
+    assert response.status_code == 415
+
+
+def test_move_stock_authorization(inventory_id, token, api_key_headers):
+    """
+    test that stock movements need an API key granting the inventory:write
+    scope or an admin token, and that revoked keys are rejected
+    """
+    movement = {"inventory_id": inventory_id, "quantity": 1}
+    admin_headers = {"Authorization": f"Bearer {token}"}
+    response = client.post("/stock-movement", json=movement)
+    assert response.status_code == 401
+    response = client.post(
+        "/stock-movement", json=movement, headers={"X-API-Key": "key.secret"}
+    )
+    assert response.status_code == 401
+    unscoped = client.post(
+        "/api-keys", json={"name": "etl", "scopes": []}, headers=admin_headers
+    ).json()["api_key"]
+    response = client.post(
+        "/stock-movement", json=movement, headers={"X-API-Key": unscoped}
+    )
+    assert response.status_code == 403
+    response = client.post(
+        "/stock-movement", json=movement, headers=admin_headers
+    )
+    assert response.status_code == 201
+    key_id = api_key_headers["X-API-Key"].split(".")[0]
+    response = client.delete(f"/api-keys/{key_id}", headers=admin_headers)
+    assert response.status_code == 200 and response.json()["revoked"]
+    response = client.post(
+        "/stock-movement", json=movement, headers=api_key_headers
+    )
+    assert response.status_code == 401
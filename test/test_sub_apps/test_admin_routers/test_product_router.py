@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+"""
+This module contains testsuites for the path operations of the product router
+"""
+import pytest
+from main.database.models.inventory import Inventory
+from main.database.models.product import Product
+from sqlalchemy import select
+from test.test_sub_apps import api_key_headers
+from test.test_sub_apps import client
+from test.test_sub_apps import token
+
+# header of the catalog files of the import tests
+CATALOG_HEADER = "category_code,sku,name,description,price,country,quantity\n"
+
+
+@pytest.fixture()
+def product(cat_kwargs, prod_kwargs) -> dict:
+    """fixture to return product request data of an existing category"""
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    return {**prod_kwargs, "category_id": cat_id}
+
+
+def test_put_product_inserts(db_session, product, api_key_headers):
+    """test that put_product inserts a product with a new sku"""
+    response = client.put("/product", json=product, headers=api_key_headers)
+    assert response.status_code == 200
+    prod_obj = response.json()
+    assert (
+        prod_obj["sku"] == product["sku"]
+        and prod_obj["is_active"]
+        and prod_obj["inventories"] == []
+    )
+    assert len(db_session.scalars(select(Product)).all()) == 1
+
+
+def test_put_product_updates_same_sku(db_session, product, api_key_headers):
+    """
+    test that put_product updates the product holding the sku in place
+    instead of failing on the unique sku
+    """
+    first = client.put(
+        "/product", json=product, headers=api_key_headers
+    ).json()
+    response = client.put(
+        "/product",
+        json={**product, "name": "Sony TV", "price": 20.0},
+        headers=api_key_headers,
+    )
+    assert response.status_code == 200
+    prod_obj = response.json()
+    assert (
+        prod_obj["id"] == first["id"]
+        and prod_obj["name"] == "Sony TV"
+        and prod_obj["price"] == 20.0
+    )
+    assert len(db_session.scalars(select(Product)).all()) == 1
+
+
+def test_put_product_fail_name_taken(product, api_key_headers):
+    """
+    test that put_product returns a 409 status code when the name belongs to
+    the product of another sku
+    """
+    client.put("/product", json=product, headers=api_key_headers)
+    response = client.put(
+        "/product",
+        json={**product, "sku": "99999999"},
+        headers=api_key_headers,
+    )
+    assert response.status_code == 409
+
+
+def test_put_product_fail_unauthenticated(db_session, product):
+    """
+    test that put_product returns a 401 status code without credentials and
+    writes nothing
+    """
+    response = client.put("/product", json=product)
+    assert response.status_code == 401
+    assert db_session.scalars(select(Product)).all() == []
+
+
+def import_catalog(body: str, headers: dict):
+    """upload a catalog file to the import endpoint"""
+    return client.post(
+        "/products/import",
+        files={"file": ("catalog.csv", CATALOG_HEADER + body, "text/csv")},
+        headers=headers,
+    )
+
+
+def test_import_products_success(db_session, cat_kwargs, api_key_headers):
+    """
+    test that import_products upserts the products of the catalog and an
+    inventory per country row
+    """
+    client.post("/new-category", json=cat_kwargs)
+    body = (
+        "COMP,00000001,Sony,TV set,12.5,NG,3\n"
+        "COMP,00000001,Sony,TV set,12.5,US,4\n"
+        "COMP,00000002,Philips,,8,,\n"
+    )
+    response = import_catalog(body, api_key_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "rows": 3,
+        "products": 2,
+        "inventories": 2,
+        "errors": [],
+    }
+    products = db_session.scalars(select(Product).order_by(Product.sku)).all()
+    assert [prod_obj.name for prod_obj in products] == ["Sony", "Philips"]
+    assert products[1].description is None
+    stocks = db_session.execute(
+        select(Inventory.country, Inventory.quantity).order_by("country")
+    ).all()
+    assert stocks == [("NG", 3), ("US", 4)]
+
+
+def test_import_products_updates_in_place(
+    db_session, cat_kwargs, api_key_headers
+):
+    """test that importing a sku again updates its product and inventories"""
+    client.post("/new-category", json=cat_kwargs)
+    import_catalog("COMP,00000001,Sony,,12.5,NG,3\n", api_key_headers)
+    response = import_catalog("COMP,00000001,Sony,,20,NG,7\n", api_key_headers)
+    assert response.json()["products"] == 1
+    prod_obj = db_session.scalars(select(Product)).one()
+    inv_obj = db_session.scalars(select(Inventory)).one()
+    assert prod_obj.price == 20.0 and inv_obj.quantity == 7
+
+
+def test_import_products_reports_rows(
+    db_session, cat_kwargs, prod_kwargs, api_key_headers
+):
+    """
+    test that import_products reports the invalid rows by index and imports
+    the others
+    """
+    cat_id = client.post("/new-category", json=cat_kwargs).json()["id"]
+    client.put(
+        "/product",
+        json=prod_kwargs | {"category_id": cat_id},
+        headers=api_key_headers,
+    )
+    body = (
+        "COMP,00000001,Valid,,1,NG,1\n"
+        "NOPE,00000002,Unknown category,,1,,\n"
+        "COMP,00000003,Bad price,,free,,\n"
+        "COMP,00000004,No quantity,,1,NG,\n"
+        f"COMP,00000005,{prod_kwargs['name']},,1,,\n"
+    )
+    report = import_catalog(body, api_key_headers).json()
+    assert (report["rows"], report["products"]) == (5, 1)
+    assert [
+        (error["row"], error["errors"][0]["type"])
+        for error in report["errors"]
+    ] == [
+        (1, "category_not_found"),
+        (2, "float_parsing"),
+        (3, "value_error"),
+        (4, "name_conflict"),
+    ]
+    assert len(db_session.scalars(select(Product)).all()) == 2
+
+
+def test_import_products_fail_missing_columns(api_key_headers):
+    """test that import_products rejects a file without the sku column"""
+    response = client.post(
+        "/products/import",
+        files={"file": ("catalog.csv", "category_code,name,price\n")},
+        headers=api_key_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_import_products_fail_unauthenticated():
+    """test that import_products requires a credential"""
+    response = import_catalog("", {})
+    assert response.status_code == 401
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the in-memory table of the service API keys
+"""
+import asyncio
+import pytest
+from main.utils.api_keys import ApiKeyEntry
+from main.utils.api_keys import ApiKeyRegistry
+
+
+@pytest.fixture()
+def registry() -> ApiKeyRegistry:
+    """fixture to return a registry holding the key "pos.secret" """
+    registry = ApiKeyRegistry(b"pepper")
+    registry.add(
+        ApiKeyEntry(
+            "pos", registry.hash_secret("secret"), frozenset({"scope"})
+        )
+    )
+    return registry
+
+
+def test_registry_verify(registry):
+    """test that only the exact key_id and secret of a key are accepted"""
+    assert registry.verify("pos.secret").scopes == {"scope"}
+    assert registry.verify("pos.wrong") is None
+    assert registry.verify("pos") is None
+    assert registry.verify("other.secret") is None
+    # the pepper is part of the stored hash
+    assert ApiKeyRegistry(b"other").hash_secret("secret") != (
+        registry.hash_secret("secret")
+    )
+
+
+def test_registry_refresh_discarded_after_eviction(registry):
+    """
+    test that a reload started before a key was evicted does not restore it
+    """
+    stale = list(registry.keys.values())
+
+    async def load():
+        registry.evict("pos")
+        return stale
+
+    assert not asyncio.run(registry.refresh(load))
+    assert registry.verify("pos.secret") is None
+
+
+def test_registry_run_reloads_on_request(registry):
+    """
+    test that the background reload replaces the table periodically and as
+    soon as a reload is requested
+    """
+    new_key = ApiKeyEntry("etl", registry.hash_secret("s3"), frozenset())
+    loads = []
+
+    async def load():
+        loads.append(len(loads))
+        return [new_key] if len(loads) > 1 else []
+
+    async def main():
+        task = asyncio.create_task(registry.run(load, interval=60))
+        while not loads:
+            await asyncio.sleep(0.001)
+        assert registry.keys == {}
+        registry.request_refresh()
+        while len(loads) < 2:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert registry.verify("etl.s3") == new_key
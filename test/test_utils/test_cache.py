@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the in-process TTL/LRU cache
+"""
+import asyncio
+import pytest
+from main.utils.cache import TTLCache
+
+
+class Clock:
+    """manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_lru_eviction():
+    """test that the least recently used entry is evicted when full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1 and len(cache) == 2
+
+
+def test_cache_ttl_expiration():
+    """test that entries are not served once their time to live elapsed"""
+    clock = Clock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["expirations"] == 1 and stats["size"] == 0
+
+
+def test_cache_coalesces_misses():
+    """test that concurrent misses on a key run a single load"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_load("key", load) for _ in range(100))
+        )
+
+    assert asyncio.run(main()) == ["value"] * 100
+    assert len(loads) == 1 and cache.get("key") == "value"
+
+
+def test_cache_invalidation_during_load():
+    """test that a load overtaken by an invalidation is not stored"""
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def load():
+        cache.invalidate("key")
+        return "stale"
+
+    assert asyncio.run(cache.get_or_load("key", load)) == "stale"
+    assert cache.get("key") is None
+
+
+def test_cache_load_errors_and_none_not_stored():
+    """
+    test that failed loads are raised to every waiter and that neither
+    errors nor None results are stored
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def missing():
+        return None
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_load("key", fail) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert asyncio.run(cache.get_or_load("key", missing)) is None
+    assert len(cache) == 0
+
+
+def test_cache_invalidate_if():
+    """test that invalidate_if only drops the entries matching the predicate"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    for key in range(4):
+        cache.set(key, {"even": key % 2 == 0})
+    cache.invalidate_if(lambda key, value: value["even"])
+    assert [cache.get(key) for key in range(4)] == [
+        None,
+        {"even": False},
+        None,
+        {"even": False},
+    ]
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the keyring of the authentication tokens
+"""
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.hazmat.primitives.serialization import NoEncryption
+from cryptography.hazmat.primitives.serialization import PrivateFormat
+from cryptography.hazmat.primitives.serialization import PublicFormat
+from jwt.exceptions import InvalidTokenError
+from main.utils.keyring import Keyring
+from main.utils.keyring import load_key
+from main.utils.keyring import load_keyring
+from main.validators.config import JWTEnvironmentVariableValidator
+from main.validators.config import JWTKeyValidator
+from typing import Callable
+
+# private keys of the supported algorithms
+SigningKey = (
+    rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+)
+
+# private key generators of the supported algorithms
+KEY_GENERATORS: dict[str, Callable[[], SigningKey]] = {
+    "RS256": lambda: rsa.generate_private_key(65537, 2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+@pytest.fixture()
+def write_key(tmp_path):
+    """
+    fixture to return a function writing a new key of an algorithm to PEM
+    files and returning its key config
+    """
+
+    def write(algorithm: str, private: bool = True) -> JWTKeyValidator:
+        private_key = KEY_GENERATORS[algorithm]()
+        public_file = tmp_path / f"{id(private_key)}_public.pem"
+        public_file.write_bytes(
+            private_key.public_key().public_bytes(
+                Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+            )
+        )
+        if not private:
+            return JWTKeyValidator(public_key_file=str(public_file))
+        private_file = tmp_path / f"{id(private_key)}_private.pem"
+        private_file.write_bytes(
+            private_key.private_bytes(
+                Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+            )
+        )
+        return JWTKeyValidator(private_key_file=str(private_file))
+
+    return write
+
+
+@pytest.mark.parametrize("algorithm", KEY_GENERATORS)
+def test_keyring_sign_verify(write_key, algorithm):
+    """
+    test that tokens are signed with the algorithm of the key type and carry
+    its kid
+    """
+    keyring = load_keyring(
+        JWTEnvironmentVariableValidator(JWT_KEYS=[write_key(algorithm)])
+    )
+    token = keyring.sign({"sub": "admin@admin.com"})
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == algorithm
+    assert header["kid"] == keyring.signing_key.kid
+    assert keyring.verify(token) == {"sub": "admin@admin.com"}
+
+
+def test_keyring_rotation(write_key):
+    """
+    test that the tokens of a retired key are verified while it remains in
+    the keyring and rejected once it is removed
+    """
+    old_key, new_key = load_key(write_key("RS256")), load_key(
+        write_key("EdDSA")
+    )
+    old_token = Keyring([old_key]).sign({"sub": "old"})
+    rotated = Keyring([old_key, new_key], signing_kid=new_key.kid)
+    new_token = rotated.sign({"sub": "new"})
+    assert jwt.get_unverified_header(new_token)["kid"] == new_key.kid
+    assert rotated.verify(old_token) == {"sub": "old"}
+    assert rotated.verify(new_token) == {"sub": "new"}
+    with pytest.raises(InvalidTokenError):
+        Keyring([new_key]).verify(old_token)
+
+
+def test_keyring_verify_only_key(write_key):
+    """test that a key without its private key cannot sign tokens"""
+    verify_only = load_key(write_key("ES256", private=False))
+    assert verify_only.private_key is None
+    with pytest.raises(ValueError):
+        Keyring([verify_only])
+
+
+def test_keyring_token_without_kid(write_key):
+    """
+    test that tokens without a kid are verified with the signing key only
+    and that a token cannot pick the algorithm of its key
+    """
+    key = load_key(write_key("RS256"))
+    keyring = Keyring([key])
+    token = jwt.encode({"sub": "legacy"}, key.private_key, algorithm="RS256")
+    assert keyring.verify(token) == {"sub": "legacy"}
+    forged = jwt.encode(
+        {"sub": "forged"},
+        "secret",
+        algorithm="HS256",
+        headers={"kid": key.kid},
+    )
+    with pytest.raises(InvalidTokenError):
+        keyring.verify(forged)
@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the password hashing pool
+"""
+import asyncio
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from main.utils.passwords import PasswordHasher
+from passlib.hash import pbkdf2_sha512
+
+
+class BrokenExecutor(Executor):
+    """executor standing for a process pool whose workers died"""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_hash_and_verify_in_process_pool():
+    """test that passwords hashed in the process pool verify"""
+    hasher = PasswordHasher(rounds=1_000, workers=1)
+
+    async def main():
+        hash_ = await hasher.hash("secret")
+        return (
+            hash_,
+            await hasher.verify_and_update("secret", hash_),
+            await hasher.verify_and_update("wrong", hash_),
+        )
+
+    try:
+        hash_, valid, invalid = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+    assert pbkdf2_sha512.from_string(hash_).rounds == 1_000
+    assert valid == (True, None)
+    assert invalid == (False, None)
+    assert hasher.stats()["executor"] == "process"
+
+
+def test_verify_rehashes_outdated_hash():
+    """test that a hash with fewer rounds than configured is replaced"""
+    hasher = PasswordHasher(rounds=2_000, executor="thread")
+    outdated = pbkdf2_sha512.using(rounds=1_000).hash("secret")
+    valid, new_hash = asyncio.run(hasher.verify_and_update("secret", outdated))
+    hasher.shutdown()
+    assert valid
+    assert pbkdf2_sha512.from_string(new_hash).rounds == 2_000
+    assert pbkdf2_sha512.verify("secret", new_hash)
+
+
+def test_concurrency_cap_queues_hashes():
+    """
+    test that hashes beyond the concurrency cap wait in the queue and that
+    the queueing is reported
+    """
+    hasher = PasswordHasher(
+        rounds=20_000, executor="thread", workers=4, max_concurrency=1
+    )
+    in_flight = []
+
+    async def main():
+        tasks = [
+            asyncio.ensure_future(hasher.hash("secret")) for _ in range(4)
+        ]
+        # sample the hashes running while the batch is processed
+        while not all(task.done() for task in tasks):
+            in_flight.append(hasher.in_flight)
+            await asyncio.sleep(0.001)
+        return [task.result() for task in tasks]
+
+    hashes = asyncio.run(main())
+    hasher.shutdown()
+    assert len(set(hashes)) == 4
+    assert max(in_flight) == 1
+    stats = hasher.stats()
+    assert stats["completed"] == 4
+    assert stats["queued"] == stats["in_flight"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+def test_broken_process_pool_falls_back_to_threads():
+    """
+    test that a broken process pool is shut down and replaced by a thread
+    pool
+    """
+    hasher = PasswordHasher(rounds=1_000)
+    broken = hasher._executor = BrokenExecutor()
+    hash_ = asyncio.run(hasher.hash("secret"))
+    hasher.shutdown()
+    assert pbkdf2_sha512.verify("secret", hash_)
+    assert broken.shut_down
+    assert hasher.stats()["executor"] == "thread"
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+This module contains tests for the UUID version 7 generator
+"""
+import pytest
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from main.utils import uuid7 as uuid7_module
+from main.utils.uuid7 import uuid7
+from main.utils.uuid7 import uuid7_time
+from uuid import uuid4
+
+
+def test_uuid7_layout():
+    """test that uuid7 sets the version, variant and current timestamp"""
+    value = uuid7()
+    assert value.version == 7 and value.variant == "specified in RFC 4122"
+    assert abs(uuid7_time(value) - datetime.now(timezone.utc)) < timedelta(
+        seconds=1
+    )
+
+
+def test_uuid7_strictly_increasing():
+    """test that the ids generated by the process are strictly increasing"""
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values) and len(set(values)) == len(values)
+
+
+def test_uuid7_counter_overflow(monkeypatch):
+    """
+    test that ids keep increasing when more ids than the counter holds are
+    generated within the same millisecond
+    """
+    # restore the generator state once the clock is unfrozen
+    monkeypatch.setattr(uuid7_module, "_last_ms", uuid7_module._last_ms)
+    monkeypatch.setattr(uuid7_module, "_counter", uuid7_module._counter)
+    frozen_ns = uuid7_module.time.time_ns() + 10**10
+    monkeypatch.setattr(uuid7_module.time, "time_ns", lambda: frozen_ns)
+    values = [uuid7() for _ in range(5000)]
+    assert values == sorted(values)
+
+
+def test_uuid7_time_fail_other_version():
+    """test that uuid7_time rejects uuids of other versions"""
+    with pytest.raises(ValueError):
+        uuid7_time(uuid4())
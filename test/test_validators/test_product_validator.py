@@ -139,3 +139,15 @@ def test_req_obj_init_fail_type_price(prod_kwarg_with_cat_id):
     with pytest.raises(ValidationError) as val_err_obj:
         ProductRequestValidator(**prod_kwarg_with_cat_id)
     assert "float_parsing" in str(val_err_obj.value)
+
+
+def test_req_obj_init_fail_long_sku(prod_kwarg_with_cat_id):
+    """
+    test that pydantic ProductRequestValidator model raises a Validation error
+    when instantiated with a sku longer than the sku column
+    """
+    # assign a nine character string to prod_kwarg_with_cat_id["sku"] key
+    prod_kwarg_with_cat_id["sku"] = "123456789"
+    with pytest.raises(ValidationError) as val_err_obj:
+        ProductRequestValidator(**prod_kwarg_with_cat_id)
+    assert "string_too_long" in str(val_err_obj.value)